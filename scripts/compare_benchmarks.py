@@ -0,0 +1,72 @@
+#!/usr/bin/python3
+"""Compare benchmark results written by pytest --benchmark --benchmark-json.
+
+Exits with status 1 when median time of any benchmark present in both files
+grew by more than threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def compare_benchmarks_cli(args: List[str]) -> int:
+    parser = argparse.ArgumentParser("compare_benchmarks.py")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        "-t",
+        type=float,
+        default=0.2,
+        help="allowed relative slowdown of median, by default 0.2",
+    )
+    parser.add_argument(
+        "--all",
+        "-a",
+        action="store_true",
+        default=False,
+        help="print all benchmarks, not only regressions",
+    )
+    namespace = parser.parse_args(args)
+    return compare_benchmarks(
+        _load(namespace.baseline),
+        _load(namespace.current),
+        namespace.threshold,
+        namespace.all,
+    )
+
+
+def compare_benchmarks(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    threshold: float,
+    show_all: bool = False,
+) -> int:
+    regressions = 0
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name]["median"]
+        after = current[name]["median"]
+        change = after / before - 1.0 if before else 0.0
+        regressed = change > threshold
+        regressions += regressed
+        if regressed or show_all:
+            print(
+                f"{'REGRESSED' if regressed else 'ok':<10} {name:<64} "
+                f"{before * 1e6:>12.1f}us -> {after * 1e6:>12.1f}us "
+                f"{change:>+8.1%}"
+            )
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{'missing':<10} {name}")
+    print(f"{regressions} regressions above {threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+def _load(path: Path) -> Dict[str, Dict[str, Any]]:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    return {result["name"]: result for result in document["results"]}
+
+
+if __name__ == "__main__":
+    raise SystemExit(compare_benchmarks_cli(sys.argv[1:]))
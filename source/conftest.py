@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+import importlib.util
+
+# Modules of optional backends can't be imported for doctests when their
+# dependency is not installed.
+collect_ignore_glob = []
+
+if importlib.util.find_spec("lmdb") is None:  # pragma: no cover
+    collect_ignore_glob.append("magic_storage/impl/_lmdb.py")
@@ -1,17 +1,63 @@
 from __future__ import annotations
 
 from ._atomic_file import AtomicFile
+from ._compression import Codec, available_codecs, get_codec, register_codec
+from ._durability import Durability
+from ._eviction import EvictionPolicy
+from ._key import StorageKey
 from ._magic import MagicStorage
+from ._metrics import Metrics, MetricsHook
+from ._object_cache import ObjectCache
+from ._read_cache import ReadCache
 from ._store_type import StoreType
-from .impl import InMemoryStorage
+from ._tracing import ProfileCapture, Tracer, get_tracer, set_tracer
+from .impl import (
+    AsyncFilesystemStorage,
+    AsyncInMemoryStorage,
+    DbmStorage,
+    InMemoryStorage,
+    PackedStorage,
+    SQLiteStorage,
+    Tier,
+    TieredStorage,
+)
 from .impl._filesystem import FilesystemStorage
 
 __all__ = [
     "MagicStorage",
     "StoreType",
+    "StorageKey",
     "FilesystemStorage",
     "InMemoryStorage",
+    "PackedStorage",
+    "SQLiteStorage",
+    "DbmStorage",
+    "TieredStorage",
+    "Tier",
+    "AsyncFilesystemStorage",
+    "AsyncInMemoryStorage",
     "AtomicFile",
+    "ReadCache",
+    "ObjectCache",
+    "Metrics",
+    "MetricsHook",
+    "Tracer",
+    "ProfileCapture",
+    "set_tracer",
+    "get_tracer",
+    "Durability",
+    "EvictionPolicy",
+    "Codec",
+    "get_codec",
+    "register_codec",
+    "available_codecs",
 ]
 
+try:
+    from .impl import LmdbStorage  # noqa: F401
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    __all__.append("LmdbStorage")
+
 __version__: str = "1.1.0"
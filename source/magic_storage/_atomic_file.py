@@ -2,22 +2,41 @@ from __future__ import annotations
 
 import json
 import logging
+import mmap
 import os
+import secrets
 import tempfile
-from inspect import Traceback
+import time
 from pathlib import Path
-from typing import Any, KeysView, Optional, Type
+from types import MappingProxyType, TracebackType
+from typing import IO, Any, KeysView, Mapping, Optional, Type
 
 from filelock import FileLock
 
+from ._durability import fsync_directory, fsync_file
+from ._lock_pool import StripeLock
+from ._metrics import observe_lock_wait
+from ._tracing import span
+
 __all__ = ["AtomicFile", "IndexFile"]
 
 
 class AtomicFile:
     """File like object supporting writing and reading in quasi atomic manor.
 
-    All reading and writing is done under lock and writing is done with
-    temporary files and os.replace().
+    Writing is done under lock, with temporary files and os.replace(), which
+    is atomic, therefore reading doesn't require lock, reader sees either
+    old or new content, never partially written one. Lock can still be
+    acquired for reading, where replacing opened file is not allowed
+    (Windows).
+
+    Parameters
+    ----------
+    file_path : str | Path
+        path to file.
+    lock : Optional[StripeLock], optional
+        lock to use, eg. from LockPool, when None, lock file named after
+        file is created next to it, by default None.
 
     Example
     -------
@@ -34,24 +53,35 @@ class AtomicFile:
     ```
     """
 
-    def __init__(self, file_path: str | Path) -> None:
+    def __init__(
+        self, file_path: str | Path, lock: Optional[StripeLock] = None
+    ) -> None:
         file_path = Path(file_path)
         self._file = file_path.absolute()
-        self._lock_file = (
-            file_path.parent / f"{file_path.name}.lock"
-        ).absolute()
-        self._lock = FileLock(self._lock_file)
+        self._lock: FileLock | StripeLock
+        if lock is None:
+            self._lock = FileLock(
+                (file_path.parent / f"{file_path.name}.lock").absolute()
+            )
+        else:
+            self._lock = lock
+        self._lock_file = self._lock.lock_file
+
+    @property
+    def path(self) -> Path:
+        """Absolute path to file."""
+        return self._file
 
     def __enter__(self) -> AtomicFile:
-        self._file.touch(0o777, True)
-        logging.debug(f"Created {self._file}.")
-        self._lock.acquire()
-        logging.debug(f"Acquired {self._lock_file}.")
+        with span("magic_storage.lock", file=self._lock_file):
+            start = time.perf_counter()
+            self._lock.acquire()
+            observe_lock_wait(time.perf_counter() - start)
+        logging.debug("Acquired %s.", self._lock_file)
         return self
 
     def read_text(self, **kwargs: Any) -> str:
-        """Read data from file. Requires lock to be acquired with context
-        manager.
+        """Read data from file. Doesn't require lock.
 
         Parameters
         ----------
@@ -62,10 +92,14 @@ class AtomicFile:
         -------
         str
             data from file.
+
+        Raises
+        ------
+        FileNotFoundError
+            when file doesn't exist.
         """
-        assert self._lock.is_locked
         value = self._file.read_text(**kwargs)
-        logging.debug(f"Read text to {self._file}.")
+        logging.debug("Read text to %s.", self._file)
         return value
 
     def write_text(
@@ -73,6 +107,8 @@ class AtomicFile:
         content: str,
         encoding: str = "utf-8",
         errors: str = "strict",
+        *,
+        fsync: bool = False,
     ) -> None:
         """Write data to file. Requires lock to be acquired with context
         manager.
@@ -85,8 +121,44 @@ class AtomicFile:
             Encoding to use, by default "utf-8"
         errors : str, optional
             Error mode, same rules as for open(), by default "strict"
+        fsync : bool, optional
+            sync file and its directory to disk before returning, by default
+            False.
         """
         assert self._lock.is_locked
+        self.commit(
+            self.stage_text(content, encoding, errors, fsync=fsync),
+            fsync=fsync,
+        )
+        logging.debug("Wrote text to %s.", self._file)
+
+    def stage_text(
+        self,
+        content: str,
+        encoding: str = "utf-8",
+        errors: str = "strict",
+        *,
+        fsync: bool = False,
+    ) -> str:
+        """Write data to temporary file next to this file, which can be later
+        moved in place of this file with commit(). Doesn't require lock.
+
+        Parameters
+        ----------
+        content : str
+            Content to be saved.
+        encoding : str, optional
+            Encoding to use, by default "utf-8"
+        errors : str, optional
+            Error mode, same rules as for open(), by default "strict"
+        fsync : bool, optional
+            sync temporary file to disk, by default False.
+
+        Returns
+        -------
+        str
+            path to temporary file.
+        """
         temp = tempfile.NamedTemporaryFile(
             mode="wt",
             delete=False,
@@ -95,15 +167,15 @@ class AtomicFile:
             encoding=encoding,
             errors=errors,
         )
-        temp.write(content)
-        temp.flush()
-        temp.close()
-        os.replace(temp.name, self._file)
-        logging.debug(f"Wrote text to {self._file}.")
+        with temp:
+            temp.write(content)
+            temp.flush()
+            if fsync:
+                fsync_file(temp)
+        return temp.name
 
     def read_bytes(self, **kwargs: Any) -> bytes:
-        """Read data from file. Requires lock to be acquired with context
-        manager.
+        """Read data from file. Doesn't require lock.
 
         Parameters
         ----------
@@ -114,13 +186,38 @@ class AtomicFile:
         -------
         str
             data from file.
+
+        Raises
+        ------
+        FileNotFoundError
+            when file doesn't exist.
         """
-        assert self._lock.is_locked
         value = self._file.read_bytes(**kwargs)
-        logging.debug(f"Read text to {self._file}.")
+        logging.debug("Read text to %s.", self._file)
         return value
 
-    def write_bytes(self, content: bytes) -> None:
+    def read_buffer(self) -> memoryview:
+        """Map file into memory and return read-only view of its content,
+        without copying it. Doesn't require lock.
+
+        Mapping stays valid after file is replaced by writer, as
+        os.replace() never modifies existing file, the view keeps old content
+        alive until it is released or garbage collected.
+
+        Returns
+        -------
+        memoryview
+            read-only view of file content.
+        """
+        with self._file.open("rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                # empty files can't be mapped
+                return memoryview(b"")
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        logging.debug("Mapped %s.", self._file)
+        return memoryview(mapping)
+
+    def write_bytes(self, content: bytes, *, fsync: bool = False) -> None:
         """Write data to file. Requires lock to be acquired with context
         manager.
 
@@ -128,49 +225,170 @@ class AtomicFile:
         ----------
         content : str
             Content to be saved.
+        fsync : bool, optional
+            sync file and its directory to disk before returning, by default
+            False.
         """
         assert self._lock.is_locked
-        temp = tempfile.NamedTemporaryFile(
+        self.commit(self.stage_bytes(content, fsync=fsync), fsync=fsync)
+        logging.debug("Wrote bytes to %s.", self._file)
+
+    def stage_bytes(self, content: bytes, *, fsync: bool = False) -> str:
+        """Write data to temporary file next to this file, which can be later
+        moved in place of this file with commit(). Doesn't require lock.
+
+        Parameters
+        ----------
+        content : str
+            Content to be saved.
+        fsync : bool, optional
+            sync temporary file to disk, by default False.
+
+        Returns
+        -------
+        str
+            path to temporary file.
+        """
+        temp = self.open_staged()
+        with temp:
+            temp.write(content)
+            temp.flush()
+            if fsync:
+                fsync_file(temp)
+        return temp.name
+
+    def open_bytes(self) -> IO[bytes]:
+        """Open file for binary reading. Doesn't require lock, file keeps
+        content it had when opened, as writers replace file instead of
+        modifying it.
+
+        Returns
+        -------
+        IO[bytes]
+            file opened in "rb" mode.
+        """
+        return self._file.open("rb")
+
+    def open_staged(self) -> IO[bytes]:
+        """Open temporary file next to this file for binary writing, which
+        can be later moved in place of this file with commit(name). Doesn't
+        require lock.
+
+        Returns
+        -------
+        IO[bytes]
+            temporary file, its name attribute is path to it.
+        """
+        return tempfile.NamedTemporaryFile(
             mode="wb",
             delete=False,
             suffix=self._file.name,
             dir=self._file.parent,
         )
-        temp.write(content)
-        temp.flush()
-        temp.close()
-        os.replace(temp.name, self._file)
-        logging.debug(f"Wrote bytes to {self._file}.")
+
+    def stage_link(self, source: str | Path) -> str:
+        """Create hard link to other file next to this file, which can be
+        later moved in place of this file with commit(), so both names share
+        content without copying it. Doesn't require lock.
+
+        Parameters
+        ----------
+        source : str | Path
+            path to file to link, on the same filesystem.
+
+        Returns
+        -------
+        str
+            path to temporary link.
+
+        Raises
+        ------
+        FileNotFoundError
+            when source doesn't exist.
+        """
+        temp = (
+            self._file.parent / f"tmp{secrets.token_hex(8)}{self._file.name}"
+        )
+        os.link(source, temp)
+        return str(temp)
+
+    def commit(self, temp_name: str, *, fsync: bool = False) -> None:
+        """Replace this file with temporary file created with stage_text(),
+        stage_bytes() or stage_link(). Requires lock to be acquired with context manager.
+
+        Parameters
+        ----------
+        temp_name : str
+            path to temporary file.
+        fsync : bool, optional
+            sync directory to disk, so replacement survives crash, by
+            default False.
+        """
+        assert self._lock.is_locked
+        os.replace(temp_name, self._file)
+        if fsync:
+            fsync_directory(self._file.parent)
+
+    def adopt(self, source: str | Path) -> bool:
+        """Move other file in place of this file, unless this file already
+        holds data, then other file is considered outdated and removed.
+        Requires lock to be acquired with context manager.
+
+        Parameters
+        ----------
+        source : str | Path
+            path to file to move, on the same filesystem.
+
+        Returns
+        -------
+        bool
+            True when file was moved, False when it was removed.
+        """
+        assert self._lock.is_locked
+        if self._file.exists():
+            os.unlink(source)
+            logging.debug("Removed %s, %s is newer.", source, self._file)
+            return False
+        os.replace(source, self._file)
+        logging.debug("Moved %s to %s.", source, self._file)
+        return True
 
     def __exit__(
         self,
         _exception_type: Optional[Type[BaseException]],
         _exception_value: Optional[BaseException],
-        _traceback: Traceback,
+        _traceback: Optional[TracebackType],
     ) -> None:
         self._lock.release()
-        logging.debug(f"Released {self._lock_file}.")
+        logging.debug("Released %s.", self._lock_file)
 
 
 class IndexFile(AtomicFile):
     def __init__(self, file_path: str | Path) -> None:
         super().__init__(file_path)
         self._index: Optional[dict[str, str]] = None
+        # index is written back on exit only when it was modified
+        self._dirty = False
 
     def __enter__(self) -> IndexFile:
         super().__enter__()
         self._index = {}
+        self._dirty = False
         try:
             raw = self._file.read_text(encoding="utf-8")
-            self._index = json.loads(raw)
+            # file may have been created empty by older versions
+            if raw:
+                self._index = json.loads(raw)
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logging.exception(e)
         return self
 
     @property
-    def index(self) -> dict[str, str]:
+    def index(self) -> Mapping[str, str]:
         assert self._index is not None
-        return self._index
+        return MappingProxyType(self._index)
 
     def __getitem__(self, __key: str) -> str:
         assert self._index is not None
@@ -183,10 +401,22 @@ class IndexFile(AtomicFile):
     def __setitem__(self, __key: str, __value: str) -> None:
         assert self._index is not None
         self._index[__key] = __value
+        self._dirty = True
 
     def __delitem__(self, __key: str) -> None:
         assert self._index is not None
         del self._index[__key]
+        self._dirty = True
+
+    def clear(self) -> None:
+        assert self._index is not None
+        self._index.clear()
+        self._dirty = True
+
+    def update(self, __other: Mapping[str, str]) -> None:
+        assert self._index is not None
+        self._index.update(__other)
+        self._dirty = True
 
     def keys(self) -> KeysView:
         assert self._index is not None
@@ -200,10 +430,12 @@ class IndexFile(AtomicFile):
         self,
         _exception_type: Optional[Type[BaseException]],
         _exception_value: Optional[BaseException],
-        _traceback: Traceback,
+        _traceback: Optional[TracebackType],
     ) -> None:
         try:
-            self.write_text(json.dumps(self._index), encoding="utf-8")
+            if self._dirty:
+                self.write_text(json.dumps(self._index), encoding="utf-8")
         finally:
             self._index = None
+            self._dirty = False
             super().__exit__(_exception_type, _exception_value, _traceback)
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import bz2
+import lzma
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Protocol, Type
+
+__all__ = [
+    "Codec",
+    "Compressor",
+    "Decompressor",
+    "NoneCodec",
+    "ZlibCodec",
+    "Bz2Codec",
+    "LzmaCodec",
+    "register_codec",
+    "get_codec",
+    "available_codecs",
+    "pack",
+    "unpack",
+    "make_header",
+    "unpack_stream",
+    "DEFAULT_CODEC",
+]
+
+
+DEFAULT_CODEC = "zlib:1"
+"""Codec used for binary payloads unless storage is configured otherwise."""
+
+HEADER_MAGIC = b"\x89MSC"
+"""Prefix of every payload compressed with codec from registry."""
+
+XZ_MAGIC = b"\xfd7zXZ\x00"
+"""Prefix of legacy payloads, written before codec header was introduced."""
+
+LEGACY_LZMA_KWARGS: dict[str, Any] = {
+    "format": lzma.FORMAT_XZ,
+    "filters": None,
+}
+
+
+class Compressor(Protocol):
+    """Incremental compressor, interface of zlib.compressobj() and
+    lzma.LZMACompressor."""
+
+    def compress(self, __data: bytes | bytearray | memoryview) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class Decompressor(Protocol):
+    """Incremental decompressor, flush() is called once after all data was
+    passed to decompress()."""
+
+    def decompress(self, __data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class _BufferingCompressor:
+    # Fallback for codecs without incremental compression, keeps all data
+    # in memory until flush().
+
+    def __init__(self, codec: Codec) -> None:
+        self._codec = codec
+        self._buffer = bytearray()
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        self._buffer += data
+        return b""
+
+    def flush(self) -> bytes:
+        return self._codec.compress(self._buffer)
+
+
+class _BufferingDecompressor:
+    def __init__(self, codec: Codec) -> None:
+        self._codec = codec
+        self._buffer = bytearray()
+
+    def decompress(self, data: bytes) -> bytes:
+        self._buffer += data
+        return b""
+
+    def flush(self) -> bytes:
+        return self._codec.decompress(self._buffer)
+
+
+class _IdentityCompressor:
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return bytes(data)
+
+    decompress = compress
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _FlushlessDecompressor:
+    # Adapts decompressors which have no flush(), eg. lzma.LZMADecompressor.
+
+    def __init__(self, decompressor: Any) -> None:
+        self._decompressor = decompressor
+
+    def decompress(self, data: bytes) -> bytes:
+        return bytes(self._decompressor.decompress(data))
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class Codec(ABC):
+    """Compression algorithm used to pack binary payloads.
+
+    Codec name is written to header of every payload compressed with it,
+    therefore it must be short, ascii only and must never change once
+    payloads were stored with it.
+
+    Parameters
+    ----------
+    level : Optional[int], optional
+        compression level, meaning depends on algorithm, when None,
+        algorithm default is used, by default None.
+    """
+
+    name: str = ""
+    default_level: Optional[int] = None
+
+    def __init__(self, level: Optional[int] = None) -> None:
+        self.level = level if level is not None else self.default_level
+
+    @property
+    def spec(self) -> str:
+        """Specification string which can be passed to get_codec() to
+        recreate this codec."""
+        if self.level is None:
+            return self.name
+        return f"{self.name}:{self.level}"
+
+    @abstractmethod
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        ...
+
+    @abstractmethod
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        ...
+
+    def compressor(self) -> Compressor:
+        """Return incremental compressor producing the same format as
+        compress(), used for streaming. Codecs which don't override it keep
+        all data in memory until flush()."""
+        return _BufferingCompressor(self)
+
+    def decompressor(self) -> Decompressor:
+        """Return incremental decompressor for data produced by compress()
+        or compressor()."""
+        return _BufferingDecompressor(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.spec!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Codec):
+            return NotImplemented
+        return self.spec == other.spec
+
+    def __hash__(self) -> int:
+        return hash(self.spec)
+
+
+_REGISTRY: dict[str, Type[Codec]] = {}
+
+
+def register_codec(codec_type: Type[Codec]) -> Type[Codec]:
+    """Register codec class under its name, can be used as class decorator.
+
+    Parameters
+    ----------
+    codec_type : Type[Codec]
+        codec class to register.
+
+    Returns
+    -------
+    Type[Codec]
+        same class, unchanged.
+    """
+    name = codec_type.name
+    assert name and name.isascii() and len(name) < 256, name
+    _REGISTRY[name] = codec_type
+    return codec_type
+
+
+def get_codec(spec: str | Codec) -> Codec:
+    """Create codec from specification string.
+
+    Specification consists of codec name optionally followed by colon and
+    compression level, eg. "zlib:1", "lzma:6" or "none".
+
+    Parameters
+    ----------
+    spec : str | Codec
+        codec specification, Codec instances are returned unchanged.
+
+    Returns
+    -------
+    Codec
+        codec instance.
+
+    Raises
+    ------
+    ValueError
+        When codec is not registered, eg. because optional dependency
+        is not installed.
+
+    Examples
+    --------
+    ```
+    >>> get_codec("lzma:9")
+    LzmaCodec('lzma:9')
+    >>> get_codec("zlib")
+    ZlibCodec('zlib:6')
+    >>>
+    ```
+    """
+    if isinstance(spec, Codec):
+        return spec
+
+    name, _, level = spec.partition(":")
+    try:
+        codec_type = _REGISTRY[name]
+    except KeyError:
+        raise ValueError(
+            f"Codec {name!r} is not available, "
+            f"choose one of {available_codecs()}."
+        ) from None
+
+    return codec_type(int(level)) if level else codec_type()
+
+
+def available_codecs() -> list[str]:
+    """Return names of all registered codecs."""
+    return list(_REGISTRY.keys())
+
+
+def make_header(codec: Codec) -> bytes:
+    """Return header naming codec, which prefixes every packed payload."""
+    name = codec.name.encode("ascii")
+    return HEADER_MAGIC + len(name).to_bytes(1, "big") + name
+
+
+def pack(codec: Codec, data: bytes | bytearray) -> bytes:
+    """Compress data with codec and prefix it with header naming codec."""
+    return make_header(codec) + codec.compress(data)
+
+
+def unpack(payload: bytes | bytearray) -> bytes:
+    """Decompress payload created with pack().
+
+    Payloads without header are treated as legacy LZMA compressed data.
+    """
+    view = memoryview(payload)
+
+    if view[: len(HEADER_MAGIC)] == HEADER_MAGIC:
+        offset = len(HEADER_MAGIC)
+        name_length = view[offset]
+        offset += 1
+        name = bytes(view[offset : offset + name_length]).decode("ascii")
+        offset += name_length
+        return get_codec(name).decompress(view[offset:])
+
+    if view[: len(XZ_MAGIC)] == XZ_MAGIC:
+        return lzma.decompress(payload, **LEGACY_LZMA_KWARGS)
+
+    raise ValueError("Payload was not compressed with any known codec.")
+
+
+def unpack_stream(read: Callable[[int], bytes]) -> tuple[Decompressor, bytes]:
+    """Read header of payload created with pack() or compressor() and return
+    decompressor for the rest of payload.
+
+    Parameters
+    ----------
+    read : Callable[[int], bytes]
+        function reading given number of bytes from payload, eg. read()
+        method of binary file.
+
+    Returns
+    -------
+    tuple[Decompressor, bytes]
+        decompressor and data decompressed while reading header.
+    """
+    head = read(len(HEADER_MAGIC))
+
+    if head == HEADER_MAGIC:
+        name_length = read(1)
+        name = read(name_length[0] if name_length else 0).decode("ascii")
+        return get_codec(name).decompressor(), b""
+
+    head += read(len(XZ_MAGIC) - len(head))
+    if head == XZ_MAGIC:
+        decompressor = _FlushlessDecompressor(
+            lzma.LZMADecompressor(**LEGACY_LZMA_KWARGS)
+        )
+        return decompressor, decompressor.decompress(head)
+
+    raise ValueError("Payload was not compressed with any known codec.")
+
+
+@register_codec
+class NoneCodec(Codec):
+    """Codec which stores data as is, useful for already compressed data."""
+
+    name = "none"
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return bytes(data)
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return bytes(data)
+
+    def compressor(self) -> Compressor:
+        return _IdentityCompressor()
+
+    def decompressor(self) -> Decompressor:
+        return _IdentityCompressor()
+
+
+@register_codec
+class ZlibCodec(Codec):
+    """Deflate algorithm from zlib, fast with reasonable compression
+    ratio."""
+
+    name = "zlib"
+    default_level = 6
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return zlib.compress(data, self.level)  # type: ignore
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return zlib.decompress(data)
+
+    def compressor(self) -> Compressor:
+        return zlib.compressobj(self.level)  # type: ignore
+
+    def decompressor(self) -> Decompressor:
+        return zlib.decompressobj()
+
+
+@register_codec
+class Bz2Codec(Codec):
+    """Bzip2 algorithm, slow but good at compressing text."""
+
+    name = "bz2"
+    default_level = 9
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return bz2.compress(data, self.level)  # type: ignore
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return bz2.decompress(data)
+
+    def compressor(self) -> Compressor:
+        return bz2.BZ2Compressor(self.level)  # type: ignore
+
+    def decompressor(self) -> Decompressor:
+        return _FlushlessDecompressor(bz2.BZ2Decompressor())
+
+
+@register_codec
+class LzmaCodec(Codec):
+    """LZMA algorithm, slowest, but with best compression ratio."""
+
+    name = "lzma"
+    default_level = 6
+
+    def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return lzma.compress(data, format=lzma.FORMAT_XZ, preset=self.level)
+
+    def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+        return lzma.decompress(data, format=lzma.FORMAT_XZ)
+
+    def compressor(self) -> Compressor:
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=self.level)
+
+    def decompressor(self) -> Decompressor:
+        return _FlushlessDecompressor(
+            lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+        )
+
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+
+    @register_codec
+    class ZstdCodec(Codec):
+        """Zstandard algorithm, requires zstandard package."""
+
+        name = "zstd"
+        default_level = 3
+
+        def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            return bytes(compressor.compress(data))
+
+        def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+            return bytes(zstandard.ZstdDecompressor().decompress(data))
+
+        def compressor(self) -> Compressor:
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            return compressor.compressobj()  # type: ignore
+
+        def decompressor(self) -> Decompressor:
+            return _FlushlessDecompressor(
+                zstandard.ZstdDecompressor().decompressobj()
+            )
+
+    __all__.append("ZstdCodec")
+
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+
+    @register_codec
+    class Lz4Codec(Codec):
+        """LZ4 frame algorithm, requires lz4 package."""
+
+        name = "lz4"
+        default_level = 0
+
+        def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+            return bytes(
+                lz4.frame.compress(data, compression_level=self.level)
+            )
+
+        def decompress(self, data: bytes | bytearray | memoryview) -> bytes:
+            return bytes(lz4.frame.decompress(data))
+
+        def compressor(self) -> Compressor:
+            return _Lz4Compressor(self.level)
+
+        def decompressor(self) -> Decompressor:
+            return _FlushlessDecompressor(lz4.frame.LZ4FrameDecompressor())
+
+    class _Lz4Compressor:
+        def __init__(self, level: Optional[int]) -> None:
+            self._compressor = lz4.frame.LZ4FrameCompressor(
+                compression_level=level
+            )
+            self._header = bytes(self._compressor.begin())
+
+        def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+            header, self._header = self._header, b""
+            return header + bytes(self._compressor.compress(data))
+
+        def flush(self) -> bytes:
+            header, self._header = self._header, b""
+            return header + bytes(self._compressor.flush())
+
+    __all__.append("Lz4Codec")
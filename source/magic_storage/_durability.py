@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+import weakref
+from enum import Enum
+from pathlib import Path
+from typing import IO, Iterable, Optional
+
+__all__ = [
+    "Durability",
+    "GroupCommitter",
+    "fsync_file",
+    "fsync_directory",
+    "DEFAULT_GROUP_INTERVAL",
+]
+
+
+DEFAULT_GROUP_INTERVAL = 0.05
+"""Time in seconds for which group commit collects writes before syncing
+them."""
+
+
+class Durability(Enum):
+    """Policy of syncing written files to disk.
+
+    NONE leaves it to operating system, writes are atomic, but most recent
+    of them may be lost on power failure or kernel crash. FSYNC syncs every
+    file and directory entry pointing to it before write returns. GROUP
+    syncs every file before it replaces old one, so it is never seen
+    truncated, but syncs directories once for many writes, for whole batch
+    written with store_many(), and in background for single writes, which
+    may be lost if they happened shortly before crash.
+    """
+
+    NONE = "none"
+    FSYNC = "fsync"
+    GROUP = "group"
+
+
+def fsync_file(file: IO) -> None:
+    """Flush Python buffers of opened file and sync its content to disk."""
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def fsync_directory(path: str | Path) -> None:
+    """Sync directory to disk, so renames and new entries in it survive
+    crash. Does nothing on Windows, where directories can't be opened."""
+    if os.name == "nt":  # pragma: no cover
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    logging.debug("Synced directory %s.", path)
+
+
+_COMMITTERS: weakref.WeakSet[GroupCommitter] = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all() -> None:  # pragma: no cover
+    for committer in list(_COMMITTERS):
+        committer.flush()
+
+
+class GroupCommitter:
+    """Collects directories which contain newly written files and syncs
+    them in background thread, each once per interval, no matter how many
+    files were written meanwhile.
+
+    Pending directories are also synced at interpreter exit.
+
+    Parameters
+    ----------
+    interval : float, optional
+        time in seconds for which writes are collected, by default
+        DEFAULT_GROUP_INTERVAL.
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> committer = GroupCommitter()
+    >>> committer.mark([tmp])
+    >>> committer.flush()
+    1
+    >>> committer.close()
+    >>>
+    ```
+    """
+
+    def __init__(self, interval: float = DEFAULT_GROUP_INTERVAL) -> None:
+        self._interval = interval
+        self._pending: set[Path] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        _COMMITTERS.add(self)
+
+    @property
+    def interval(self) -> float:
+        """Time in seconds for which writes are collected."""
+        return self._interval
+
+    def mark(self, directories: Iterable[Path]) -> None:
+        """Schedule sync of directories."""
+        with self._lock:
+            self._pending.update(directories)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="GroupCommitter", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def flush(self) -> int:
+        """Sync all pending directories now.
+
+        Returns
+        -------
+        int
+            number of directories synced.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        for directory in pending:
+            try:
+                fsync_directory(directory)
+            except FileNotFoundError:  # pragma: no cover
+                # removed meanwhile, nothing to sync
+                pass
+        return len(pending)
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._closed:
+                return
+            # let more writes join the group, close() interrupts waiting
+            self._stop.wait(self._interval)
+            self.flush()
+
+    def close(self) -> None:
+        """Stop background thread and sync pending directories."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._stop.set()
+        self._wakeup.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
+        _COMMITTERS.discard(self)
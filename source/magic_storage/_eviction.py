@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from enum import Enum
+from typing import Callable, Hashable, Iterator, Optional
+
+__all__ = ["EvictionPolicy", "BoundedStore", "EvictionCallback"]
+
+
+EvictionCallback = Callable[[Hashable, "str | bytes"], None]
+
+
+class EvictionPolicy(Enum):
+    """Order in which BoundedStore evicts entries when it is full.
+
+    LRU evicts least recently used entry, LFU the least frequently used one,
+    least recently used of them on tie, FIFO the oldest one, no matter how
+    often it is used.
+    """
+
+    LRU = "lru"
+    LFU = "lfu"
+    FIFO = "fifo"
+
+
+class BoundedStore:
+    """Thread safe mapping of keys to raw payloads, limited by number of
+    entries and total size of payloads.
+
+    Size of payload is its len(), bytes for binary payloads, characters for
+    text ones. When entry is added and store exceeds any of limits, entries
+    are evicted according to policy and passed to callback. Entry which was
+    just added is evicted only when it alone exceeds max_bytes.
+
+    Parameters
+    ----------
+    maxsize : Optional[int], optional
+        maximal number of entries, None for no limit, by default None.
+    max_bytes : Optional[int], optional
+        maximal total size of payloads, None for no limit, by default None.
+    policy : EvictionPolicy | str, optional
+        eviction policy, by default EvictionPolicy.LRU.
+    on_evict : Optional[EvictionCallback], optional
+        called with key and payload of every evicted entry, after store
+        releases its lock, exceptions are logged and ignored, by default
+        None.
+
+    Example
+    -------
+    ```
+    >>> evicted = []
+    >>> store = BoundedStore(max_bytes=8, on_evict=lambda k, v: evicted.append(k))
+    >>> store["a"] = b"1234"
+    >>> store["b"] = b"5678"
+    >>> store["a"]
+    b'1234'
+    >>> store["c"] = b"90"
+    >>> evicted
+    ['b']
+    >>> store.nbytes
+    6
+    >>>
+    ```
+    """
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: EvictionPolicy | str = EvictionPolicy.LRU,
+        on_evict: Optional[EvictionCallback] = None,
+    ) -> None:
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(
+                f"max_bytes must be non-negative, got {max_bytes}."
+            )
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self._policy = EvictionPolicy(policy)
+        self._on_evict = on_evict
+        # LRU - recency order, FIFO - insertion order, LFU - unused
+        self._entries: OrderedDict[Hashable, str | bytes] = OrderedDict()
+        # LFU only, use count of every key and keys with given count, in
+        # recency order
+        self._counts: dict[Hashable, int] = {}
+        self._buckets: dict[int, OrderedDict[Hashable, None]] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @property
+    def maxsize(self) -> Optional[int]:
+        """Maximal number of entries, None when unlimited."""
+        return self._maxsize
+
+    @property
+    def max_bytes(self) -> Optional[int]:
+        """Maximal total size of payloads, None when unlimited."""
+        return self._max_bytes
+
+    @property
+    def policy(self) -> EvictionPolicy:
+        """Eviction policy."""
+        return self._policy
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of stored payloads."""
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Hashable]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __getitem__(self, key: Hashable) -> str | bytes:
+        with self._lock:
+            value = self._entries[key]
+            self._use(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: str | bytes) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = value
+            self._nbytes += len(value)
+            if self._policy is EvictionPolicy.LFU:
+                self._counts[key] = 0
+                self._buckets.setdefault(0, OrderedDict())[key] = None
+            evicted = self._evict(key)
+        self._notify(evicted)
+
+    def pop(self, key: Hashable) -> str | bytes:
+        """Remove entry and return its payload, raises KeyError when there
+        is none. Removed entry is not passed to callback."""
+        with self._lock:
+            value = self._remove(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        """Remove entry if present, it is not passed to callback."""
+        with self._lock:
+            self._remove(key)
+
+    def _use(self, key: Hashable) -> None:
+        if self._policy is EvictionPolicy.LRU:
+            self._entries.move_to_end(key)
+        elif self._policy is EvictionPolicy.LFU:
+            count = self._counts[key]
+            self._unlink(key, count)
+            self._counts[key] = count + 1
+            self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def _unlink(self, key: Hashable, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+
+    def _remove(self, key: Hashable) -> Optional[str | bytes]:
+        value = self._entries.pop(key, None)
+        if value is None:
+            return None
+        self._nbytes -= len(value)
+        if self._policy is EvictionPolicy.LFU:
+            self._unlink(key, self._counts.pop(key))
+        return value
+
+    def _is_full(self) -> bool:
+        return (
+            self._maxsize is not None and len(self._entries) > self._maxsize
+        ) or (self._max_bytes is not None and self._nbytes > self._max_bytes)
+
+    def _victim(self, added: Hashable) -> Hashable:
+        if self._policy is EvictionPolicy.LFU:
+            candidates: Iterator[Hashable] = (
+                key
+                for count in sorted(self._buckets)
+                for key in self._buckets[count]
+            )
+        else:
+            candidates = iter(self._entries)
+        for key in candidates:
+            if key != added:
+                return key
+        return added
+
+    def _evict(self, added: Hashable) -> list[tuple[Hashable, str | bytes]]:
+        evicted = []
+        while self._is_full():
+            key = self._victim(added)
+            value = self._remove(key)
+            assert value is not None
+            evicted.append((key, value))
+        self.evictions += len(evicted)
+        return evicted
+
+    def _notify(self, evicted: list[tuple[Hashable, str | bytes]]) -> None:
+        for key, value in evicted:
+            logging.debug("Evicted %s, %s bytes.", key, len(value))
+            if self._on_evict is None:
+                continue
+            try:
+                self._on_evict(key, value)
+            except Exception as e:
+                logging.exception(e)
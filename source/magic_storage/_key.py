@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from hashlib import sha256
+from typing import Any
+
+__all__ = ["StorageKey"]
+
+
+class StorageKey(str):
+    """Identifier of object in storage, sha256 hex digest of uid given by
+    user.
+
+    Key is computed once, at public API boundary, and then passed down to
+    storage implementation. Creating key from StorageKey returns it
+    unchanged, therefore it is never hashed twice. As it is a str subclass,
+    it can be used anywhere where plain str identifier was used before.
+
+    Example
+    -------
+    ```
+    >>> key = StorageKey.from_uid("EXAMPLE UID")
+    >>> key
+    '4c9e95de851b875493ba6c6dfb16b6aaae5c3e167aef9ab6edfeb0dbca2f6574'
+    >>> StorageKey.from_uid(key) is key
+    True
+    >>>
+    ```
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_uid(cls, __uid: Any) -> StorageKey:
+        """Create key from object unique identifier.
+
+        Parameters
+        ----------
+        __uid : Any
+            object unique identifier, anything convertible to str.
+
+        Returns
+        -------
+        StorageKey
+            key for identifier, when __uid is StorageKey, it is returned
+            unchanged.
+        """
+        if isinstance(__uid, StorageKey):
+            return __uid
+
+        digest = sha256(str(__uid).encode("utf-8")).hexdigest()
+        return cls(digest)
+
+    def legacy_keys(self) -> tuple[StorageKey, StorageKey]:
+        """Return keys under which this object could have been saved by
+        versions which hashed identifiers on every API layer.
+
+        Objects stored with store_as() were hashed twice, objects stored
+        with cache_if_missing() were hashed three times.
+        """
+        twice = StorageKey(sha256(self.encode("utf-8")).hexdigest())
+        thrice = StorageKey(sha256(twice.encode("utf-8")).hexdigest())
+        return twice, thrice
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Generic, Hashable, Iterator, TypeVar
+
+__all__ = ["KeyedLock", "AsyncKeyedLock"]
+
+_L = TypeVar("_L")
+
+
+class _LockTable(ABC, Generic[_L]):
+    # Locks are created on first use and dropped as soon as last holder or
+    # waiter leaves, so table doesn't grow with number of keys ever used.
+
+    def __init__(self) -> None:
+        self._guard = threading.Lock()
+        self._locks: dict[Hashable, _L] = {}
+        self._users: dict[Hashable, int] = {}
+
+    @abstractmethod
+    def _new_lock(self) -> _L:
+        ...
+
+    def _enter(self, __key: Hashable) -> _L:
+        with self._guard:
+            lock = self._locks.get(__key)
+            if lock is None:
+                lock = self._locks[__key] = self._new_lock()
+            self._users[__key] = self._users.get(__key, 0) + 1
+            return lock
+
+    def _leave(self, __key: Hashable) -> None:
+        with self._guard:
+            self._users[__key] -= 1
+            if self._users[__key] == 0:
+                del self._users[__key]
+                del self._locks[__key]
+
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._locks)
+
+
+class KeyedLock(_LockTable["threading.RLock"]):
+    """Table of in-process locks, one for each key, created on demand.
+
+    Lock is reentrant, therefore thread holding lock for key can acquire it
+    again, eg. when callback of cache_if_missing() uses the same storage.
+
+    Example
+    -------
+    ```
+    >>> locks = KeyedLock()
+    >>> with locks.hold("some-key"):
+    ...     len(locks)
+    ...
+    1
+    >>> len(locks)
+    0
+    >>>
+    ```
+    """
+
+    def _new_lock(self) -> threading.RLock:
+        return threading.RLock()
+
+    @contextmanager
+    def hold(self, __key: Hashable) -> Iterator[None]:
+        """Acquire lock for key for the time of with block."""
+        lock = self._enter(__key)
+        try:
+            with lock:
+                yield
+        finally:
+            self._leave(__key)
+
+
+class AsyncKeyedLock(_LockTable[asyncio.Lock]):
+    """Table of asyncio locks, one for each key, created on demand.
+
+    Unlike KeyedLock, locks are not reentrant.
+    """
+
+    def _new_lock(self) -> asyncio.Lock:
+        return asyncio.Lock()
+
+    @asynccontextmanager
+    async def hold(self, __key: Hashable) -> AsyncIterator[None]:
+        """Acquire lock for key for the time of async with block."""
+        lock = self._enter(__key)
+        try:
+            async with lock:
+                yield
+        finally:
+            self._leave(__key)
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, Type
+
+from filelock import FileLock, Timeout
+
+__all__ = ["LockPool", "StripeLock", "TransientLock", "get_lock_pool"]
+
+
+DEFAULT_STRIPES = 64
+"""Default number of lock files in pool."""
+
+
+class StripeLock:
+    """Reentrant lock shared by all names hashed to the same stripe of
+    LockPool, combines in-process lock with lock file.
+
+    Threads of one process wait for each other on in-process lock, only the
+    thread which acquired it goes through lock file, to exclude other
+    processes. Interface follows FileLock, so it can be used in its place.
+
+    Parameters
+    ----------
+    lock_file : str | Path
+        path to lock file.
+    """
+
+    def __init__(self, lock_file: str | Path) -> None:
+        self._lock_file = Path(lock_file)
+        self._thread_lock = threading.RLock()
+        # in-process lock lets only one thread at time use file lock, so it
+        # can be shared between threads
+        self._file_lock = FileLock(self._lock_file, thread_local=False)
+
+    @property
+    def lock_file(self) -> str:
+        """Path to lock file."""
+        return str(self._lock_file)
+
+    @property
+    def is_locked(self) -> bool:
+        """True when lock is held by this process."""
+        return self._file_lock.is_locked
+
+    def acquire(self, timeout: float = -1) -> None:
+        """Acquire lock, waiting at most timeout seconds, negative timeout
+        waits forever.
+
+        Raises
+        ------
+        Timeout
+            when lock couldn't be acquired in time.
+        """
+        if timeout == 0:
+            acquired = self._thread_lock.acquire(blocking=False)
+        else:
+            acquired = self._thread_lock.acquire(timeout=timeout)
+        if not acquired:
+            raise Timeout(self.lock_file)
+        try:
+            self._file_lock.acquire(timeout=timeout)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+
+    def release(self) -> None:
+        """Release lock acquired with acquire()."""
+        try:
+            self._file_lock.release()
+        finally:
+            self._thread_lock.release()
+
+    def __enter__(self) -> StripeLock:
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        _exception_type: Optional[Type[BaseException]],
+        _exception_value: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+
+def _identity(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class TransientLock:
+    """Lock file which exists only while lock is held, it is removed on
+    release, so number of lock files doesn't grow with number of locked
+    names.
+
+    Process waiting for lock may acquire file which was removed meanwhile,
+    while other process created new one, therefore after acquiring, lock
+    file is checked to still be the one found at path before it was
+    opened, otherwise lock is released and acquired again. Not reentrant,
+    interface follows FileLock.
+
+    Parameters
+    ----------
+    lock_file : str | Path
+        path to lock file.
+    """
+
+    def __init__(self, lock_file: str | Path) -> None:
+        self._lock_file = Path(lock_file)
+        self._file_lock: Optional[FileLock] = None
+
+    @property
+    def lock_file(self) -> str:
+        """Path to lock file."""
+        return str(self._lock_file)
+
+    @property
+    def is_locked(self) -> bool:
+        """True when lock is held by this object."""
+        return self._file_lock is not None
+
+    def acquire(self, timeout: float = -1) -> None:
+        """Acquire lock, waiting at most timeout seconds, negative timeout
+        waits forever.
+
+        Raises
+        ------
+        Timeout
+            when lock couldn't be acquired in time.
+        """
+        deadline = None if timeout < 0 else time.monotonic() + timeout
+        while True:
+            identity = _identity(self._lock_file)
+            file_lock = FileLock(self._lock_file, thread_local=False)
+            file_lock.acquire(
+                timeout=-1
+                if deadline is None
+                else max(0.0, deadline - time.monotonic())
+            )
+            if identity is not None and identity == _identity(self._lock_file):
+                self._file_lock = file_lock
+                return
+            # file was created by this call or replaced, the one locked may
+            # be already removed by its previous holder
+            file_lock.release()
+
+    def release(self) -> None:
+        """Remove lock file and release lock acquired with acquire()."""
+        file_lock, self._file_lock = self._file_lock, None
+        assert file_lock is not None, "Lock is not held."
+        try:
+            # removed while still held, so processes waiting for it notice
+            # that file is gone after acquiring it
+            self._lock_file.unlink(missing_ok=True)
+        except OSError:  # pragma: no cover
+            # Windows doesn't remove open files, FileLock removes it there
+            pass
+        finally:
+            file_lock.release()
+
+    def __enter__(self) -> TransientLock:
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        _exception_type: Optional[Type[BaseException]],
+        _exception_value: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
+
+
+class LockPool:
+    """Fixed set of lock files kept in single directory, names are hashed
+    to one of them.
+
+    Number of lock files doesn't grow with number of locked names, at the
+    cost of unrelated names occasionally sharing lock. All processes using
+    the same directory must use the same number of stripes, otherwise they
+    won't exclude each other.
+
+    Parameters
+    ----------
+    directory : str | Path
+        directory for lock files, created when missing.
+    stripes : int, optional
+        number of lock files, by default DEFAULT_STRIPES.
+    prefix : str, optional
+        prefix of lock file names, lets several pools share directory,
+        by default "stripe".
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> pool = LockPool(tmp / ".locks", stripes=4)
+    >>> with pool.lock("some-name"):
+    ...     pass
+    ...
+    >>> sorted(path.name for path in (tmp / ".locks").iterdir())
+    ['stripe-002.lock']
+    >>>
+    ```
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        stripes: int = DEFAULT_STRIPES,
+        *,
+        prefix: str = "stripe",
+    ) -> None:
+        if stripes < 1:
+            raise ValueError(
+                f"Number of stripes must be positive, got {stripes}."
+            )
+        self._directory = Path(directory).absolute()
+        self._directory.mkdir(0o777, True, True)
+        self._stripes = [
+            StripeLock(self._directory / f"{prefix}-{index:03d}.lock")
+            for index in range(stripes)
+        ]
+        logging.debug(
+            "Created pool of %s locks in %s.", stripes, self._directory
+        )
+
+    @property
+    def stripes(self) -> int:
+        """Number of lock files in pool."""
+        return len(self._stripes)
+
+    def lock(self, name: str) -> StripeLock:
+        """Return lock for name, the same for every call with equal name."""
+        index = zlib.crc32(name.encode("utf-8")) % len(self._stripes)
+        return self._stripes[index]
+
+
+_POOLS: dict[tuple[Path, str, int], LockPool] = {}
+_POOLS_GUARD = threading.Lock()
+
+
+def get_lock_pool(
+    directory: str | Path,
+    stripes: int = DEFAULT_STRIPES,
+    *,
+    prefix: str = "stripe",
+) -> LockPool:
+    """Return LockPool for directory, shared by all callers in process, so
+    their threads coordinate through in-process locks.
+
+    Parameters
+    ----------
+    directory : str | Path
+        directory for lock files, created when missing.
+    stripes : int, optional
+        number of lock files, by default DEFAULT_STRIPES.
+    prefix : str, optional
+        prefix of lock file names, by default "stripe".
+
+    Returns
+    -------
+    LockPool
+        pool of locks.
+    """
+    key = (Path(directory).absolute(), prefix, stripes)
+    with _POOLS_GUARD:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = LockPool(key[0], stripes, prefix=prefix)
+        return pool
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import TypeVar
+from typing import Optional, TypeVar
 
 from .impl._filesystem import FilesystemStorage
+from .impl._memory import InMemoryStorage
+from .impl._packed import PackedStorage
+from .impl._sqlite import SQLiteStorage
+from .impl._tiered import Tier, TieredStorage
 
 __all__ = ["MagicStorage"]
 
@@ -52,3 +56,58 @@ class MagicStorage:
         fs = FilesystemStorage(__root)
         fs.configure(cache=None)
         return fs
+
+    def sqlite(self, __path: str | Path) -> SQLiteStorage:
+        """Return storage which keeps all objects in single SQLite database.
+
+        Parameters
+        ----------
+        __path : str | Path
+            Either database file or directory, when directory, database file
+            with default name in this directory will be used.
+
+        Returns
+        -------
+        SQLiteStorage
+            new storage object.
+        """
+        return SQLiteStorage(__path)
+
+    def packed(self, __root: str | Path) -> PackedStorage:
+        """Return storage which packs all objects into few segment files,
+        suitable for large number of small objects.
+
+        Parameters
+        ----------
+        __root : str | Path
+            Either directory or file, when file, its parent directory will be used.
+
+        Returns
+        -------
+        PackedStorage
+            new storage object.
+        """
+        return PackedStorage(__root)
+
+    def tiered(
+        self, __root: str | Path, capacity: Optional[int] = None
+    ) -> TieredStorage:
+        """Return storage which keeps recently used objects in memory, in
+        front of local cache storage.
+
+        Parameters
+        ----------
+        __root : str | Path
+            Either directory or file, when file, its parent directory will be used.
+        capacity : Optional[int], optional
+            maximal number of objects kept in memory, None for no limit,
+            by default None.
+
+        Returns
+        -------
+        TieredStorage
+            new storage object.
+        """
+        return TieredStorage(
+            Tier(InMemoryStorage(), capacity), FilesystemStorage(__root)
+        )
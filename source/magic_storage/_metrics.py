@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, NamedTuple, Optional
+
+from ._store_type import StoreType
+
+__all__ = [
+    "MetricsHook",
+    "Metrics",
+    "Histogram",
+    "Labels",
+    "hit_ratio",
+    "start_timer",
+    "current_timer",
+    "observe_lock_wait",
+]
+
+
+HASH = "hash"
+SERIALIZE = "serialize"
+COMPRESS = "compress"
+LOCK = "lock"
+IO = "io"
+TOTAL = "total"
+PHASES = (HASH, SERIALIZE, COMPRESS, LOCK, IO, TOTAL)
+"""Phases of operations, serialize and compress cover decoding and
+decompression for loads, total is duration of whole operation."""
+
+_BUCKETS: tuple[float, ...] = tuple(
+    1e-6 * 2.0**exponent for exponent in range(25)
+)
+# upper bounds of histogram buckets, from 1 microsecond to about 17 seconds
+
+
+class Labels(NamedTuple):
+    """Labels of measurement."""
+
+    operation: str
+    backend: str
+    store_type: Optional[StoreType] = None
+
+
+class MetricsHook:
+    """Receiver of measurements of storage operations, subclass it to
+    forward measurements to external metrics system.
+
+    Storages call increment() once per operation, with outcome "ok",
+    "error" or "cached" (load served by object cache), and observe() once
+    per phase of operation, with duration in seconds.
+    """
+
+    def increment(self, labels: Labels, outcome: str) -> None:
+        """Count finished operation."""
+
+    def observe(self, labels: Labels, phase: str, seconds: float) -> None:
+        """Record duration of phase of operation."""
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return measurements collected so far, included in stats() of
+        storages, empty for hooks which don't collect them."""
+        return {}
+
+
+class Histogram:
+    """Thread safe latency histogram with exponential buckets, from 1
+    microsecond to about 17 seconds.
+
+    Example
+    -------
+    ```
+    >>> histogram = Histogram()
+    >>> for seconds in (0.001, 0.002, 0.004):
+    ...     histogram.observe(seconds)
+    ...
+    >>> histogram.count, round(histogram.total, 3)
+    (3, 0.007)
+    >>> histogram.quantile(0.5) >= 0.002
+    True
+    >>>
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._counts = [0] * (len(_BUCKETS) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record single duration."""
+        index = bisect_left(_BUCKETS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Return upper bound of bucket containing q-quantile, 0 <= q <= 1,
+        exact maximum for the last bucket."""
+        with self._lock:
+            rank = q * self.count
+            seen = 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if count and seen >= rank:
+                    if index < len(_BUCKETS):
+                        return min(_BUCKETS[index], self.max)
+                    break
+            return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        """Return count, sum, mean, maximum and p50, p90, p99 estimates."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics(MetricsHook):
+    """MetricsHook which collects counters and latency histograms in memory,
+    per operation, backend, store type and phase.
+
+    One instance can be shared by many storages, they are told apart by
+    backend label, which is name of storage class.
+
+    Example
+    -------
+    ```
+    >>> from magic_storage import InMemoryStorage
+    >>> metrics = Metrics()
+    >>> storage = InMemoryStorage()
+    >>> storage.configure(metrics=metrics)
+    >>> _ = storage.store_json("EXAMPLE UID", {"foo": 32})
+    >>> snapshot = metrics.snapshot()
+    >>> snapshot["counters"]["store"]["InMemoryStorage"]["JSON"]
+    {'ok': 1}
+    >>> sorted(snapshot["latency"]["store"]["InMemoryStorage"]["JSON"])
+    ['hash', 'io', 'serialize', 'total']
+    >>>
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[Labels, str], int] = {}
+        self._histograms: dict[tuple[Labels, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, labels: Labels, outcome: str) -> None:
+        key = (labels, outcome)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def observe(self, labels: Labels, phase: str, seconds: float) -> None:
+        key = (labels, phase)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(seconds)
+
+    def histogram(self, labels: Labels, phase: str) -> Optional[Histogram]:
+        """Return histogram of phase, None when nothing was recorded."""
+        return self._histograms.get((labels, phase))
+
+    def reset(self) -> None:
+        """Drop all measurements."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return counters and histogram summaries, nested by operation,
+        backend, store type ("-" for operations not bound to one) and
+        outcome or phase."""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+        result: dict[str, Any] = {"counters": {}, "latency": {}}
+        for (labels, outcome), count in counters:
+            _nested(result["counters"], labels)[outcome] = count
+        for (labels, phase), histogram in histograms:
+            _nested(result["latency"], labels)[phase] = histogram.snapshot()
+        return result
+
+
+def _nested(tree: dict[str, Any], labels: Labels) -> dict[str, Any]:
+    store_type = "-" if labels.store_type is None else labels.store_type.name
+    for name in (labels.operation, labels.backend, store_type):
+        tree = tree.setdefault(name, {})
+    return tree
+
+
+def hit_ratio(hits: int, misses: int) -> float:
+    """Return fraction of lookups which were hits, 0 when there were none."""
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+class _Timer:
+    # Measures consecutive phases of single operation.
+
+    __slots__ = (
+        "_hook",
+        "_labels",
+        "_start",
+        "_last",
+        "_excluded",
+        "_outcome",
+    )
+
+    def __init__(self, hook: MetricsHook, labels: Labels) -> None:
+        self._hook = hook
+        self._labels = labels
+        self._start = self._last = time.perf_counter()
+        # time of phases measured separately within current one
+        self._excluded = 0.0
+        self._outcome: Optional[str] = None
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._hook.observe(
+            self._labels, phase, now - self._last - self._excluded
+        )
+        self._last = now
+        self._excluded = 0.0
+
+    def nested(self, phase: str, seconds: float) -> None:
+        self._hook.observe(self._labels, phase, seconds)
+        self._excluded += seconds
+
+    def mark(self, outcome: str) -> None:
+        # Overrides outcome of operation which succeeds.
+        self._outcome = outcome
+
+    def finish(self, outcome: str) -> None:
+        self._hook.observe(
+            self._labels, TOTAL, time.perf_counter() - self._start
+        )
+        if outcome == "ok" and self._outcome is not None:
+            outcome = self._outcome
+        self._hook.increment(self._labels, outcome)
+
+
+class _NullTimer:
+    # Used when storage has no metrics hook, does nothing.
+
+    __slots__ = ()
+
+    def lap(self, phase: str) -> None:
+        pass
+
+    def nested(self, phase: str, seconds: float) -> None:
+        pass
+
+    def mark(self, outcome: str) -> None:
+        pass
+
+    def finish(self, outcome: str) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+_CURRENT: ContextVar[_Timer | _NullTimer] = ContextVar(
+    "magic_storage_timer", default=_NULL_TIMER
+)
+
+
+class _Measurement:
+    # Context manager making timer current for its thread, so phases
+    # measured deep in storage, like lock waits, are attributed to it.
+
+    __slots__ = ("timer", "_token")
+
+    def __init__(self, timer: _Timer) -> None:
+        self.timer = timer
+
+    def __enter__(self) -> _Timer | _NullTimer:
+        self._token = _CURRENT.set(self.timer)
+        return self.timer
+
+    def __exit__(self, exc_type: Any, _exc: Any, _tb: Any) -> None:
+        _CURRENT.reset(self._token)
+        self.timer.finish("ok" if exc_type is None else "error")
+
+
+class _NullMeasurement:
+    # Shared by all operations of storages without metrics hook.
+
+    __slots__ = ()
+
+    def __enter__(self) -> _Timer | _NullTimer:
+        return _NULL_TIMER
+
+    def __exit__(self, exc_type: Any, _exc: Any, _tb: Any) -> None:
+        pass
+
+
+_NULL_MEASUREMENT = _NullMeasurement()
+
+
+def start_timer(
+    hook: Optional[MetricsHook],
+    operation: str,
+    backend: object,
+    store_type: Optional[StoreType] = None,
+) -> _Measurement | _NullMeasurement:
+    """Return context manager measuring operation, it yields timer whose
+    lap(phase) records time since previous lap, counts operation when it
+    exits and records its total time. Does nothing when hook is None."""
+    if hook is None:
+        return _NULL_MEASUREMENT
+    return _Measurement(
+        _Timer(hook, Labels(operation, type(backend).__name__, store_type))
+    )
+
+
+def current_timer() -> _Timer | _NullTimer:
+    """Return timer of operation measured in current thread, which does
+    nothing when there is none."""
+    return _CURRENT.get()
+
+
+def observe_lock_wait(seconds: float) -> None:
+    """Attribute time spent waiting for lock to operation measured in
+    current thread, it is excluded from phase in progress."""
+    _CURRENT.get().nested(LOCK, seconds)
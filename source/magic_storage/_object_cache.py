@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import copy
+import pickle
+import threading
+from typing import Any, Hashable, Iterable
+
+from cachetools import LRUCache
+
+__all__ = ["ObjectCache"]
+
+
+_IMMUTABLE = (str, bytes, int, float, bool, type(None))
+# Types of objects shared by all loads without copying.
+
+
+class _Snapshot:
+    # Pickled copy of cached object, unpickling it is much faster than
+    # deepcopy() of the object.
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+
+
+class ObjectCache:
+    """Cache of decoded objects, lets storage skip decompression and
+    deserialization when the same object is loaded repeatedly.
+
+    By default cache keeps pickled snapshot of every object and each load
+    unpickles its own copy, so callers can modify loaded objects. Strings,
+    bytes and numbers are immutable and are shared without copying, objects
+    which can't be pickled are deep copied. With copy=False cached object
+    itself is returned to every caller, which is faster, but callers must
+    treat loaded objects as read-only.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximal number of cached objects, least recently used are evicted
+        first, by default 256.
+    copy : bool, optional
+        when True, every load returns its own copy of cached object, by
+        default True.
+
+    Example
+    -------
+    ```
+    >>> cache = ObjectCache()
+    >>> token = cache.generation
+    >>> item = cache.put("key", {"foo": [1, 2]}, token)
+    >>> item["foo"].append(3)
+    >>> cache.get("key")
+    {'foo': [1, 2]}
+    >>>
+    ```
+    """
+
+    def __init__(self, maxsize: int = 256, *, copy: bool = True) -> None:
+        self._cache: LRUCache = LRUCache(maxsize)
+        self._copy = copy
+        self._lock = threading.Lock()
+        # incremented on every invalidation, so object decoded from payload
+        # which was overwritten meanwhile is not put in cache
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def generation(self) -> int:
+        """Token which has to be taken before reading payload and passed to
+        put() after decoding it."""
+        return self._generation
+
+    def _snapshot(self, item: Any) -> Any:
+        if not self._copy or isinstance(item, _IMMUTABLE):
+            return item
+        try:
+            return _Snapshot(pickle.dumps(item, pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            # deep copied on every load instead
+            return item
+
+    def _export(self, cached: Any) -> Any:
+        if isinstance(cached, _Snapshot):
+            return pickle.loads(cached.payload)
+        if not self._copy or isinstance(cached, _IMMUTABLE):
+            return cached
+        return copy.deepcopy(cached)
+
+    def get(self, key: Hashable) -> Any:
+        """Return cached object, raises KeyError when it's not cached."""
+        with self._lock:
+            try:
+                item = self._cache[key]
+            except KeyError:
+                self.misses += 1
+                raise
+            self.hits += 1
+        return self._export(item)
+
+    def put(self, key: Hashable, item: Any, generation: int) -> Any:
+        """Cache decoded object, unless cache was invalidated since generation
+        was taken, and return object which should be given to caller."""
+        cached = self._snapshot(item)
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = cached
+            else:
+                return item
+        if cached is item:
+            return self._export(item)
+        # cache holds only snapshot, so decoded object isn't shared
+        return item
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drop cached objects for keys."""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached objects."""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return hit and miss counters together with number of cached
+        objects."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def __len__(self) -> int:
+        return len(self._cache)
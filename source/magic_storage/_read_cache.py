@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from cachetools import TTLCache
+
+__all__ = ["ReadCache", "DEFAULT_CACHE_BYTES"]
+
+
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+"""Default budget of ReadCache, 32 MiB."""
+
+
+def _payload_size(value: Any) -> int:
+    # Size of raw payload, characters are counted for text.
+    return len(value)
+
+
+class ReadCache(TTLCache):
+    """Cache of raw payloads read from storage, limited by total size of
+    payloads instead of number of entries.
+
+    Least recently used entries are evicted when budget is exceeded,
+    optionally entries also expire after ttl seconds, which bounds staleness
+    when storage is modified by other processes. Storages invalidate entries
+    on every write and delete done through them.
+
+    Parameters
+    ----------
+    max_bytes : int, optional
+        total size of cached payloads, in bytes (in characters for text), by
+        default DEFAULT_CACHE_BYTES. Single payload bigger than budget is
+        never cached.
+    ttl : Optional[float], optional
+        time in seconds after which entry expires, None disables expiration,
+        by default None.
+    timer : Callable[[], float], optional
+        clock used for expiration, by default time.monotonic.
+
+    Example
+    -------
+    ```
+    >>> cache = ReadCache(max_bytes=8)
+    >>> cache["a"] = b"1234"
+    >>> cache["b"] = b"5678"
+    >>> cache["a"]
+    b'1234'
+    >>> cache["c"] = b"90"
+    >>> "b" in cache
+    False
+    >>> cache.hits, cache.misses, cache.evictions
+    (1, 0, 1)
+    >>>
+    ```
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(
+            max_bytes,
+            math.inf if ttl is None else ttl,
+            timer=timer,
+            getsizeof=_payload_size,
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # cachetools looks up evicted item, which is not a hit
+        self._evicting = False
+
+    def __getitem__(self, key: Hashable) -> Any:
+        if self._evicting:
+            return super().__getitem__(key)
+        try:
+            value = super().__getitem__(key)
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        try:
+            super().__setitem__(key, value)
+        except ValueError:
+            # value is bigger than whole budget, just don't cache it
+            pass
+
+    def popitem(self) -> tuple[Hashable, Any]:
+        # Called by cachetools only to make room for new entries.
+        self._evicting = True
+        try:
+            item: tuple[Hashable, Any] = super().popitem()
+        finally:
+            self._evicting = False
+        self.evictions += 1
+        return item
+
+    def stats(self) -> dict[str, int]:
+        """Return hit, miss and eviction counters together with current size
+        of cached payloads."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "bytes": self.currsize,
+        }
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import json
+import pickle
+from typing import Any, Callable
+
+from ._compression import Codec
+from ._store_type import StoreType
+from ._utils import compress, decompress
+
+__all__ = [
+    "encode",
+    "decode",
+    "serialize",
+    "deserialize",
+    "compress_payload",
+    "decompress_payload",
+]
+
+
+def _encode_text(item: Any, _codec: Codec, **str_kw: Any) -> str:
+    raw_value = str(item, **str_kw)
+    assert isinstance(raw_value, str), raw_value
+    return raw_value
+
+
+def _encode_json(item: Any, _codec: Codec, **json_dumps_kw: Any) -> str:
+    try:
+        raw_value = json.dumps(item, **json_dumps_kw)
+    except TypeError:
+        if hasattr(item, "json") and callable(item.json):
+            raw_value = item.json()
+        else:
+            raise
+    assert isinstance(raw_value, str), raw_value
+    return raw_value
+
+
+def _encode_bytes(item: Any, _codec: Codec, **bytes_kw: Any) -> bytes:
+    raw_value = bytes(item, **bytes_kw)
+    assert isinstance(raw_value, bytes), raw_value
+    return raw_value
+
+
+def _serialize_pickle(item: Any, **pickle_dump_kw: Any) -> bytes:
+    raw_value = pickle.dumps(item, **pickle_dump_kw)
+    assert isinstance(raw_value, bytes)
+    return raw_value
+
+
+def _encode_pickle(item: Any, codec: Codec, **pickle_dump_kw: Any) -> bytes:
+    raw_value = compress(_serialize_pickle(item, **pickle_dump_kw), codec)
+    assert isinstance(raw_value, bytes), raw_value
+    return raw_value
+
+
+_ENCODE_MAP: dict[StoreType, Callable[..., str | bytes]] = {
+    StoreType.TEXT: _encode_text,
+    StoreType.BINARY: _encode_bytes,
+    StoreType.JSON: _encode_json,
+    StoreType.PICKLE: _encode_pickle,
+}
+
+
+def encode(
+    store_type: StoreType, item: Any, codec: Codec, **dump_kw: Any
+) -> str | bytes:
+    """Convert item to payload which can be written to storage.
+
+    Parameters
+    ----------
+    store_type : StoreType
+        store type from enum, for text store types str is returned,
+        otherwise bytes.
+    item : Any
+        item to convert, constraints depend on storage type.
+    codec : Codec
+        codec used to compress binary payloads which are compressed.
+    **dump_kw : Any
+        keyword arguments passed to underlying serializer.
+
+    Returns
+    -------
+    str | bytes
+        payload.
+    """
+    return _ENCODE_MAP[store_type](item, codec, **dump_kw)
+
+
+def serialize(store_type: StoreType, item: Any, **dump_kw: Any) -> str | bytes:
+    """Convert item to payload like encode(), but without compressing it,
+    for store types which are compressed.
+
+    Parameters
+    ----------
+    store_type : StoreType
+        store type from enum, for text store types str is returned,
+        otherwise bytes.
+    item : Any
+        item to convert, constraints depend on storage type.
+    **dump_kw : Any
+        keyword arguments passed to underlying serializer.
+
+    Returns
+    -------
+    str | bytes
+        uncompressed payload.
+    """
+    if store_type is StoreType.PICKLE:
+        return _serialize_pickle(item, **dump_kw)
+    return _ENCODE_MAP[store_type](item, None, **dump_kw)
+
+
+def compress_payload(
+    store_type: StoreType, raw_value: str | bytes, codec: Codec
+) -> str | bytes:
+    """Compress payload returned by serialize(), when store type is
+    compressed, encode() is serialize() followed by compress_payload()."""
+    if store_type is StoreType.PICKLE:
+        assert isinstance(raw_value, bytes)
+        return compress(raw_value, codec)
+    return raw_value
+
+
+def decompress_payload(
+    store_type: StoreType, raw_value: str | bytes
+) -> str | bytes:
+    """Reverse compress_payload(), decode() is decompress_payload() followed
+    by deserialize()."""
+    if store_type is StoreType.PICKLE:
+        assert isinstance(raw_value, bytes)
+        return decompress(raw_value)
+    return raw_value
+
+
+def _decode_text(raw_value: str | bytes) -> str:
+    assert isinstance(raw_value, str)
+    return raw_value
+
+
+def _decode_json(raw_value: str | bytes, **load_kw: Any) -> Any:
+    assert isinstance(raw_value, str)
+    return json.loads(raw_value, **load_kw)
+
+
+def _decode_bytes(raw_value: str | bytes) -> bytes:
+    assert isinstance(raw_value, bytes), raw_value
+    return raw_value
+
+
+def _decode_pickle(raw_value: str | bytes, **pickle_load_kw: Any) -> Any:
+    assert isinstance(raw_value, bytes)
+
+    source = decompress(raw_value)
+    assert isinstance(source, bytes)
+
+    return pickle.loads(source, **pickle_load_kw)
+
+
+_DECODE_MAP: dict[StoreType, Callable[..., Any]] = {
+    StoreType.TEXT: _decode_text,
+    StoreType.BINARY: _decode_bytes,
+    StoreType.JSON: _decode_json,
+    StoreType.PICKLE: _decode_pickle,
+}
+
+
+def decode(
+    store_type: StoreType, raw_value: str | bytes, **load_kw: Any
+) -> Any:
+    """Convert payload read from storage back to item.
+
+    Parameters
+    ----------
+    store_type : StoreType
+        store type from enum, must be the same as used with encode().
+    raw_value : str | bytes
+        payload returned by encode().
+    **load_kw : Any
+        keyword arguments passed to underlying deserializer.
+
+    Returns
+    -------
+    Any
+        item.
+    """
+    return _DECODE_MAP[store_type](raw_value, **load_kw)
+
+
+def deserialize(
+    store_type: StoreType, raw_value: str | bytes, **load_kw: Any
+) -> Any:
+    """Convert payload returned by serialize() back to item, like decode(),
+    but without decompressing it."""
+    if store_type is StoreType.PICKLE:
+        assert isinstance(raw_value, bytes)
+        return pickle.loads(raw_value, **load_kw)
+    return _DECODE_MAP[store_type](raw_value, **load_kw)
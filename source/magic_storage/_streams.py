@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import io
+import logging
+from pathlib import Path
+from types import TracebackType
+from typing import IO, Callable, Optional, Type
+
+from ._atomic_file import AtomicFile
+from ._compression import Codec, Compressor, Decompressor, make_header
+from ._durability import fsync_file
+
+__all__ = ["PayloadWriter", "PayloadReader", "CHUNK_SIZE"]
+
+
+CHUNK_SIZE = 1024 * 1024
+"""Amount of data buffered before it is compressed and written to disk, and
+read from disk at once."""
+
+
+class PayloadWriter(io.BufferedIOBase):
+    """Binary stream writing payload to temporary file, which replaces
+    target file when stream is closed.
+
+    Data is compressed incrementally, in chunks of CHUNK_SIZE, so peak
+    memory usage doesn't depend on payload size. When used as context
+    manager and exception is raised, payload is discarded and target file
+    is left untouched.
+
+    Parameters
+    ----------
+    target : AtomicFile
+        file replaced with payload on close().
+    codec : Optional[Codec]
+        codec used to compress payload, header naming it is written first,
+        when None, data is written as is.
+    on_commit : Optional[Callable[[], None]], optional
+        called after target file was replaced, by default None.
+    fsync : bool, optional
+        sync payload to disk before it replaces target file, by default
+        False.
+    """
+
+    def __init__(
+        self,
+        target: AtomicFile,
+        codec: Optional[Codec],
+        on_commit: Optional[Callable[[], None]] = None,
+        *,
+        fsync: bool = False,
+    ) -> None:
+        super().__init__()
+        self._target = target
+        self._on_commit = on_commit
+        self._fsync = fsync
+        self._temp = target.open_staged()
+        self._buffer = bytearray()
+        self._compressor: Optional[Compressor] = None
+        if codec is not None:
+            self._compressor = codec.compressor()
+            self._temp.write(make_header(codec))
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        view = memoryview(data).cast("B")
+        size = len(view)
+        if len(self._buffer) + size < CHUNK_SIZE:
+            self._buffer += view
+            return size
+        # Only small pieces are buffered, large data is compressed in
+        # slices of CHUNK_SIZE without being copied.
+        if self._buffer:
+            taken = CHUNK_SIZE - len(self._buffer)
+            self._buffer += view[:taken]
+            self._write_buffer()
+            view = view[taken:]
+        while len(view) >= CHUNK_SIZE:
+            self._write_chunk(view[:CHUNK_SIZE])
+            view = view[CHUNK_SIZE:]
+        self._buffer += view
+        return size
+
+    def _write_buffer(self) -> None:
+        self._write_chunk(self._buffer)
+        self._buffer.clear()
+
+    def _write_chunk(self, chunk: bytearray | memoryview) -> None:
+        if self._compressor is not None:
+            self._temp.write(self._compressor.compress(chunk))
+        else:
+            self._temp.write(chunk)
+
+    def close(self) -> None:
+        """Write remaining data and replace target file with payload."""
+        if self.closed:
+            return
+        try:
+            self._write_buffer()
+            if self._compressor is not None:
+                self._temp.write(self._compressor.flush())
+            if self._fsync:
+                fsync_file(self._temp)
+            self._temp.close()
+            with self._target as file:
+                file.commit(self._temp.name)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            super().close()
+        logging.debug("Committed stream written to %s.", self._temp.name)
+        if self._on_commit is not None:
+            self._on_commit()
+
+    def abort(self) -> None:
+        """Discard payload, target file is left untouched."""
+        if self.closed:
+            return
+        try:
+            self._discard()
+        finally:
+            super().close()
+
+    def __del__(self) -> None:
+        # Stream which was never closed is incomplete, it must not replace
+        # target file, unlike io.IOBase which closes it.
+        self.abort()
+
+    def _discard(self) -> None:
+        self._temp.close()
+        Path(self._temp.name).unlink(missing_ok=True)
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        _exception_value: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        if exception_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class PayloadReader(io.RawIOBase):
+    """Binary stream decompressing payload incrementally while it is read.
+
+    Usually wrapped with io.BufferedReader, which provides efficient
+    readline() and peek() required by pickle.load().
+
+    Parameters
+    ----------
+    file : IO[bytes]
+        source file, closed together with stream.
+    decompressor : Optional[Decompressor]
+        decompressor for rest of the file, when None, data is read as is.
+    initial : bytes, optional
+        data decompressed before stream was created, returned first, by
+        default b"".
+    """
+
+    def __init__(
+        self,
+        file: IO[bytes],
+        decompressor: Optional[Decompressor],
+        initial: bytes = b"",
+    ) -> None:
+        super().__init__()
+        self._file = file
+        self._decompressor = decompressor
+        self._pending = bytearray(initial)
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        while not self._pending and not self._eof:
+            self._fill()
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        del self._pending[:size]
+        return size
+
+    def _fill(self) -> None:
+        chunk = self._file.read(CHUNK_SIZE)
+        if self._decompressor is None:
+            self._eof = not chunk
+            self._pending += chunk
+        elif chunk:
+            self._pending += self._decompressor.decompress(chunk)
+        else:
+            self._eof = True
+            self._pending += self._decompressor.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file.close()
+        super().close()
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import cProfile
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from types import TracebackType
+from typing import Any, ContextManager, Optional, Protocol, Type
+
+from ._store_type import StoreType
+
+__all__ = [
+    "Tracer",
+    "Span",
+    "ProfileCapture",
+    "set_tracer",
+    "get_tracer",
+    "span",
+]
+
+
+class Span(Protocol):
+    """Span of traced operation, subset of OpenTelemetry Span interface."""
+
+    def set_attribute(self, key: str, value: Any) -> Any:
+        ...
+
+
+class Tracer(Protocol):
+    """Receiver of spans, subset of OpenTelemetry Tracer interface, so
+    tracer from opentelemetry.trace.get_tracer() can be used directly."""
+
+    def start_as_current_span(
+        self, name: str, *, attributes: Optional[dict[str, Any]] = None
+    ) -> ContextManager[Span]:
+        ...
+
+
+class _NullSpan:
+    # Returned when there is no tracer, shared by all calls.
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Install tracer receiving spans of all storages in process, None
+    disables tracing, which is the default.
+
+    Spans are named "magic_storage.<operation>", operations are load, store,
+    delete, cache_if_missing, lock, compress and decompress.
+
+    Parameters
+    ----------
+    tracer : Optional[Tracer]
+        OpenTelemetry compatible tracer, eg. ProfileCapture.
+
+    Returns
+    -------
+    Optional[Tracer]
+        previously installed tracer.
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    logging.debug("Changed tracer to %s.", tracer)
+    return previous
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return installed tracer, None when tracing is disabled."""
+    return _tracer
+
+
+def span(
+    name: str,
+    backend: object = None,
+    store_type: Optional[StoreType] = None,
+    **attributes: Any,
+) -> ContextManager[Span]:
+    """Return context manager tracing operation, it yields span, which
+    accepts additional attributes. When there is no tracer, shared no-op
+    object is returned.
+
+    Parameters
+    ----------
+    name : str
+        name of span.
+    backend : object, optional
+        storage performing operation, its class name is recorded as
+        "backend" attribute, by default None.
+    store_type : Optional[StoreType], optional
+        store type of object, recorded as "store_type" attribute, by
+        default None.
+    **attributes : Any
+        other attributes.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    if backend is not None:
+        attributes["backend"] = type(backend).__name__
+    if store_type is not None:
+        attributes["store_type"] = store_type.name
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+class _Record:
+    # Profile of single operation retained by ProfileCapture.
+
+    __slots__ = ("name", "attributes", "duration", "profile", "peak_memory")
+
+    def __init__(
+        self,
+        name: str,
+        attributes: dict[str, Any],
+        duration: float,
+        profile: Optional[cProfile.Profile],
+        peak_memory: Optional[int],
+    ) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.duration = duration
+        self.profile = profile
+        self.peak_memory = peak_memory
+
+
+class _ProfiledSpan:
+    # Profiles operation when it is the outermost one in its thread.
+
+    def __init__(
+        self,
+        capture: ProfileCapture,
+        name: str,
+        attributes: dict[str, Any],
+    ) -> None:
+        self._capture = capture
+        self._name = name
+        self._attributes = attributes
+        self._profile: Optional[cProfile.Profile] = None
+        self._outermost = False
+        self._start = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._attributes[key] = value
+
+    def __enter__(self) -> _ProfiledSpan:
+        state = self._capture._local
+        self._outermost = not getattr(state, "active", False)
+        if not self._outermost:
+            return self
+        state.active = True
+        if self._capture._memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # pragma: no cover
+            # other profiler is active, operation is only timed
+            pass
+        else:
+            self._profile = profile
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        _exception_type: Optional[Type[BaseException]],
+        _exception_value: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        if not self._outermost:
+            return
+        duration = time.perf_counter() - self._start
+        if self._profile is not None:
+            self._profile.disable()
+        peak_memory = None
+        if self._capture._memory and tracemalloc.is_tracing():
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        self._capture._local.active = False
+        self._capture._offer(
+            _Record(
+                self._name,
+                self._attributes,
+                duration,
+                self._profile,
+                peak_memory,
+            )
+        )
+
+
+class ProfileCapture:
+    """Tracer which profiles storage operations with cProfile and keeps
+    profiles of the slowest ones, optionally with peak memory allocated
+    during operation, measured with tracemalloc.
+
+    Only the outermost operation of every thread is profiled, eg.
+    cache_if_missing() together with loads and stores it does. Used as
+    context manager, it installs itself as tracer and writes profiles to
+    directory on exit, one ".prof" file per operation, readable with
+    pstats or snakeviz, and "summary.txt" listing them.
+
+    Profiling slows operations down several times, it is meant for finding
+    where time goes, not for production. Peak memory is shared by all
+    threads, it is exact only for single threaded programs.
+
+    Parameters
+    ----------
+    directory : Optional[str | Path], optional
+        directory for profiles, created when missing, when None, profiles
+        are only kept in memory, see records(), by default None.
+    slowest : int, optional
+        number of slowest operations which are kept, by default 10.
+    memory : bool, optional
+        measure peak memory with tracemalloc, started when it is not
+        tracing already, by default False.
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> from magic_storage import InMemoryStorage
+    >>> storage = InMemoryStorage()
+    >>> with ProfileCapture(tmp / "profiles", slowest=2) as capture:
+    ...     for index in range(5):
+    ...         _ = storage.store_json(str(index), {"foo": index})
+    ...
+    >>> len(capture.records())
+    2
+    >>> sorted(path.suffix for path in (tmp / "profiles").iterdir())
+    ['.prof', '.prof', '.txt']
+    >>>
+    ```
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str | Path] = None,
+        *,
+        slowest: int = 10,
+        memory: bool = False,
+    ) -> None:
+        if slowest < 1:
+            raise ValueError(f"slowest must be positive, got {slowest}.")
+        self._directory = None if directory is None else Path(directory)
+        self._slowest = slowest
+        self._memory = memory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # min-heap, the fastest of retained operations is replaced first
+        self._heap: list[tuple[float, int, _Record]] = []
+        self._counter = itertools.count()
+        self._previous: Optional[Tracer] = None
+        self._started_tracemalloc = False
+
+    def start_as_current_span(
+        self, name: str, *, attributes: Optional[dict[str, Any]] = None
+    ) -> _ProfiledSpan:
+        """Return span profiling operation, see Tracer."""
+        return _ProfiledSpan(self, name, dict(attributes or {}))
+
+    def _offer(self, record: _Record) -> None:
+        entry = (record.duration, next(self._counter), record)
+        with self._lock:
+            if len(self._heap) < self._slowest:
+                heapq.heappush(self._heap, entry)
+            elif record.duration > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def records(self) -> list[dict[str, Any]]:
+        """Return retained operations, the slowest first, with name,
+        attributes, duration in seconds and peak memory in bytes (None when
+        not measured)."""
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        return [
+            {
+                "name": record.name,
+                "attributes": record.attributes,
+                "duration": record.duration,
+                "peak_memory": record.peak_memory,
+                "profile": record.profile,
+            }
+            for _, _, record in entries
+        ]
+
+    def dump(self, directory: str | Path) -> list[Path]:
+        """Write profiles of retained operations and summary to directory.
+
+        Returns
+        -------
+        list[Path]
+            paths to profiles, the slowest first.
+        """
+        directory = Path(directory)
+        directory.mkdir(0o777, True, True)
+        paths = []
+        lines = []
+        for rank, record in enumerate(self.records(), 1):
+            name = re.sub(r"[^\w.-]", "_", record["name"])
+            duration_ms = record["duration"] * 1000
+            line = f"{rank:>3} {duration_ms:>12.3f} ms  {record['name']}"
+            if record["peak_memory"] is not None:
+                line += f"  peak {record['peak_memory']} B"
+            lines.append(f"{line}  {record['attributes']}")
+            if record["profile"] is None:  # pragma: no cover
+                continue
+            path = directory / f"{rank:03d}-{name}-{duration_ms:.3f}ms.prof"
+            record["profile"].dump_stats(path)
+            paths.append(path)
+        (directory / "summary.txt").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+        logging.debug("Wrote %s profiles to %s.", len(paths), directory)
+        return paths
+
+    def __enter__(self) -> ProfileCapture:
+        if self._memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = set_tracer(self)
+        return self
+
+    def __exit__(
+        self,
+        _exception_type: Optional[Type[BaseException]],
+        _exception_value: Optional[BaseException],
+        _traceback: Optional[TracebackType],
+    ) -> None:
+        set_tracer(self._previous)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        if self._directory is not None:
+            self.dump(self._directory)
@@ -1,53 +1,97 @@
 from __future__ import annotations
 
-import lzma
+from concurrent.futures import Executor
 from hashlib import sha256
 from random import random
-from typing import Any
+from typing import Any, Callable, Iterable, Optional, TypeVar
 
-from cachetools import RRCache, cached
+from ._compression import DEFAULT_CODEC, Codec, get_codec, pack, unpack
+from ._key import StorageKey
+from ._tracing import span
 
 __all__ = [
     "make_uid",
     "decompress",
     "compress",
     "get_random_sha256",
+    "map_in_order",
 ]
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
 
-LZMA_KWARGS: dict[str, Any] = {
-    "format": lzma.FORMAT_XZ,
-    "check": lzma.CHECK_CRC64,
-    "preset": 6,
-    "filters": None,
-}
 
-
-@cached(cache=RRCache(maxsize=64))
-def make_uid(supports_str: Any) -> str:
-    raw_uid = str(supports_str)
-    assert isinstance(raw_uid, str)
-
-    clean_uid = sha256(raw_uid.encode("utf-8")).hexdigest()
-    assert isinstance(clean_uid, str)
-
-    return clean_uid
+def make_uid(supports_str: Any) -> StorageKey:
+    return StorageKey.from_uid(supports_str)
 
 
 def decompress(ob: bytes | bytearray) -> bytes:
-    return lzma.decompress(
-        ob,
-        format=LZMA_KWARGS["format"],
-        filters=LZMA_KWARGS["filters"],
-    )
+    with span("magic_storage.decompress", size=len(ob)):
+        return unpack(ob)
 
 
-def compress(ob: bytes | bytearray) -> bytes:
-    return lzma.compress(
-        ob,
-        **LZMA_KWARGS,
-    )
+def compress(
+    ob: bytes | bytearray, codec: Optional[str | Codec] = None
+) -> bytes:
+    codec = get_codec(codec if codec is not None else DEFAULT_CODEC)
+    with span("magic_storage.compress", codec=codec.spec, size=len(ob)):
+        return pack(codec, ob)
 
 
 def get_random_sha256() -> str:
     return sha256(str(random()).encode("utf-8")).hexdigest()
+
+
+def map_in_order(
+    func: Callable[[_T], _R],
+    items: Iterable[_T],
+    executor: Optional[Executor] = None,
+    *,
+    return_exceptions: bool = False,
+) -> list[_R | Exception]:
+    """Call func for every item, optionally in executor, and return results
+    in order of items.
+
+    Parameters
+    ----------
+    func : Callable[[_T], _R]
+        function to call.
+    items : Iterable[_T]
+        arguments for function calls.
+    executor : Optional[Executor], optional
+        executor to run calls in, when None, calls are done in current
+        thread, by default None.
+    return_exceptions : bool, optional
+        when True, exception raised by call is placed in result list instead
+        of being propagated, by default False.
+
+    Returns
+    -------
+    list[_R | Exception]
+        results of calls.
+    """
+    results: list[_R | Exception] = []
+
+    if executor is None:
+        for item in items:
+            try:
+                results.append(func(item))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    futures = [executor.submit(func, item) for item in items]
+    try:
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+    finally:
+        for future in futures:
+            future.cancel()
+    return results
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import weakref
+from typing import (
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    TypeVar,
+)
+
+__all__ = ["WriteBehindQueue", "DEFAULT_QUEUE_SIZE"]
+
+
+DEFAULT_QUEUE_SIZE = 1024
+"""Default maximal number of pending writes."""
+
+_V = TypeVar("_V")
+
+_QUEUES: weakref.WeakSet[WriteBehindQueue] = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all() -> None:  # pragma: no cover
+    for queue in list(_QUEUES):
+        try:
+            queue.close()
+        except Exception as e:
+            logging.exception(e)
+
+
+class WriteBehindQueue(Generic[_V]):
+    """Bounded queue of pending writes, which are performed by background
+    thread in order they were queued.
+
+    Only the most recent value queued for key is written, value queued
+    while older one is pending replaces it. Pending values remain
+    accessible with get() until they are written. When queue is full, put()
+    waits for worker to make room. Queues which were not closed are
+    flushed at interpreter exit.
+
+    Parameters
+    ----------
+    write : Callable[[Hashable, _V], None]
+        called by worker thread to persist value.
+    maxsize : int, optional
+        maximal number of pending writes, by default DEFAULT_QUEUE_SIZE.
+
+    Example
+    -------
+    ```
+    >>> written = {}
+    >>> queue = WriteBehindQueue(written.__setitem__)
+    >>> queue.put("key", "value")
+    >>> queue.flush()
+    >>> written
+    {'key': 'value'}
+    >>> queue.close()
+    >>>
+    ```
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Hashable, _V], None],
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError(f"Queue size must be positive, got {maxsize}.")
+        self._write = write
+        self._maxsize = maxsize
+        self._entries: dict[Hashable, tuple[_V]] = {}
+        self._in_flight: Optional[Hashable] = None
+        self._errors: list[Exception] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        _QUEUES.add(self)
+
+    def put(self, key: Hashable, value: _V) -> None:
+        """Queue value to be written, waits when queue is full.
+
+        Raises
+        ------
+        RuntimeError
+            when queue was closed.
+        """
+        with self._cond:
+            while len(self._entries) >= self._maxsize and (
+                key not in self._entries
+            ):
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("Can't write through closed queue.")
+            # moved to the end, older value is never written
+            self._entries.pop(key, None)
+            # wrapped, so worker can tell whether value was replaced
+            self._entries[key] = (value,)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="WriteBehindQueue", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify_all()
+
+    def get(self, key: Hashable) -> _V:
+        """Return pending value, raises KeyError when there is none."""
+        with self._cond:
+            return self._entries[key][0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._cond:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._entries)
+
+    def discard(self, keys: Iterable[Hashable]) -> None:
+        """Drop pending values, eg. when they are overwritten or deleted,
+        waits for ones which are being written at the moment."""
+        keys = set(keys)
+        with self._cond:
+            for key in keys:
+                self._entries.pop(key, None)
+            while self._in_flight in keys:
+                self._cond.wait()
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Wait until all pending values are written.
+
+        Raises
+        ------
+        Exception
+            first exception raised by write since last flush, values which
+            failed to be written are dropped.
+        """
+        with self._cond:
+            while self._entries:
+                self._cond.wait()
+            errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Write pending values and stop worker thread, see flush()."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        _QUEUES.discard(self)
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._entries and not self._closed:
+                    self._cond.wait()
+                if not self._entries:
+                    return
+                key, entry = next(iter(self._entries.items()))
+                self._in_flight = key
+
+            try:
+                self._write(key, entry[0])
+            except Exception as e:
+                logging.exception(e)
+                with self._cond:
+                    self._errors.append(e)
+
+            with self._cond:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                self._in_flight = None
+                self._cond.notify_all()
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from ._async_storage_io import AsyncStorageIOBase
 from ._deleter import DeleterBase
 from ._reader import ReaderBase
 from ._storage_io import StorageIOBase
 from ._writer import WriterBase
 
-__all__ = ["StorageIOBase", "ReaderBase", "WriterBase", "DeleterBase"]
+__all__ = [
+    "StorageIOBase",
+    "ReaderBase",
+    "WriterBase",
+    "DeleterBase",
+    "AsyncStorageIOBase",
+]
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Iterable, Mapping, Optional, TypeVar
+
+from magic_storage._compression import DEFAULT_CODEC, Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._serialization import decode, encode
+from magic_storage._store_type import StoreType
+
+__all__ = ["AsyncStorageIOBase"]
+
+_R = TypeVar("_R")
+
+
+class AsyncStorageIOBase(ABC):
+    """Asynchronous counterpart of StorageIOBase.
+
+    Provides coroutine variants of all reading, writing and deleting
+    methods of ReaderBase, WriterBase and DeleterBase. Implementations
+    provide asynchronous _is_available(), _read_text(), _read_bytes(),
+    _write_text(), _write_bytes() and _delete() hooks and may override
+    _run() to move blocking work (serialization, compression) off the
+    event loop.
+    """
+
+    _codec: Codec = get_codec(DEFAULT_CODEC)
+
+    async def _run(self, __func: Callable[..., _R], /, *args: Any) -> _R:
+        # Runs blocking function, by default in event loop thread.
+        return __func(*args)
+
+    def configure(self) -> None:
+        """Configure resource storage access."""
+
+    async def is_available(self, __uid: str, /) -> bool:
+        """Check if object with specified identifier is present in cache.
+
+        Parameters
+        ----------
+        uid : str
+            object unique identifier.
+
+        Returns
+        -------
+        bool
+            True when object is present, False otherwise.
+        """
+        key = StorageKey.from_uid(__uid)
+
+        status = await self._is_available(key)
+        logging.debug("Availability status of %s is %s.", key, status)
+
+        return status
+
+    @abstractmethod
+    async def _is_available(self, __key: StorageKey, /) -> bool:
+        ...
+
+    async def is_available_many(self, __uids: Iterable[str], /) -> list[bool]:
+        """Check availability of multiple objects at once.
+
+        Parameters
+        ----------
+        __uids : Iterable[str]
+            object unique identifiers.
+
+        Returns
+        -------
+        list[bool]
+            availability status for each identifier, in the same order.
+        """
+        return list(
+            await asyncio.gather(*(self.is_available(uid) for uid in __uids))
+        )
+
+    async def load_as(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        uid: str,
+        **load_kw: Any,
+    ) -> Any:
+        """Load object from cache in format selected by parameter store_as.
+
+        Parameters
+        ----------
+        store_type : StoreType, optional
+            store type from enum.
+        uid : str
+            object unique identifier.
+
+        Returns
+        -------
+        Any
+            Loaded object.
+        """
+        key = StorageKey.from_uid(uid)
+        logging.debug("Loading '%s' as %s.", key, store_type)
+
+        if store_type.is_text():
+            raw_value: str | bytes = await self._read_text(key)
+        else:
+            raw_value = await self._read_bytes(key)
+        retval = await self._run(
+            lambda: decode(store_type, raw_value, **load_kw)
+        )
+
+        logging.debug("Successfully loaded %s as %s", key, store_type)
+        return retval
+
+    async def load_many(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        uids: Iterable[str],
+        *,
+        return_exceptions: bool = False,
+        **load_kw: Any,
+    ) -> list[Any]:
+        """Load multiple objects concurrently, all in format selected by
+        parameter store_type.
+
+        Parameters
+        ----------
+        store_type : StoreType
+            store type from enum.
+        uids : Iterable[str]
+            object unique identifiers.
+        return_exceptions : bool, optional
+            when True, exception raised while loading object is placed in
+            result list instead of being propagated, by default False.
+
+        Returns
+        -------
+        list[Any]
+            loaded objects, in the same order as identifiers.
+        """
+        return list(
+            await asyncio.gather(
+                *(self.load_as(store_type, uid, **load_kw) for uid in uids),
+                return_exceptions=return_exceptions,
+            )
+        )
+
+    @abstractmethod
+    async def _read_text(self, __key: StorageKey, /) -> str:
+        ...
+
+    @abstractmethod
+    async def _read_bytes(self, __key: StorageKey, /) -> bytes:
+        ...
+
+    async def load_text(self, uid: str, **load_kw: Any) -> Any:  # noqa: FNE004
+        """Load object with specified identifier as text."""
+        return await self.load_as(StoreType.TEXT, uid, **load_kw)
+
+    async def load_bytes(
+        self, uid: str, **load_kw: Any
+    ) -> Any:  # noqa: FNE004
+        """Load object with specified identifier as binary."""
+        return await self.load_as(StoreType.BINARY, uid, **load_kw)
+
+    async def load_json(self, uid: str, **load_kw: Any) -> Any:  # noqa: FNE004
+        """Load object with specified identifier as json."""
+        return await self.load_as(StoreType.JSON, uid, **load_kw)
+
+    async def load_pickle(  # noqa: FNE004
+        self, uid: str, **load_kw: Any
+    ) -> Any:
+        """Load object with specified identifier as pickle."""
+        return await self.load_as(StoreType.PICKLE, uid, **load_kw)
+
+    async def store_as(
+        self,
+        store_type: StoreType,
+        /,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        """Dump object to cache in format selected by parameter store_as.
+
+        Parameters
+        ----------
+        store_type : StoreType
+            store type from enum
+        uid : str
+            object unique identifier.
+        item : Any
+            item to store, constraints depend on storage type.
+
+        Returns
+        -------
+        StorageKey
+            Key computed from identifier (real used identifier).
+        """
+        key = StorageKey.from_uid(uid)
+        logging.debug("Dumping '%s' as %s.", key, store_type)
+
+        raw_value = await self._run(
+            lambda: encode(store_type, item, self._codec, **dump_kw)
+        )
+        if isinstance(raw_value, str):
+            await self._write_text(key, raw_value)
+        else:
+            await self._write_bytes(key, raw_value)
+
+        logging.debug("Successfully dumped %s as %s", key, store_type)
+        return key
+
+    async def store_many(
+        self,
+        store_type: StoreType,
+        /,
+        items: Mapping[str, Any] | Iterable[tuple[str, Any]],
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | BaseException]:
+        """Dump multiple objects concurrently, all in format selected by
+        parameter store_type.
+
+        Parameters
+        ----------
+        store_type : StoreType
+            store type from enum
+        items : Mapping[str, Any] | Iterable[tuple[str, Any]]
+            mapping from object unique identifier to item to store, or
+            iterable of (identifier, item) pairs.
+        return_exceptions : bool, optional
+            when True, exception raised while storing object is placed in
+            result list instead of being propagated, by default False.
+
+        Returns
+        -------
+        list[StorageKey | BaseException]
+            Keys computed from identifiers, in the same order as items.
+        """
+        pairs = items.items() if isinstance(items, Mapping) else items
+        return list(
+            await asyncio.gather(
+                *(
+                    self.store_as(store_type, uid, item, **dump_kw)
+                    for uid, item in pairs
+                ),
+                return_exceptions=return_exceptions,
+            )
+        )
+
+    @abstractmethod
+    async def _write_text(self, __key: StorageKey, __item: str, /) -> None:
+        ...
+
+    @abstractmethod
+    async def _write_bytes(self, __key: StorageKey, __item: bytes, /) -> None:
+        ...
+
+    async def store_str(
+        self, uid: str, item: str, **str_kw: Any
+    ) -> StorageKey:
+        """Dump object to cache in form of text."""
+        return await self.store_as(StoreType.TEXT, uid, item, **str_kw)
+
+    async def store_bytes(
+        self, uid: str, item: bytes, **bytes_kw: Any
+    ) -> StorageKey:
+        """Dump object to cache in form of binary."""
+        return await self.store_as(StoreType.BINARY, uid, item, **bytes_kw)
+
+    async def store_json(
+        self, uid: str, item: Any, **json_dumps_kw: Any
+    ) -> StorageKey:
+        """Dump object to cache in form of json encoded text."""
+        return await self.store_as(StoreType.JSON, uid, item, **json_dumps_kw)
+
+    async def store_pickle(
+        self, uid: str, item: Any, **pickle_dump_kw: Any
+    ) -> StorageKey:
+        """Dump object to cache in form of compressed pickled binary."""
+        return await self.store_as(
+            StoreType.PICKLE, uid, item, **pickle_dump_kw
+        )
+
+    async def delete(self, __uid: str, /, *, missing_ok: bool = False) -> None:
+        """Delete object with specified uid.
+
+        Attempt to delete non-existing object KeyError will be raised unless missing_ok=True.
+
+        Parameters
+        ----------
+        __uid : str
+            object unique identifier.
+        missing_ok : bool, optional
+            ignores missing key errors, by default False
+        """
+        key = StorageKey.from_uid(__uid)
+        try:
+            await self._delete(key, missing_ok=missing_ok)
+        except Exception as e:
+            if not missing_ok:
+                raise KeyError(f"Couldn't delete {__uid}.") from e
+
+    async def delete_many(
+        self, __uids: Iterable[str], /, *, missing_ok: bool = False
+    ) -> None:
+        """Delete multiple objects concurrently.
+
+        Deletion is attempted for all objects, even if some of them fail, then
+        KeyError naming all failed identifiers is raised unless
+        missing_ok=True.
+
+        Parameters
+        ----------
+        __uids : Iterable[str]
+            object unique identifiers.
+        missing_ok : bool, optional
+            ignores missing key errors, by default False
+        """
+        uids = list(__uids)
+        errors: list[Optional[BaseException]] = await asyncio.gather(
+            *(self.delete(uid, missing_ok=missing_ok) for uid in uids),
+            return_exceptions=True,
+        )
+        failed = [(uid, e) for uid, e in zip(uids, errors) if e is not None]
+        if failed:
+            raise KeyError(
+                f"Couldn't delete {[uid for uid, _ in failed]}."
+            ) from failed[0][1]
+
+    @abstractmethod
+    async def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        ...
@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from typing import Iterable, Optional
 
-from magic_storage._utils import make_uid
+from magic_storage._key import StorageKey
+from magic_storage._metrics import HASH, IO, MetricsHook, start_timer
+from magic_storage._tracing import span
 
 __all__ = ["DeleterBase"]
 
 
 class DeleterBase(ABC):
+
+    _metrics: Optional[MetricsHook] = None
+
     def delete(self, __uid: str, /, *, missing_ok: bool = False) -> None:
         """Delete object with specified uid.
 
@@ -20,13 +26,70 @@ class DeleterBase(ABC):
         missing_ok : bool, optional
             ignores missing key errors, by default False
         """
-        uid = make_uid(__uid)
+        with span("magic_storage.delete", self), start_timer(
+            self._metrics, "delete", self
+        ) as timer:
+            key = StorageKey.from_uid(__uid)
+            timer.lap(HASH)
+            try:
+                self._delete(key, missing_ok=missing_ok)
+            except Exception as e:
+                if not missing_ok:
+                    raise KeyError(f"Couldn't delete {__uid}.") from e
+            finally:
+                self._forget_decoded([key])
+                timer.lap(IO)
+
+    def delete_many(
+        self, __uids: Iterable[str], /, *, missing_ok: bool = False
+    ) -> None:
+        """Delete multiple objects at once.
+
+        Deletion is attempted for all objects, even if some of them fail, then
+        KeyError naming all failed identifiers is raised unless
+        missing_ok=True.
+
+        Parameters
+        ----------
+        __uids : Iterable[str]
+            object unique identifiers.
+        missing_ok : bool, optional
+            ignores missing key errors, by default False
+        """
+        uids = list(__uids)
+        keys = [StorageKey.from_uid(uid) for uid in uids]
         try:
-            self._delete(uid, missing_ok=missing_ok)
-        except Exception as e:
-            if not missing_ok:
-                raise KeyError(f"Couldn't delete {__uid}.") from e
+            errors = self._delete_many(keys, missing_ok=missing_ok)
+        finally:
+            self._forget_decoded(keys)
+
+        failed = [(uid, e) for uid, e in zip(uids, errors) if e is not None]
+        if failed and not missing_ok:
+            raise KeyError(
+                f"Couldn't delete {[uid for uid, _ in failed]}."
+            ) from failed[0][1]
+
+    def _delete_many(
+        self, __keys: list[StorageKey], /, *, missing_ok: bool = False
+    ) -> list[Optional[Exception]]:
+        # Fallback for storages without native batch support, returns
+        # exception for every key which failed, None otherwise.
+        errors: list[Optional[Exception]] = []
+        for key in __keys:
+            try:
+                self._delete(key, missing_ok=missing_ok)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    def _forget_decoded(self, __keys: Iterable[StorageKey], /) -> None:
+        # Invalidates cache of decoded objects, if reader provides one.
+        pass
 
     @abstractmethod
-    def _delete(self, __uid: str, /, *, missing_ok: bool = False) -> None:
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
         ...
@@ -4,15 +4,31 @@ import json
 import logging
 import pickle
 from abc import ABC, abstractmethod
-from typing import Any, Callable
-
+from typing import Any, Iterable, Optional
+
+from magic_storage._key import StorageKey
+from magic_storage._metrics import (
+    COMPRESS,
+    HASH,
+    IO,
+    SERIALIZE,
+    MetricsHook,
+    start_timer,
+)
+from magic_storage._object_cache import ObjectCache
+from magic_storage._serialization import decompress_payload, deserialize
 from magic_storage._store_type import StoreType
-from magic_storage._utils import compress, decompress, make_uid
+from magic_storage._tracing import span
+from magic_storage._utils import compress
 
 __all__ = ["ReaderBase"]
 
 
 class ReaderBase(ABC):
+
+    _object_cache: Optional[ObjectCache] = None
+    _metrics: Optional[MetricsHook] = None
+
     def is_available(self, __uid: str, /) -> bool:
         """Check if object with specified identifier and store type is present
         in cache.
@@ -37,18 +53,45 @@ class ReaderBase(ABC):
         >>>
         ```
         """
-        __uid = make_uid(__uid)
-        assert isinstance(__uid, str), __uid
+        key = StorageKey.from_uid(__uid)
 
-        status = self._is_available(__uid)
-        logging.debug(f"Availability status of {__uid} is {status}.")
+        status = self._is_available(key)
+        logging.debug("Availability status of %s is %s.", key, status)
 
         return status
 
     @abstractmethod
-    def _is_available(self, __uid: str, /) -> bool:
+    def _is_available(self, __key: StorageKey, /) -> bool:
         ...
 
+    def is_available_many(self, __uids: Iterable[str], /) -> list[bool]:
+        """Check availability of multiple objects at once.
+
+        Parameters
+        ----------
+        __uids : Iterable[str]
+            object unique identifiers.
+
+        Returns
+        -------
+        list[bool]
+            availability status for each identifier, in the same order.
+
+        Examples
+        --------
+        ```
+        >>> ReaderExampleImpl().is_available_many(["example1", "missing"])
+        [True, False]
+        >>>
+        ```
+        """
+        keys = [StorageKey.from_uid(uid) for uid in __uids]
+        return self._is_available_many(keys)
+
+    def _is_available_many(self, __keys: list[StorageKey], /) -> list[bool]:
+        # Fallback for storages without native batch support.
+        return [self._is_available(key) for key in __keys]
+
     def load_as(  # noqa: FNE004
         self,
         store_type: StoreType,
@@ -81,63 +124,140 @@ class ReaderBase(ABC):
         """
         return self._load_as(store_type, uid=uid, **load_kw)
 
-    def _load_as(  # noqa: FNE004
+    def load_many(  # noqa: FNE004
         self,
         store_type: StoreType,
-        /,
+        uids: Iterable[str],
         *,
-        uid: str,
+        return_exceptions: bool = False,
         **load_kw: Any,
-    ) -> Any:
-        uid = make_uid(uid)
-        assert isinstance(uid, str), uid
-        logging.debug(f"Loading '{uid}' as {store_type}.")
+    ) -> list[Any]:
+        """Load multiple objects at once, all in format selected by parameter
+        store_type.
 
-        # We can't check if retval is not None as anything can be stored, including None
-        retval = self._LOAD_MAP[store_type](self, uid, **load_kw)
+        Parameters
+        ----------
+        store_type : StoreType
+            store type from enum.
+        uids : Iterable[str]
+            object unique identifiers.
+        return_exceptions : bool, optional
+            when True, exception raised while loading object is placed in
+            result list instead of being propagated, by default False.
 
-        logging.debug(f"Successfully loaded {uid} as {store_type}")
-        return retval
+        Returns
+        -------
+        list[Any]
+            loaded objects, in the same order as identifiers.
 
-    def _load_text(self, uid: str) -> str:  # noqa: FNE004
-        value = self._read_text(uid)
-        assert isinstance(value, str)
+        Examples
+        --------
+        ```
+        >>> ReaderExampleImpl().load_many(StoreType.TEXT, ["example1"])
+        ['{"foo": 32}']
+        >>>
+        ```
+        """
+        with start_timer(
+            self._metrics, "load_many", self, store_type
+        ) as timer:
+            keys = [StorageKey.from_uid(uid) for uid in uids]
+            timer.lap(HASH)
+            return self._load_many(
+                store_type,
+                keys,
+                return_exceptions=return_exceptions,
+                **load_kw,
+            )
+
+    def _load_many(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        keys: list[StorageKey],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **load_kw: Any,
+    ) -> list[Any]:
+        # Fallback for storages without native batch support.
+        results: list[Any] = []
+        for key in keys:
+            try:
+                results.append(self._load_as(store_type, uid=key, **load_kw))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
 
-        return value
+    def _load_as(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        /,
+        *,
+        uid: str,
+        **load_kw: Any,
+    ) -> Any:
+        with span("magic_storage.load", self, store_type), start_timer(
+            self._metrics, "load", self, store_type
+        ) as timer:
+            key = StorageKey.from_uid(uid)
+            timer.lap(HASH)
+            logging.debug("Loading '%s' as %s.", key, store_type)
+
+            # Objects decoded with custom arguments are not cached, as they
+            # may differ from ones decoded with defaults.
+            cache = self._object_cache if not load_kw else None
+            if cache is not None:
+                try:
+                    retval = cache.get((key, store_type))
+                except KeyError:
+                    generation = cache.generation
+                else:
+                    timer.mark("cached")
+                    logging.debug(
+                        "Loaded %s as %s from cache", key, store_type
+                    )
+                    return retval
+
+            raw_value = self._read_as(store_type, key)
+            timer.lap(IO)
+            if store_type is StoreType.PICKLE:
+                raw_value = decompress_payload(store_type, raw_value)
+                timer.lap(COMPRESS)
+            # We can't check if retval is not None as anything can be
+            # stored, including None
+            retval = deserialize(store_type, raw_value, **load_kw)
+            timer.lap(SERIALIZE)
+
+            if cache is not None:
+                retval = cache.put((key, store_type), retval, generation)
+
+            logging.debug("Successfully loaded %s as %s", key, store_type)
+            return retval
+
+    def _forget_decoded(self, __keys: Iterable[StorageKey], /) -> None:
+        # Called by writer and deleter after objects were modified.
+        cache = self._object_cache
+        if cache is not None:
+            cache.invalidate(
+                (key, store_type) for key in __keys for store_type in StoreType
+            )
+
+    def _read_as(self, store_type: StoreType, key: StorageKey) -> str | bytes:
+        if store_type.is_text():
+            return self._read_text(key)
+        else:
+            return self._read_bytes(key)
 
     @abstractmethod
-    def _read_text(self, __uid: str, /) -> str:
+    def _read_text(self, __key: StorageKey, /) -> str:
         ...
 
-    def _load_json(self, uid: str, **load_kw: Any) -> Any:  # noqa: FNE004
-        raw_value = self._read_text(uid)
-        assert isinstance(raw_value, str)
-
-        value = json.loads(raw_value, **load_kw)
-        return value
-
-    def _load_bytes(self, uid: str) -> bytes:  # noqa: FNE004
-        value = self._read_bytes(uid)
-        assert isinstance(value, bytes), value
-
-        return value
-
     @abstractmethod
-    def _read_bytes(self, __uid: str, /) -> bytes:
+    def _read_bytes(self, __key: StorageKey, /) -> bytes:
         ...
 
-    def _load_pickle(  # noqa: FNE004
-        self, uid: str, **pickle_load_kw: Any
-    ) -> Any:
-        source = self._read_bytes(uid)
-        assert isinstance(source, bytes)
-
-        source = decompress(source)
-        assert isinstance(source, bytes)
-
-        ob = pickle.loads(source, **pickle_load_kw)
-        return ob
-
     def load_text(self, uid: str, **load_kw: Any) -> Any:  # noqa: FNE004
         """Load object with specified identifier as text.
 
@@ -212,13 +332,6 @@ class ReaderBase(ABC):
         """
         return self._load_as(StoreType.PICKLE, uid=uid, **load_kw)
 
-    _LOAD_MAP: dict[StoreType, Callable[[ReaderBase, str], Any]] = {
-        StoreType.TEXT: _load_text,
-        StoreType.BINARY: _load_bytes,
-        StoreType.JSON: _load_json,
-        StoreType.PICKLE: _load_pickle,
-    }
-
 
 class ReaderExampleImpl(ReaderBase):  # pragma: no cover
     """Example implementation of ReaderBase interface used in doctests.
@@ -229,18 +342,18 @@ class ReaderExampleImpl(ReaderBase):  # pragma: no cover
 
     def __init__(self) -> None:
         example = {"foo": 32}
-        self.__items_text: dict[str, str] = {
-            make_uid("example1"): json.dumps(example),
+        self.__items_text: dict[StorageKey, str] = {
+            StorageKey.from_uid("example1"): json.dumps(example),
         }
-        self.__items_bytes: dict[str, bytes] = {
-            make_uid("example2"): compress(pickle.dumps(example)),
+        self.__items_bytes: dict[StorageKey, bytes] = {
+            StorageKey.from_uid("example2"): compress(pickle.dumps(example)),
         }
 
-    def _is_available(self, __uid: str, /) -> bool:
-        return __uid in self.__items_text or __uid in self.__items_bytes
+    def _is_available(self, __key: StorageKey, /) -> bool:
+        return __key in self.__items_text or __key in self.__items_bytes
 
-    def _read_text(self, __uid: str, /) -> str:
-        return self.__items_text[__uid]
+    def _read_text(self, __key: StorageKey, /) -> str:
+        return self.__items_text[__key]
 
-    def _read_bytes(self, __uid: str, /) -> bytes:
-        return self.__items_bytes[__uid]
+    def _read_bytes(self, __key: StorageKey, /) -> bytes:
+        return self.__items_bytes[__key]
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from typing import Any
+
+from magic_storage._metrics import hit_ratio
+
 from ._deleter import DeleterBase
 from ._reader import ReaderBase
 from ._writer import WriterBase
@@ -10,3 +14,55 @@ __all__ = ["StorageIOBase"]
 class StorageIOBase(ReaderBase, WriterBase, DeleterBase):
     def configure(self) -> None:
         """Configure resource storage access."""
+
+    def stats(self) -> dict[str, Any]:
+        """Return snapshot of storage statistics, counters of caches with
+        their hit ratios and measurements collected by metrics hook, see
+        configure(metrics=...).
+
+        Returns
+        -------
+        dict[str, Any]
+            statistics, "backend" is name of storage class, "caches" maps
+            cache name to its counters, "metrics" holds snapshot of metrics
+            hook, other entries depend on storage.
+
+        Examples
+        --------
+        ```
+        >>> from magic_storage import InMemoryStorage, ObjectCache
+        >>> storage = InMemoryStorage()
+        >>> storage.configure(object_cache=ObjectCache())
+        >>> _ = storage.store_json("EXAMPLE UID", {"foo": 32})
+        >>> _ = storage.load_json("EXAMPLE UID")
+        >>> _ = storage.load_json("EXAMPLE UID")
+        >>> storage.stats()["caches"]["object_cache"]["hit_ratio"]
+        0.5
+        >>>
+        ```
+        """
+        caches = self._cache_stats()
+        for counters in caches.values():
+            counters["hit_ratio"] = hit_ratio(
+                counters.get("hits", 0), counters.get("misses", 0)
+            )
+        stats: dict[str, Any] = {
+            "backend": type(self).__name__,
+            "caches": caches,
+            "metrics": {}
+            if self._metrics is None
+            else self._metrics.snapshot(),
+        }
+        stats.update(self._stats())
+        return stats
+
+    def _cache_stats(self) -> dict[str, dict[str, Any]]:
+        # Counters of caches used by storage, by name.
+        caches = {}
+        if self._object_cache is not None:
+            caches["object_cache"] = dict(self._object_cache.stats())
+        return caches
+
+    def _stats(self) -> dict[str, Any]:
+        # Statistics specific to storage.
+        return {}
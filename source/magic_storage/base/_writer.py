@@ -1,18 +1,31 @@
 from __future__ import annotations
 
-import json
 import logging
-import pickle
 from abc import ABC, abstractmethod
-from typing import Any, Callable
-
+from typing import Any, Iterable, Mapping, Optional
+
+from magic_storage._compression import DEFAULT_CODEC, Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import (
+    COMPRESS,
+    HASH,
+    IO,
+    SERIALIZE,
+    MetricsHook,
+    start_timer,
+)
+from magic_storage._serialization import compress_payload, serialize
 from magic_storage._store_type import StoreType
-from magic_storage._utils import compress, make_uid
+from magic_storage._tracing import span
 
 __all__ = ["WriterBase"]
 
 
 class WriterBase(ABC):
+
+    _codec: Codec = get_codec(DEFAULT_CODEC)
+    _metrics: Optional[MetricsHook] = None
+
     def store_as(
         self,
         store_type: StoreType,
@@ -20,7 +33,7 @@ class WriterBase(ABC):
         uid: str,
         item: Any,
         **dump_kw: Any,
-    ) -> str:
+    ) -> StorageKey:
         """Dump object to cache in format selected by parameter store_as.
 
         Parameters
@@ -34,88 +47,128 @@ class WriterBase(ABC):
 
         Returns
         -------
-        str
-            Identifier after cleanup and tagging (real used identifier).
+        StorageKey
+            Key computed from identifier (real used identifier).
         """
         return self._store_as(store_type, uid=uid, item=item, **dump_kw)
 
-    def _store_as(
+    def store_many(
         self,
         store_type: StoreType,
         /,
+        items: Mapping[str, Any] | Iterable[tuple[str, Any]],
         *,
-        uid: str,
-        item: Any,
+        return_exceptions: bool = False,
         **dump_kw: Any,
-    ) -> str:
-        uid = make_uid(uid)
-        assert isinstance(uid, str), uid
-        logging.debug(f"Dumping '{uid}' as {store_type}.")
+    ) -> list[StorageKey | Exception]:
+        """Dump multiple objects at once, all in format selected by parameter
+        store_type.
 
-        retval = self._STORE_MAP[store_type](self, uid, item, **dump_kw)
-        assert retval is None, retval
-
-        logging.debug(f"Successfully dumped {uid} as {store_type}")
-        return uid
-
-    def _store_text(self, uid: str, item: Any, **str_kw: Any) -> None:
-        raw_value = str(item, **str_kw)
-        assert isinstance(raw_value, str), raw_value
-
-        retval = self._write_text(uid, raw_value)
-        assert retval is None, retval
-
-        return retval
+        Parameters
+        ----------
+        store_type : StoreType
+            store type from enum
+        items : Mapping[str, Any] | Iterable[tuple[str, Any]]
+            mapping from object unique identifier to item to store, or
+            iterable of (identifier, item) pairs.
+        return_exceptions : bool, optional
+            when True, exception raised while storing object is placed in
+            result list instead of being propagated, by default False.
 
-    @abstractmethod
-    def _write_text(self, __uid: str, __item: str, /) -> None:
-        ...
+        Returns
+        -------
+        list[StorageKey | Exception]
+            Keys computed from identifiers, in the same order as items.
+        """
+        pairs = items.items() if isinstance(items, Mapping) else items
+        with start_timer(
+            self._metrics, "store_many", self, store_type
+        ) as timer:
+            keyed = [(StorageKey.from_uid(uid), item) for uid, item in pairs]
+            timer.lap(HASH)
+            try:
+                return self._store_many(
+                    store_type,
+                    keyed,
+                    return_exceptions=return_exceptions,
+                    **dump_kw,
+                )
+            finally:
+                self._forget_decoded([key for key, _ in keyed])
+
+    def _store_many(
+        self,
+        store_type: StoreType,
+        items: list[tuple[StorageKey, Any]],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | Exception]:
+        # Fallback for storages without native batch support.
+        results: list[StorageKey | Exception] = []
+        for key, item in items:
+            try:
+                results.append(
+                    self._store_as(store_type, uid=key, item=item, **dump_kw)
+                )
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
 
-    def _store_json(self, uid: str, item: Any, **json_dumps_kw: Any) -> None:
+    def _store_as(
+        self,
+        store_type: StoreType,
+        /,
+        *,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        with span("magic_storage.store", self, store_type), start_timer(
+            self._metrics, "store", self, store_type
+        ) as timer:
+            key = StorageKey.from_uid(uid)
+            timer.lap(HASH)
+            logging.debug("Dumping '%s' as %s.", key, store_type)
+
+            raw_value = serialize(store_type, item, **dump_kw)
+            timer.lap(SERIALIZE)
+            if store_type is StoreType.PICKLE:
+                raw_value = compress_payload(
+                    store_type, raw_value, self._codec
+                )
+                timer.lap(COMPRESS)
+            self._write_as(key, raw_value)
+            timer.lap(IO)
+
+            logging.debug("Successfully dumped %s as %s", key, store_type)
+            return key
+
+    def _write_as(self, key: StorageKey, raw_value: str | bytes) -> None:
         try:
-            raw_value = json.dumps(item, **json_dumps_kw)
-        except TypeError:
-            if hasattr(item, "json") and callable(item.json):
-                raw_value = item.json()
+            if isinstance(raw_value, str):
+                self._write_text(key, raw_value)
             else:
-                raise
-        assert isinstance(raw_value, str), raw_value
-
-        retval = self._write_text(uid, raw_value)
-        assert retval is None, retval
+                self._write_bytes(key, raw_value)
+        finally:
+            self._forget_decoded([key])
 
-        return retval
-
-    def _store_bytes(self, uid: str, item: Any, **bytes_kw: Any) -> None:
-        raw_value = bytes(item, **bytes_kw)
-        assert isinstance(raw_value, bytes), raw_value
-
-        retval = self._write_bytes(uid, raw_value)
-        assert retval is None, retval
-
-        logging.debug(f"Successfully dumped {uid} as BYTES")
-        return retval
+    def _forget_decoded(self, __keys: Iterable[StorageKey], /) -> None:
+        # Invalidates cache of decoded objects, if reader provides one.
+        pass
 
     @abstractmethod
-    def _write_bytes(self, __uid: str, __item: bytes, /) -> None:
+    def _write_text(self, __key: StorageKey, __item: str, /) -> None:
         ...
 
-    def _store_pickle(
-        self, uid: str, item: Any, **pickle_dump_kw: Any
-    ) -> None:
-        raw_value = pickle.dumps(item, **pickle_dump_kw)
-        assert isinstance(raw_value, bytes)
-
-        raw_value = compress(raw_value)
-        assert isinstance(raw_value, bytes), raw_value
-
-        retval = self._write_bytes(uid, raw_value)
-        assert retval is None, retval
-
-        logging.debug(f"Successfully dumped {uid} as PICKLE")
-        return retval
+    @abstractmethod
+    def _write_bytes(self, __key: StorageKey, __item: bytes, /) -> None:
+        ...
 
-    def store_str(self, uid: str, item: str, **str_kw: Any) -> str:
+    def store_str(self, uid: str, item: str, **str_kw: Any) -> StorageKey:
         """Dump object to cache in form of text.
 
         Parameters
@@ -127,12 +180,14 @@ class WriterBase(ABC):
 
         Returns
         -------
-        str
-            Identifier after cleanup and tagging (real used identifier).
+        StorageKey
+            Key computed from identifier (real used identifier).
         """
         return self._store_as(StoreType.TEXT, uid=uid, item=item, **str_kw)
 
-    def store_bytes(self, uid: str, item: bytes, **bytes_kw: Any) -> str:
+    def store_bytes(
+        self, uid: str, item: bytes, **bytes_kw: Any
+    ) -> StorageKey:
         """Dump object to cache in form of binary.
 
         Parameters
@@ -144,12 +199,14 @@ class WriterBase(ABC):
 
         Returns
         -------
-        str
-            Identifier after cleanup and tagging (real used identifier).
+        StorageKey
+            Key computed from identifier (real used identifier).
         """
         return self._store_as(StoreType.BINARY, uid=uid, item=item, **bytes_kw)
 
-    def store_json(self, uid: str, item: Any, **json_dumps_kw: Any) -> str:
+    def store_json(
+        self, uid: str, item: Any, **json_dumps_kw: Any
+    ) -> StorageKey:
         """Dump object to cache in form of json encoded text.
 
         Parameters
@@ -161,17 +218,20 @@ class WriterBase(ABC):
 
         Returns
         -------
-        str
-            Identifier after cleanup and tagging (real used identifier).
+        StorageKey
+            Key computed from identifier (real used identifier).
         """
         return self._store_as(
             StoreType.JSON, uid=uid, item=item, **json_dumps_kw
         )
 
-    def store_pickle(self, uid: str, item: Any, **pickle_dump_kw: Any) -> str:
+    def store_pickle(
+        self, uid: str, item: Any, **pickle_dump_kw: Any
+    ) -> StorageKey:
         """Dump object to cache in form of pickled binary.
 
-        Because pickle is a binary format, it is always compressed with lzma algorithm.
+        Because pickle is a binary format, it is always compressed, codec used
+        can be selected with configure(codec=...) on storages which support it.
 
         Parameters
         ----------
@@ -183,16 +243,9 @@ class WriterBase(ABC):
 
         Returns
         -------
-        str
-            Identifier after cleanup and tagging (real used identifier).
+        StorageKey
+            Key computed from identifier (real used identifier).
         """
         return self._store_as(
             StoreType.PICKLE, uid=uid, item=item, **pickle_dump_kw
         )
-
-    _STORE_MAP: dict[StoreType, Callable[[WriterBase, str, Any], None]] = {
-        StoreType.TEXT: _store_text,
-        StoreType.BINARY: _store_bytes,
-        StoreType.JSON: _store_json,
-        StoreType.PICKLE: _store_pickle,
-    }
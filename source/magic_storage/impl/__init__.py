@@ -1,6 +1,29 @@
 from __future__ import annotations
 
+from ._async_filesystem import AsyncFilesystemStorage
+from ._async_memory import AsyncInMemoryStorage
+from ._dbm import DbmStorage
 from ._filesystem import FilesystemStorage
 from ._memory import InMemoryStorage
+from ._packed import PackedStorage
+from ._sqlite import SQLiteStorage
+from ._tiered import Tier, TieredStorage
 
-__all__ = ["InMemoryStorage", "FilesystemStorage"]
+__all__ = [
+    "InMemoryStorage",
+    "FilesystemStorage",
+    "PackedStorage",
+    "SQLiteStorage",
+    "DbmStorage",
+    "TieredStorage",
+    "Tier",
+    "AsyncInMemoryStorage",
+    "AsyncFilesystemStorage",
+]
+
+try:
+    from ._lmdb import LmdbStorage  # noqa: F401
+except ImportError:  # pragma: no cover
+    pass
+else:  # pragma: no cover
+    __all__.append("LmdbStorage")
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from filelock import Timeout
+
+from magic_storage._key import StorageKey
+from magic_storage._lock_pool import TransientLock
+from magic_storage._store_type import StoreType
+from magic_storage.base import AsyncStorageIOBase
+from magic_storage.mixins import AsyncFullyFeaturedMixin
+
+from ._filesystem import FilesystemStorage
+
+__all__ = ["AsyncFilesystemStorage"]
+
+_R = TypeVar("_R")
+
+FLIGHT_LOCK_POLL_INTERVAL = 0.05
+"""Seconds between attempts to acquire inter-process cache_if_missing()
+lock."""
+
+
+class AsyncFilesystemStorage(AsyncStorageIOBase, AsyncFullyFeaturedMixin):
+    """Asynchronous variant of FilesystemStorage.
+
+    All file I/O, serialization and compression is offloaded to thread
+    pool, therefore it never blocks event loop. Thread pool configured
+    with configure(max_workers=...) is used, otherwise default executor of
+    running event loop.
+
+    Parameters
+    ----------
+    __root : str | Path
+        root dir for fs storage, if __root points to file, parent directory of
+        this file will be used.
+    subdir : Optional[str], optional
+        nested directory to use for file storage, when None, data will be stored
+        directly in __root, by default "data".
+
+    Example
+    -------
+    ```
+    >>> import asyncio
+    >>> from magic_storage import StoreType
+    >>> tmp = getfixture('tmp_path')
+    >>> async def main():
+    ...     storage = AsyncFilesystemStorage(tmp)
+    ...     await storage.store_as(StoreType.JSON, "EXAMPLE UID", {"foo": 32})
+    ...     return await storage.load_as(StoreType.JSON, "EXAMPLE UID")
+    ...
+    >>> asyncio.run(main())
+    {'foo': 32}
+    >>>
+    ```
+    """
+
+    def __init__(
+        self, __root: str | Path, *, subdir: Optional[str] = "data"
+    ) -> None:
+        super().__init__()
+        self._storage = FilesystemStorage(__root, subdir=subdir)
+        self._codec = self._storage._codec
+
+    async def _run(self, __func: Callable[..., _R], /, *args: Any) -> _R:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._storage._executor, functools.partial(__func, *args)
+        )
+
+    async def _is_available(self, key: StorageKey) -> bool:
+        return await self._run(self._storage._is_available, key)
+
+    async def load_as(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        uid: str,
+        **load_kw: Any,
+    ) -> Any:
+        # Loaded by wrapped storage, so objects pending in its write-behind
+        # queue and its object cache are used.
+        return await self._run(
+            functools.partial(
+                self._storage._load_as, store_type, uid=uid, **load_kw
+            )
+        )
+
+    async def store_as(
+        self,
+        store_type: StoreType,
+        /,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        # Stored by wrapped storage, which queues object when write-behind
+        # queue is configured.
+        return await self._run(
+            functools.partial(
+                self._storage._store_as,
+                store_type,
+                uid=uid,
+                item=item,
+                **dump_kw,
+            )
+        )
+
+    def _read_settled(
+        self, read: Callable[[StorageKey], _R], key: StorageKey
+    ) -> _R:
+        # Pending write of object is finished before it is read.
+        self._storage._settle([key])
+        return read(key)
+
+    async def _read_text(self, key: StorageKey) -> str:
+        return await self._run(
+            self._read_settled, self._storage._read_text, key
+        )
+
+    async def _read_bytes(self, key: StorageKey) -> bytes:
+        return await self._run(
+            self._read_settled, self._storage._read_bytes, key
+        )
+
+    async def _write_text(self, key: StorageKey, item: str) -> None:
+        await self._run(self._storage._write_text, key, item)
+
+    async def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        await self._run(self._storage._write_bytes, key, item)
+
+    async def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        await self._run(
+            functools.partial(self._storage._delete, missing_ok=missing_ok),
+            __key,
+        )
+
+    async def load_buffer(self, __uid: str, /) -> memoryview:
+        """Load raw payload of object stored as binary without copying it,
+        see FilesystemStorage.load_buffer()."""
+        return await self._run(self._storage.load_buffer, __uid)
+
+    @asynccontextmanager
+    async def _flight_lock(self, key: StorageKey) -> AsyncIterator[None]:
+        async with super()._flight_lock(key):
+            # Lock is polled without blocking, so event loop can run other
+            # tasks meanwhile, it is acquired and released in loop thread.
+            lock = TransientLock(self._storage._flight_lock_path(key))
+            while True:
+                try:
+                    lock.acquire(timeout=0)
+                    break
+                except Timeout:
+                    await asyncio.sleep(FLIGHT_LOCK_POLL_INTERVAL)
+            try:
+                yield
+            finally:
+                lock.release()
+
+    def configure(self, **configure_kw: Any) -> None:  # type: ignore
+        """Configure storage instance, accepts the same keyword arguments as
+        FilesystemStorage.configure()."""
+        self._storage.configure(**configure_kw)
+        self._codec = self._storage._codec
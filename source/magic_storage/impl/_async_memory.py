@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from magic_storage._key import StorageKey
+from magic_storage.base import AsyncStorageIOBase
+from magic_storage.mixins import AsyncFullyFeaturedMixin
+
+from ._memory import InMemoryStorage
+
+__all__ = ["AsyncInMemoryStorage"]
+
+
+class AsyncInMemoryStorage(AsyncStorageIOBase, AsyncFullyFeaturedMixin):
+    """Asynchronous variant of InMemoryStorage.
+
+    As all operations are done in RAM, nothing is offloaded from event
+    loop thread.
+
+    Example
+    -------
+    ```
+    >>> import asyncio
+    >>> from magic_storage import StoreType
+    >>> async def main():
+    ...     storage = AsyncInMemoryStorage()
+    ...     await storage.store_as(StoreType.JSON, "EXAMPLE UID", {"foo": 32})
+    ...     return await storage.load_as(StoreType.JSON, "EXAMPLE UID")
+    ...
+    >>> asyncio.run(main())
+    {'foo': 32}
+    >>>
+    ```
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._storage = InMemoryStorage()
+
+    async def _is_available(self, key: StorageKey) -> bool:
+        return self._storage._is_available(key)
+
+    async def _read_text(self, key: StorageKey) -> str:
+        return self._storage._read_text(key)
+
+    async def _read_bytes(self, key: StorageKey) -> bytes:
+        return self._storage._read_bytes(key)
+
+    async def _write_text(self, key: StorageKey, item: str) -> None:
+        self._storage._write_text(key, item)
+
+    async def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        self._storage._write_bytes(key, item)
+
+    async def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        self._storage._delete(__key, missing_ok=missing_ok)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import dbm
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import sentinel
+
+from magic_storage._compression import Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import FullyFeaturedMixin
+
+__all__ = ["DbmStorage"]
+
+
+DEFAULT_DATABASE_NAME = "storage.dbm"
+"""Name of database created when directory is given to DbmStorage."""
+
+
+class DbmStorage(StorageIOBase, FullyFeaturedMixin):
+    """Implementation of storage class which keeps all objects in key-value
+    database from standard library dbm module.
+
+    The best engine available is used (dbm.gnu, dbm.ndbm, falling back to
+    dbm.dumb). Engines don't support concurrent writers, therefore database
+    opened for writing must not be shared between processes, while any
+    number of processes can open it with readonly=True, which suits
+    read-mostly fixtures.
+
+    Parameters
+    ----------
+    __path : str | Path
+        path to database, created when missing, when __path points to
+        directory, DEFAULT_DATABASE_NAME in this directory is used.
+    readonly : bool, optional
+        open existing database for reading only, by default False.
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> from magic_storage import StoreType
+    >>> storage = DbmStorage(tmp)
+    >>> storage.store_as(StoreType.JSON, uid="EXAMPLE UID", item={"foo": 32})
+    '4c9e95de851b875493ba6c6dfb16b6aaae5c3e167aef9ab6edfeb0dbca2f6574'
+    >>> storage.load_as(StoreType.JSON, uid="EXAMPLE UID")
+    {'foo': 32}
+    >>> storage.close()
+    >>>
+    ```
+    """
+
+    def __init__(self, __path: str | Path, *, readonly: bool = False) -> None:
+        __path = Path(__path)
+        if __path.is_dir():
+            __path = __path / DEFAULT_DATABASE_NAME
+        __path.parent.mkdir(0o777, True, True)
+        self._path = __path
+
+        self._encoding = "utf-8"
+        # dbm objects are not thread safe
+        self._lock = threading.RLock()
+        self._db: Any = dbm.open(str(__path), "r" if readonly else "c")
+        super().__init__()
+        logging.debug(
+            "Opened %s database %s.", dbm.whichdb(str(__path)), __path
+        )
+
+    def _is_available(self, __key: StorageKey) -> bool:
+        with self._lock:
+            return __key.encode("ascii") in self._db
+
+    def _read_text(self, key: StorageKey) -> str:
+        return self._read_bytes(key).decode(self._encoding)
+
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        with self._lock:
+            value: bytes = self._db[key.encode("ascii")]
+        return value
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self._write_bytes(key, item.encode(self._encoding))
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        with self._lock:
+            self._db[key.encode("ascii")] = item
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        with self._lock:
+            try:
+                del self._db[__key.encode("ascii")]
+            except KeyError:
+                if not missing_ok:
+                    raise
+
+    def sync(self) -> None:
+        """Write pending changes to disk, when engine buffers them."""
+        with self._lock:
+            sync = getattr(self._db, "sync", None)
+            if sync is not None:
+                sync()
+
+    def close(self) -> None:
+        """Write pending changes and close database."""
+        with self._lock:
+            self._db.close()
+        logging.debug("Closed database %s.", self._path)
+
+    def configure(
+        self,
+        *,
+        encoding: str | sentinel = sentinel,
+        codec: str | Codec | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+    ) -> None:
+        """Configure DbmStorage instance.
+
+        Parameters
+        ----------
+        encoding : str | sentinel, optional
+            Change encoding used to read/write text, when sentinel, old value
+            is kept, by default "utf-8"
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, see get_codec() for
+            details, when sentinel, old value is kept, by default "zlib:1".
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        """
+        if encoding is not sentinel:
+            self._encoding = encoding
+            logging.debug("Changed encoding of DbmStorage to %s.", encoding)
+
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of DbmStorage to %s.", codec)
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of DbmStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of DbmStorage to %s.", metrics)
@@ -1,28 +1,110 @@
 from __future__ import annotations
 
+import io
+import json
 import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from hashlib import sha256
 from pathlib import Path
-from typing import Optional
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Iterable,
+    Iterator,
+    Optional,
+    TypeVar,
+)
 from unittest.mock import sentinel
 
-from cachetools import Cache, RRCache, cachedmethod
+from cachetools import Cache
+from filelock import Timeout
 
 from magic_storage._atomic_file import AtomicFile
-from magic_storage._utils import make_uid
+from magic_storage._compression import (
+    HEADER_MAGIC,
+    Codec,
+    get_codec,
+    unpack,
+    unpack_stream,
+)
+from magic_storage._durability import (
+    DEFAULT_GROUP_INTERVAL,
+    Durability,
+    GroupCommitter,
+    fsync_directory,
+)
+from magic_storage._key import StorageKey
+from magic_storage._lock_pool import (
+    DEFAULT_STRIPES,
+    TransientLock,
+    get_lock_pool,
+)
+from magic_storage._metrics import (
+    COMPRESS,
+    HASH,
+    IO,
+    SERIALIZE,
+    MetricsHook,
+    current_timer,
+    start_timer,
+)
+from magic_storage._object_cache import ObjectCache
+from magic_storage._read_cache import ReadCache
+from magic_storage._serialization import deserialize, encode, serialize
+from magic_storage._store_type import StoreType
+from magic_storage._streams import PayloadReader, PayloadWriter
+from magic_storage._utils import compress, map_in_order
+from magic_storage._write_behind import WriteBehindQueue
 from magic_storage.base import StorageIOBase
 from magic_storage.mixins import FullyFeaturedMixin
 
 __all__ = ["FilesystemStorage"]
 
+_T = TypeVar("_T", str, bytes)
+
+# store type and payload returned by serialize()
+_Pending = tuple[StoreType, "str | bytes"]
+
+_KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+LOCKS_DIR = ".locks"
+"""Name of subdirectory of data directory which contains lock files."""
+
+FLIGHT_LOCK_SUFFIX = ".flight.lock"
+"""Suffix of lock files in LOCKS_DIR held by cache_if_missing() while
+callback runs, they exist only while held."""
+
+BLOBS_DIR = ".blobs"
+"""Name of subdirectory of data directory which contains payloads shared by
+objects in content-addressed mode."""
+
+LAYOUT_FILE = ".layout.json"
+"""Name of file in data directory which records directory layout, see
+configure(shards=...)."""
+
+
+def _content_digest(tag: bytes, data: bytes) -> str:
+    # Payloads are tagged, so uncompressed pickle is never mistaken for
+    # binary object with the same content.
+    return sha256(tag + b"\0" + data).hexdigest()
+
 
 class FilesystemStorage(StorageIOBase, FullyFeaturedMixin):
     """Implementation of storage class which operates on filesystem items to
     preserve saved items between sessions. Loading procedures can optionally
-    use caching, they do by default, therefore without disabling it you can't
-    rely on loads being always instantly up to date with stores.
+    use caching, they do by default. Cache is invalidated by stores and
+    deletes done through the same instance, but without disabling it (or
+    setting ttl) you can't rely on loads being instantly up to date with
+    stores done by other instances or processes.
 
-    Encoding used to read text files, as well as cache can be changed
-    using .configure() method.
+    Encoding used to read text files, cache and codec used to compress
+    pickled objects can be changed using .configure() method.
 
     Parameters
     ----------
@@ -67,49 +149,841 @@ class FilesystemStorage(StorageIOBase, FullyFeaturedMixin):
             self._data_dir = __root
         self._data_dir.mkdir(0o777, True, True)
 
-        self._cache: Optional[RRCache] = RRCache(maxsize=128)
+        self._cache: Optional[Cache] = ReadCache()
         self._encoding = "utf-8"
+        self._migrate_legacy = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # cachetools caches are not thread safe
+        self._cache_lock = threading.RLock()
+        # incremented on every invalidation, so read which raced with write
+        # won't put stale payload in cache
+        self._cache_generation = 0
+        # widths of nested directory levels, empty for flat layout
+        self._shards: tuple[int, ...] = ()
+        # previous layouts, which may still contain objects until they are
+        # migrated
+        self._fallback_layouts: tuple[tuple[int, ...], ...] = ()
+        self._shard_dirs: set[Path] = set()
+        # replacing file opened by reader fails on Windows
+        self._lock_reads = os.name == "nt"
+        self._set_lock_stripes(DEFAULT_STRIPES)
+        self._load_layout()
+        self._durability = Durability.NONE
+        self._group = GroupCommitter(DEFAULT_GROUP_INTERVAL)
+        self._behind: Optional[WriteBehindQueue[_Pending]] = None
+        self._dedupe = False
         super().__init__()
 
-    def _filepath(self, __uid: str) -> Path:
-        __uid = make_uid(__uid)
-        assert isinstance(__uid, str)
+    def _filepath(
+        self, __key: StorageKey, shards: Optional[tuple[int, ...]] = None
+    ) -> Path:
+        path = self._data_dir
+        start = 0
+        for width in self._shards if shards is None else shards:
+            path = path / __key[start : start + width]
+            start += width
+        return path / __key
+
+    def _target(self, __key: StorageKey) -> Path:
+        # Returns path to file with object, for writing, directory which
+        # should contain it is created when it's missing.
+        path = self._filepath(__key)
+        if self._shards and path.parent not in self._shard_dirs:
+            path.parent.mkdir(0o777, True, True)
+            self._shard_dirs.add(path.parent)
+        return path
+
+    def _resolve(self, __key: StorageKey) -> Path:
+        # Returns path to file with object, when legacy migration is enabled
+        # or layout migration is pending and file is missing, file from old
+        # location is moved in place first.
+        path = self._filepath(__key)
+        if (
+            self._migrate_legacy or self._fallback_layouts
+        ) and not path.is_file():
+            self._migrate(__key, path)
+        return path
+
+    def _migrate(self, __key: StorageKey, __path: Path) -> bool:
+        candidates: list[Path] = [
+            self._filepath(__key, shards) for shards in self._fallback_layouts
+        ]
+        if self._migrate_legacy:
+            candidates.extend(self._data_dir / k for k in __key.legacy_keys())
+
+        for old_path in candidates:
+            if old_path == __path or not old_path.is_file():
+                continue
+            self._relocate(old_path, self._target(__key))
+            logging.debug("Migrated file %s to %s.", old_path, __path)
+            return True
+        return False
+
+    def _atomic_file(self, __path: Path) -> AtomicFile:
+        # Files are locked with lock from pool, chosen by file name, which
+        # is key of object.
+        return AtomicFile(__path, self._locks.lock(__path.name))
+
+    def _relocate(self, __source: Path, __path: Path) -> None:
+        with self._atomic_file(__path) as file:
+            try:
+                file.adopt(__source)
+            except FileNotFoundError:  # pragma: no cover
+                # migrated concurrently by other process
+                pass
+        self._persist([__source.parent, __path.parent])
+
+    @property
+    def _fsync_files(self) -> bool:
+        return self._durability is not Durability.NONE
+
+    def _persist(self, __dirs: Iterable[Path], /, batch: bool = False) -> None:
+        # Makes changes of directory entries durable, as required by
+        # durability mode, batch is synced at once also in group mode.
+        if self._durability is Durability.FSYNC or (
+            batch and self._durability is Durability.GROUP
+        ):
+            for directory in set(__dirs):
+                fsync_directory(directory)
+        elif self._durability is Durability.GROUP:
+            self._group.mark(__dirs)
+
+    def sync(self) -> None:
+        """Sync to disk changes not synced yet in group commit mode, see
+        configure(durability=...)."""
+        self._group.flush()
+
+    def flush(self) -> None:
+        """Write all objects pending in write-behind queue and sync them, see
+        configure(write_behind=...).
+
+        Raises
+        ------
+        Exception
+            first exception raised by background write since last flush.
+        """
+        try:
+            if self._behind is not None:
+                self._behind.flush()
+        finally:
+            self.sync()
+
+    def close(self) -> None:
+        """Write pending objects and stop background threads, storage can
+        still be used afterwards, but without write-behind queue."""
+        behind, self._behind = self._behind, None
+        try:
+            if behind is not None:
+                behind.close()
+        finally:
+            self._group.close()
+            self._group = GroupCommitter(self._group.interval)
+            self._set_max_workers(None)
+
+    def _store_as(
+        self,
+        store_type: StoreType,
+        /,
+        *,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        behind = self._behind
+        if behind is None:
+            return self._dump(store_type, uid=uid, item=item, **dump_kw)
+        key = StorageKey.from_uid(uid)
+        # serialized right away, so pending object loads the same as
+        # written one and later changes of item are not written
+        behind.put(key, (store_type, serialize(store_type, item, **dump_kw)))
+        self._forget_decoded([key])
+        logging.debug("Queued '%s' to be dumped as %s.", key, store_type)
+        return key
+
+    def _write_pending(self, key: Any, pending: _Pending) -> None:
+        store_type, data = pending
+        with start_timer(self._metrics, "store", self, store_type) as timer:
+            self._write_serialized(store_type, key, data)
+            timer.lap(IO)
+
+    def _dump(
+        self,
+        store_type: StoreType,
+        /,
+        *,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        if not self._dedupe:
+            return super()._store_as(store_type, uid=uid, item=item, **dump_kw)
+        with start_timer(self._metrics, "store", self, store_type) as timer:
+            key = StorageKey.from_uid(uid)
+            timer.lap(HASH)
+            logging.debug("Dumping '%s' as %s.", key, store_type)
+            data = serialize(store_type, item, **dump_kw)
+            timer.lap(SERIALIZE)
+            self._write_serialized(store_type, key, data)
+            timer.lap(IO)
+            logging.debug("Successfully dumped %s as %s", key, store_type)
+            return key
+
+    def _write_serialized(
+        self, store_type: StoreType, key: StorageKey, data: str | bytes
+    ) -> None:
+        # Writes payload returned by serialize(), without timer of its own.
+        try:
+            if store_type is not StoreType.PICKLE:
+                self._write_as(key, data)
+                return
+            assert isinstance(data, bytes)
+            if self._dedupe:
+                # hashed before compression, which is skipped for
+                # duplicates
+                self._link_blob(
+                    key,
+                    _content_digest(b"pickle", data),
+                    lambda: self._compress(data),
+                )
+            else:
+                self._write_as(key, self._compress(data))
+        finally:
+            self._forget_decoded([key])
+
+    def _compress(self, __data: bytes, /) -> bytes:
+        # Compression done in the middle of I/O is measured separately.
+        start = time.perf_counter()
+        payload = compress(__data, self._codec)
+        current_timer().nested(COMPRESS, time.perf_counter() - start)
+        return payload
+
+    def _blob_path(self, __digest: str) -> Path:
+        return self._data_dir / BLOBS_DIR / __digest[:2] / __digest
+
+    def _link_blob(
+        self, key: StorageKey, digest: str, payload: Callable[[], bytes]
+    ) -> None:
+        # Object file becomes hard link to blob, blob is written only when
+        # it doesn't exist yet. Number of links to blob is its reference
+        # count, it is checked under blob lock before blob is removed.
+        blob = self._blob_path(digest)
+        path = self._target(key)
+        file = self._atomic_file(path)
+        with self._atomic_file(blob) as blob_file:
+            try:
+                temp = file.stage_link(blob)
+                logging.debug("Reused blob %s for %s.", digest, key)
+            except FileNotFoundError:
+                blob.parent.mkdir(0o777, True, True)
+                blob_file.commit(
+                    blob_file.stage_bytes(payload(), fsync=self._fsync_files)
+                )
+                temp = file.stage_link(blob)
+        with file:
+            file.commit(temp)
+        self._persist([blob.parent, path.parent])
+        self._invalidate(key)
+
+    def _find_blob(self, __path: Path, __data: bytes, /) -> Optional[Path]:
+        # Finds blob which file is linked to, by hashing its content, as
+        # raw payload and as compressed pickle.
+        stat = __path.stat()
+        digests = [_content_digest(b"raw", __data)]
+        if __data.startswith(HEADER_MAGIC):
+            try:
+                digests.append(_content_digest(b"pickle", unpack(__data)))
+            except Exception:
+                # binary object which just looks like compressed one
+                pass
+        for digest in digests:
+            blob = self._blob_path(digest)
+            try:
+                if os.path.samestat(stat, blob.stat()):
+                    return blob
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _release_blob(self, __blob: Path, /) -> bool:
+        # Removes blob when no object links to it anymore.
+        with self._atomic_file(__blob):
+            try:
+                if __blob.stat().st_nlink > 1:
+                    return False
+                __blob.unlink()
+            except FileNotFoundError:
+                return False
+        self._persist([__blob.parent])
+        logging.debug("Removed unreferenced blob %s.", __blob.name)
+        return True
+
+    def reclaim_blobs(self) -> int:
+        """Remove blobs which no object refers to, in content-addressed mode
+        (see configure(dedupe=...)).
+
+        Blobs are removed when the last object referring to them is deleted,
+        but not when it is overwritten, or when process crashed meanwhile,
+        this method removes such leftovers.
+
+        Returns
+        -------
+        int
+            number of blobs removed.
+        """
+        removed = 0
+        for directory, _, names in os.walk(self._data_dir / BLOBS_DIR):
+            for name in names:
+                if _KEY_PATTERN.fullmatch(name) is None:
+                    continue
+                removed += self._release_blob(Path(directory) / name)
+        logging.debug("Removed %s blobs in %s.", removed, self._data_dir)
+        return removed
+
+    def _load_as(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        /,
+        *,
+        uid: str,
+        **load_kw: Any,
+    ) -> Any:
+        behind = self._behind
+        if behind is not None:
+            key = StorageKey.from_uid(uid)
+            try:
+                pending_type, data = behind.get(key)
+            except KeyError:
+                pass
+            else:
+                if pending_type is store_type:
+                    return deserialize(store_type, data, **load_kw)
+                # has to be decoded from what is going to be written
+                self._settle([key])
+        return super()._load_as(store_type, uid=uid, **load_kw)
+
+    def _settle(self, __keys: Iterable[StorageKey], /) -> None:
+        # Makes pending writes of keys visible on disk.
+        behind = self._behind
+        if behind is not None and any(key in behind for key in __keys):
+            behind.flush()
+
+    def migrate_layout(self) -> int:
+        """Move all objects which are not stored in location given by
+        current directory layout (see configure(shards=...)) to their
+        current locations.
+
+        Storage can be used, also by other processes, while migration is in
+        progress, objects which were not moved yet are moved when they are
+        accessed. When the same object was already written in new location,
+        file from old location is considered outdated and removed.
+
+        Returns
+        -------
+        int
+            number of objects moved.
+
+        Example
+        -------
+        ```
+        >>> tmp = getfixture('tmp_path')
+        >>> fs = FilesystemStorage(tmp)
+        >>> _ = fs.store_json("EXAMPLE UID", {"foo": 32})
+        >>> fs.configure(shards=(2, 2))
+        >>> fs.migrate_layout()
+        1
+        >>> fs.load_json("EXAMPLE UID")
+        {'foo': 32}
+        >>>
+        ```
+        """
+        moved = 0
+        for directory, subdirs, names in os.walk(self._data_dir):
+            if BLOBS_DIR in subdirs:
+                subdirs.remove(BLOBS_DIR)
+            for name in names:
+                if _KEY_PATTERN.fullmatch(name) is None:
+                    continue
+                old_path = Path(directory) / name
+                key = StorageKey(name)
+                path = self._filepath(key)
+                if old_path == path:
+                    continue
+                self._relocate(old_path, self._target(key))
+                moved += 1
+        self._fallback_layouts = ()
+        self._save_layout()
+        logging.debug("Moved %s objects in %s.", moved, self._data_dir)
+        return moved
+
+    def remove_stale_locks(self) -> int:
+        """Remove lock files created next to every object by older versions,
+        current version keeps fixed number of lock files in LOCKS_DIR
+        subdirectory. Also removes cache_if_missing() locks left in LOCKS_DIR
+        by killed processes, which are not held by anyone.
+
+        Must not be called while processes running older versions use the
+        same directory, they would no longer exclude each other.
+
+        Returns
+        -------
+        int
+            number of lock files removed.
+        """
+        removed = 0
+        for directory, subdirs, names in os.walk(self._data_dir):
+            for skipped in (LOCKS_DIR, BLOBS_DIR):
+                if skipped in subdirs:
+                    subdirs.remove(skipped)
+            for name in names:
+                stem = name.split(".", 1)[0]
+                if _KEY_PATTERN.fullmatch(stem) is None or name == stem:
+                    continue
+                if name.endswith(".lock"):
+                    (Path(directory) / name).unlink(missing_ok=True)
+                    removed += 1
+        for path in (self._data_dir / LOCKS_DIR).glob(
+            f"*{FLIGHT_LOCK_SUFFIX}"
+        ):
+            lock = TransientLock(path)
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                continue
+            # removes lock file
+            lock.release()
+            removed += 1
+        logging.debug("Removed %s stale locks in %s.", removed, self._data_dir)
+        return removed
+
+    def _has_flat_objects(self) -> bool:
+        with os.scandir(self._data_dir) as entries:
+            return any(
+                _KEY_PATTERN.fullmatch(entry.name) is not None
+                and entry.is_file()
+                for entry in entries
+            )
+
+    def _flight_lock_path(self, __key: StorageKey) -> Path:
+        # Lock is held while callback of cache_if_missing() runs, which can
+        # take long and can call cache_if_missing() for other objects, so
+        # unlike short write locks it is not striped, stripe shared with
+        # unrelated objects would serialize their callbacks and could
+        # deadlock nested calls. File is removed on release, see
+        # TransientLock.
+        return self._data_dir / LOCKS_DIR / f"{__key}{FLIGHT_LOCK_SUFFIX}"
+
+    @contextmanager
+    def _flight_lock(self, key: StorageKey) -> Iterator[None]:
+        # In-process lock first, so threads don't compete for file lock.
+        with super()._flight_lock(key), TransientLock(
+            self._flight_lock_path(key)
+        ):
+            yield
+
+    def _cached(
+        self, key: StorageKey, read: Callable[[StorageKey], _T], kind: str
+    ) -> _T:
+        cache = self._cache
+        if cache is None:
+            return read(key)
+
+        cache_key = (key, kind)
+        with self._cache_lock:
+            try:
+                return cache[cache_key]  # type: ignore
+            except KeyError:
+                generation = self._cache_generation
+
+        value = read(key)
+        with self._cache_lock:
+            if generation == self._cache_generation:
+                try:
+                    cache[cache_key] = value
+                except ValueError:
+                    # value too large
+                    pass
+        return value
+
+    def _invalidate(self, __key: StorageKey) -> None:
+        cache = self._cache
+        if cache is None:
+            return
+        with self._cache_lock:
+            self._cache_generation += 1
+            for kind in ("text", "bytes"):
+                try:
+                    del cache[(__key, kind)]
+                except KeyError:
+                    pass
+
+    def _cache_stats(self) -> dict[str, dict[str, Any]]:
+        caches = super()._cache_stats()
+        cache = self._cache
+        if isinstance(cache, ReadCache):
+            with self._cache_lock:
+                caches["read_cache"] = cache.stats()
+        return caches
+
+    def _stats(self) -> dict[str, Any]:
+        return {"pending": 0 if self._behind is None else len(self._behind)}
 
-        return self._data_dir / __uid
+    def _is_available(self, __key: StorageKey) -> bool:
+        behind = self._behind
+        if behind is not None and __key in behind:
+            return True
+        return self._resolve(__key).is_file()
 
-    def _get_cache(self) -> Optional[Cache]:
-        return self._cache
+    def _read_text(self, key: StorageKey) -> str:
+        return self._cached(key, self._read_text_file, "text")
 
-    def _is_available(self, __uid: str) -> bool:
-        fname = self._filepath(__uid)
-        return fname.exists() and fname.is_file()
+    def _reading(self, __path: Path) -> ContextManager[AtomicFile]:
+        # Writers replace files atomically, so readers see either old or new
+        # file and lock is taken only when configured.
+        file = self._atomic_file(__path)
+        if self._lock_reads:
+            return file
+        return nullcontext(file)
 
-    @cachedmethod(_get_cache)
-    def _read_text(self, uid: str) -> str:
-        with AtomicFile(self._filepath(uid)) as file:
+    def _read_text_file(self, key: StorageKey) -> str:
+        with self._reading(self._resolve(key)) as file:
             return file.read_text(encoding=self._encoding)
 
-    @cachedmethod(_get_cache)
-    def _read_bytes(self, uid: str) -> bytes:
-        with AtomicFile(self._filepath(uid)) as file:
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        return self._cached(key, self._read_bytes_file, "bytes")
+
+    def _read_bytes_file(self, key: StorageKey) -> bytes:
+        with self._reading(self._resolve(key)) as file:
             return file.read_bytes()
 
-    def _write_text(self, uid: str, item: str) -> None:
-        with AtomicFile(self._filepath(uid)) as file:
-            file.write_text(item, encoding=self._encoding)
+    def load_buffer(self, __uid: str, /) -> memoryview:
+        """Load raw payload of object stored as binary without copying it.
+
+        File is memory mapped and read-only view of it is returned, which is
+        much cheaper than load_bytes() for large payloads. View remains valid
+        even when object is overwritten or deleted meanwhile, it keeps
+        content it was created with. Mapping is closed when view is
+        released, eg. with `with` statement, or garbage collected.
+
+        Parameters
+        ----------
+        __uid : str
+            object unique identifier.
+
+        Returns
+        -------
+        memoryview
+            read-only view of payload.
+
+        Example
+        -------
+        ```
+        >>> tmp = getfixture('tmp_path')
+        >>> fs = FilesystemStorage(tmp)
+        >>> _ = fs.store_bytes("EXAMPLE UID", b"some bytes")
+        >>> with fs.load_buffer("EXAMPLE UID") as view:
+        ...     bytes(view[:4])
+        ...
+        b'some'
+        >>>
+        ```
+        """
+        key = StorageKey.from_uid(__uid)
+        self._settle([key])
+        with self._reading(self._resolve(key)) as file:
+            return file.read_buffer()
+
+    def open_writer(
+        self, __uid: str, /, store_type: StoreType = StoreType.PICKLE
+    ) -> PayloadWriter:
+        """Open binary stream which writes object incrementally, for objects
+        too big to be serialized in memory at once.
+
+        Object is written to temporary file, which replaces stored object
+        when stream is closed. When stream is used as context manager and
+        exception is raised, or stream is never closed, object is left
+        untouched.
+
+        Parameters
+        ----------
+        __uid : str
+            object unique identifier.
+        store_type : StoreType, optional
+            StoreType.PICKLE to compress stream with configured codec, so
+            object can be loaded with load_pickle() or open_reader(), or
+            StoreType.BINARY to write data as is, by default StoreType.PICKLE.
+
+        Returns
+        -------
+        PayloadWriter
+            writable binary stream.
+
+        Example
+        -------
+        ```
+        >>> import pickle
+        >>> tmp = getfixture('tmp_path')
+        >>> fs = FilesystemStorage(tmp)
+        >>> with fs.open_writer("EXAMPLE UID") as stream:
+        ...     pickle.dump({"foo": 32}, stream)
+        ...
+        >>> with fs.open_reader("EXAMPLE UID") as stream:
+        ...     pickle.load(stream)
+        ...
+        {'foo': 32}
+        >>>
+        ```
+        """
+        self._check_stream_type(store_type)
+        key = StorageKey.from_uid(__uid)
+        if self._behind is not None:
+            self._behind.discard([key])
+        path = self._target(key)
+
+        def _on_commit() -> None:
+            self._persist([path.parent])
+            self._invalidate(key)
+            self._forget_decoded([key])
+
+        return PayloadWriter(
+            self._atomic_file(path),
+            self._codec if store_type is StoreType.PICKLE else None,
+            _on_commit,
+            fsync=self._fsync_files,
+        )
+
+    def open_reader(
+        self, __uid: str, /, store_type: StoreType = StoreType.PICKLE
+    ) -> io.BufferedReader:
+        """Open binary stream which reads object incrementally, decompressing
+        it on the fly.
+
+        Stream reads object as it was when stream was opened, even if it is
+        overwritten meanwhile.
+
+        Parameters
+        ----------
+        __uid : str
+            object unique identifier.
+        store_type : StoreType, optional
+            StoreType.PICKLE for objects stored compressed, with
+            store_pickle() or open_writer(), or StoreType.BINARY for data
+            stored as is, by default StoreType.PICKLE.
+
+        Returns
+        -------
+        io.BufferedReader
+            readable binary stream.
+        """
+        self._check_stream_type(store_type)
+        key = StorageKey.from_uid(__uid)
+        self._settle([key])
+        with self._reading(self._resolve(key)) as file:
+            source = file.open_bytes()
+        try:
+            if store_type is StoreType.PICKLE:
+                decompressor, initial = unpack_stream(source.read)
+                raw = PayloadReader(source, decompressor, initial)
+            else:
+                raw = PayloadReader(source, None)
+        except BaseException:
+            source.close()
+            raise
+        return io.BufferedReader(raw)
+
+    @staticmethod
+    def _check_stream_type(store_type: StoreType) -> None:
+        if store_type not in (StoreType.PICKLE, StoreType.BINARY):
+            raise ValueError(
+                f"Streams support only {StoreType.PICKLE} and "
+                f"{StoreType.BINARY}, got {store_type}."
+            )
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        if self._dedupe:
+            self._write_bytes(key, item.encode(self._encoding))
+            return
+        path = self._target(key)
+        with self._atomic_file(path) as file:
+            file.commit(
+                file.stage_text(
+                    item, encoding=self._encoding, fsync=self._fsync_files
+                )
+            )
+        self._persist([path.parent])
+        self._invalidate(key)
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        if self._dedupe:
+            self._link_blob(key, _content_digest(b"raw", item), lambda: item)
+            return
+        path = self._target(key)
+        with self._atomic_file(path) as file:
+            file.commit(file.stage_bytes(item, fsync=self._fsync_files))
+        self._persist([path.parent])
+        self._invalidate(key)
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        if self._behind is not None and __key in self._behind:
+            self._behind.discard([__key])
+            missing_ok = True
+        path = self._resolve(__key)
+        blob = None
+        try:
+            if self._dedupe:
+                blob = self._last_reference(path)
+            path.unlink(missing_ok)
+        finally:
+            self._invalidate(__key)
+        self._persist([path.parent])
+        if blob is not None:
+            self._release_blob(blob)
+
+    def _last_reference(self, __path: Path, /) -> Optional[Path]:
+        # Returns blob file is linked to, when file is the only object
+        # referring to it.
+        try:
+            if __path.stat().st_nlink != 2:
+                return None
+            return self._find_blob(__path, __path.read_bytes())
+        except FileNotFoundError:
+            return None
 
-    def _write_bytes(self, uid: str, item: bytes) -> None:
-        with AtomicFile(self._filepath(uid)) as file:
-            file.write_bytes(item)
+    def _load_many(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        keys: list[StorageKey],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **load_kw: Any,
+    ) -> list[Any]:
+        # Reading and decompression release GIL, so loads can be spread
+        # over thread pool when it is configured.
+        return map_in_order(
+            lambda key: self._load_as(store_type, uid=key, **load_kw),
+            keys,
+            self._executor,
+            return_exceptions=return_exceptions,
+        )
+
+    def _store_many(
+        self,
+        store_type: StoreType,
+        items: list[tuple[StorageKey, Any]],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | Exception]:
+        # All items are serialized and written to temporary files first,
+        # without holding any lock, then each lock is held only for the
+        # time of os.replace(). Both steps run in thread pool when it is
+        # configured. Batches are written directly, replacing pending writes.
+        if self._behind is not None:
+            self._behind.discard(key for key, _ in items)
+        if self._dedupe:
+            # objects are linked to blobs one by one, timed as part of batch
+            def _link(key_item: tuple[StorageKey, Any]) -> StorageKey:
+                key, item = key_item
+                data = serialize(store_type, item, **dump_kw)
+                self._write_serialized(store_type, key, data)
+                return key
+
+            return map_in_order(
+                _link,
+                items,
+                self._executor,
+                return_exceptions=return_exceptions,
+            )
+        staged = map_in_order(
+            lambda key_item: self._stage(store_type, *key_item, **dump_kw),
+            items,
+            self._executor,
+            return_exceptions=True,
+        )
+        errors = [e for e in staged if isinstance(e, Exception)]
+        if errors and not return_exceptions:
+            self._discard(staged)
+            raise errors[0]
+
+        def _commit(
+            key_file_temp: tuple[
+                StorageKey, tuple[AtomicFile, str] | Exception
+            ]
+        ) -> None:
+            key, file_temp = key_file_temp
+            if isinstance(file_temp, Exception):
+                raise file_temp
+            file, temp = file_temp
+            with file:
+                file.commit(temp)
+            self._invalidate(key)
+
+        committed = map_in_order(
+            _commit,
+            [(key, file_temp) for (key, _), file_temp in zip(items, staged)],
+            self._executor,
+            return_exceptions=True,
+        )
+        # single sync of every directory covers whole batch
+        self._persist(
+            [
+                file_temp[0].path.parent
+                for file_temp, result in zip(staged, committed)
+                if not isinstance(result, Exception)
+                and not isinstance(file_temp, Exception)
+            ],
+            batch=True,
+        )
+        errors = [e for e in committed if isinstance(e, Exception)]
+        if errors and not return_exceptions:
+            self._discard(staged)
+            raise errors[0]
 
-    def _delete(self, __uid: str, /, *, missing_ok: bool = False) -> None:
-        self._filepath(__uid).unlink(missing_ok)
+        logging.debug("Dumped %s items as %s.", len(items), store_type)
+        return [
+            result if isinstance(result, Exception) else key
+            for (key, _), result in zip(items, committed)
+        ]
+
+    @staticmethod
+    def _discard(staged: list[tuple[AtomicFile, str] | Exception]) -> None:
+        for file_temp in staged:
+            if not isinstance(file_temp, Exception):
+                Path(file_temp[1]).unlink(missing_ok=True)
+
+    def _stage(
+        self, store_type: StoreType, key: StorageKey, item: Any, **dump_kw: Any
+    ) -> tuple[AtomicFile, str]:
+        raw_value = encode(store_type, item, self._codec, **dump_kw)
+        file = self._atomic_file(self._target(key))
+        if isinstance(raw_value, str):
+            temp = file.stage_text(
+                raw_value, encoding=self._encoding, fsync=self._fsync_files
+            )
+        else:
+            temp = file.stage_bytes(raw_value, fsync=self._fsync_files)
+        return file, temp
 
     def configure(
         self,
         *,
         encoding: str | sentinel = sentinel,
         cache: Optional[Cache] | sentinel = sentinel,
+        codec: str | Codec | sentinel = sentinel,
+        migrate_legacy: bool | sentinel = sentinel,
+        max_workers: Optional[int] | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+        shards: tuple[int, ...] | sentinel = sentinel,
+        lock_reads: bool | sentinel = sentinel,
+        lock_stripes: int | sentinel = sentinel,
+        durability: str | Durability | sentinel = sentinel,
+        group_interval: float | sentinel = sentinel,
+        write_behind: Optional[int] | sentinel = sentinel,
+        dedupe: bool | sentinel = sentinel,
     ) -> None:
         """Configure FileStorage instance.
 
@@ -118,12 +992,237 @@ class FilesystemStorage(StorageIOBase, FullyFeaturedMixin):
         encoding : str | sentinel, optional
             Change encoding used to read/write text, when sentinel, old value is kept, by default "utf-8"
         cache : Optional[Cache] | sentinel, optional
-            Change cache instance used for caching, set to None to disable caching, when sentinel, old value is kept, by default RRCache(maxsize=128)
+            Change cache instance used for caching raw payloads, set to None to
+            disable caching, when sentinel, old value is kept, by default
+            ReadCache() with 32 MiB budget and no expiration. Entries are
+            invalidated on every write and delete done through this storage,
+            use ReadCache(ttl=...) to bound staleness when other processes
+            write to the same directory.
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, eg. "none", "zlib:1",
+            "bz2:9", "lzma:6", see get_codec() for details, when sentinel, old
+            value is kept, by default "zlib:1". Objects stored with other codecs
+            remain readable as every payload names its codec.
+        migrate_legacy : bool | sentinel, optional
+            When True, objects which are missing are looked up under names used
+            by older versions, which hashed identifier more than once, and
+            moved to current location, when sentinel, old value is kept, by
+            default False.
+        max_workers : Optional[int] | sentinel, optional
+            Size of thread pool used by batch operations (load_many(),
+            store_many()) to read, write, compress and decompress items in
+            parallel, None or 1 disables thread pool, when sentinel, old value
+            is kept, by default None.
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip decompression and
+            deserialization of objects loaded before, set to None to disable
+            it, when sentinel, old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        shards : tuple[int, ...] | sentinel, optional
+            Directory layout, widths (in characters of key) of nested
+            directories objects are spread over, eg. (2, 2) stores object
+            with key "abcd..." as "ab/cd/abcd...", which keeps directories
+            small when there are many objects. Empty tuple stores all objects
+            directly in data directory. Layout is recorded in data directory,
+            storages opened on it later use it. Objects stored with previous
+            layouts remain available after switching, they are moved on first
+            access, or all at once with migrate_layout(), when sentinel, old
+            value is kept, by default recorded layout or ().
+        lock_reads : bool | sentinel, optional
+            When True, reads acquire the same file lock as writes. Writes
+            replace files atomically, therefore reads don't need it, except
+            on Windows, where file opened by reader can't be replaced, when
+            sentinel, old value is kept, by default False (True on Windows).
+        lock_stripes : int | sentinel, optional
+            Number of lock files in LOCKS_DIR subdirectory, which objects are
+            hashed to, instead of creating lock file for every object. All
+            processes using the same directory must use the same value.
+            Locks held by cache_if_missing() while object is created are not
+            striped, there is one for every object created, when sentinel,
+            old value is kept, by default DEFAULT_STRIPES.
+        durability : str | Durability | sentinel, optional
+            Policy of syncing writes to disk, "none" leaves it to operating
+            system, "fsync" syncs every write before it returns, "group"
+            syncs every file, but directories only once per batch written
+            with store_many() and once per group_interval for other writes,
+            use sync() to force it, see Durability for details, when
+            sentinel, old value is kept, by default "none".
+        group_interval : float | sentinel, optional
+            Time in seconds for which group commit collects writes, when
+            sentinel, old value is kept, by default DEFAULT_GROUP_INTERVAL.
+        write_behind : Optional[int] | sentinel, optional
+            Size of write-behind queue, when set, store_as() and
+            cache_if_missing() serialize object and return without waiting
+            for it to be written, background thread does it, loads of
+            pending objects decode them from queue. Use flush() or close()
+            to wait for pending writes, they are also written at
+            interpreter exit. None disables queue, after writing pending
+            objects, when sentinel, old value is kept, by default None.
+        dedupe : bool | sentinel, optional
+            When True, objects are stored in content-addressed mode, payload
+            is written once to BLOBS_DIR subdirectory, named after hash of
+            its content, and objects with the same content are hard links to
+            it. Storing object whose content already exists skips compression
+            and writing payload. Blob is removed together with the last object
+            referring to it. Reads are not affected and objects stored
+            before remain readable, streams from open_writer() are never
+            deduplicated. Requires filesystem supporting hard links, when
+            sentinel, old value is kept, by default False.
         """
         if encoding is not sentinel:
             self._encoding = encoding
-            logging.debug(f"Changed encoding of FileStorage to {encoding}.")
+            logging.debug("Changed encoding of FileStorage to %s.", encoding)
+
+        if dedupe is not sentinel:
+            self._dedupe = dedupe  # type: ignore
+            logging.debug(
+                "Changed deduplication of FileStorage to %s.", dedupe
+            )
+
+        if shards is not sentinel:
+            self._set_shards(shards)  # type: ignore
+            logging.debug("Changed shards of FileStorage to %s.", shards)
+
+        if lock_reads is not sentinel:
+            self._lock_reads = lock_reads  # type: ignore
+            logging.debug(
+                "Changed read locking of FileStorage to %s.", lock_reads
+            )
+
+        if write_behind is not sentinel:
+            self._set_write_behind(write_behind)  # type: ignore
+            logging.debug(
+                "Changed write-behind of FileStorage to %s.", write_behind
+            )
+
+        if durability is not sentinel:
+            self._durability = Durability(durability)
+            logging.debug(
+                "Changed durability of FileStorage to %s.", self._durability
+            )
+
+        if group_interval is not sentinel:
+            self._group.close()
+            self._group = GroupCommitter(group_interval)  # type: ignore
+            logging.debug(
+                "Changed group interval of FileStorage to %s.", group_interval
+            )
+
+        if lock_stripes is not sentinel:
+            self._set_lock_stripes(lock_stripes)  # type: ignore
+            logging.debug(
+                "Changed lock stripes of FileStorage to %s.", lock_stripes
+            )
 
         if cache is not sentinel:
-            self._cache = cache  # type: ignore
-            logging.debug(f"Changed cache of FileStorage to {cache}.")
+            with self._cache_lock:
+                self._cache = cache  # type: ignore
+                self._cache_generation += 1
+            logging.debug("Changed cache of FileStorage to %s.", cache)
+
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of FileStorage to %s.", codec)
+
+        if migrate_legacy is not sentinel:
+            self._migrate_legacy = migrate_legacy  # type: ignore
+            logging.debug(
+                "Changed legacy migration of FileStorage to %s.",
+                migrate_legacy,
+            )
+
+        if max_workers is not sentinel:
+            self._set_max_workers(max_workers)  # type: ignore
+            logging.debug(
+                "Changed max_workers of FileStorage to %s.", max_workers
+            )
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of FileStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of FileStorage to %s.", metrics)
+
+    def _set_lock_stripes(self, stripes: int) -> None:
+        # Pools are shared by all storages using the same directory in
+        # process, so their threads coordinate without touching lock files.
+        locks_dir = self._data_dir / LOCKS_DIR
+        self._locks = get_lock_pool(locks_dir, stripes)
+
+    def _load_layout(self) -> None:
+        # Layout recorded in data directory overrides default flat layout.
+        try:
+            layout = json.loads(
+                (self._data_dir / LAYOUT_FILE).read_text(encoding="utf-8")
+            )
+            shards = tuple(layout["shards"])
+            fallback = tuple(tuple(old) for old in layout["fallback"])
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            logging.exception(e)
+            return
+        self._shards = shards
+        self._fallback_layouts = fallback
+
+    def _save_layout(self) -> None:
+        path = self._data_dir / LAYOUT_FILE
+        if not self._shards and not self._fallback_layouts:
+            # the same as no record at all
+            with self._atomic_file(path):
+                path.unlink(missing_ok=True)
+            return
+        layout = {
+            "shards": list(self._shards),
+            "fallback": [list(old) for old in self._fallback_layouts],
+        }
+        with self._atomic_file(path) as file:
+            file.write_text(json.dumps(layout), encoding="utf-8")
+
+    def _set_shards(self, shards: tuple[int, ...]) -> None:
+        shards = tuple(shards)
+        if any(width < 1 for width in shards) or sum(shards) >= 64:
+            raise ValueError(
+                "Shard widths must be positive and shorter than key in "
+                f"total, got {shards}."
+            )
+        self._load_layout()
+        if shards == self._shards:
+            return
+        previous = (self._shards,) + self._fallback_layouts
+        if not self._shards and not self._fallback_layouts:
+            # flat layout without record, usually empty directory
+            previous = ((),) if self._has_flat_objects() else ()
+        self._fallback_layouts = tuple(
+            old for old in dict.fromkeys(previous) if old != shards
+        )
+        self._shards = shards
+        self._shard_dirs.clear()
+        self._save_layout()
+
+    def _set_write_behind(self, maxsize: Optional[int]) -> None:
+        old_behind = self._behind
+        if maxsize is None:
+            self._behind = None
+        else:
+            self._behind = WriteBehindQueue(self._write_pending, maxsize)
+        if old_behind is not None:
+            old_behind.close()
+
+    def _set_max_workers(self, max_workers: Optional[int]) -> None:
+        old_executor = self._executor
+        if max_workers is None or max_workers <= 1:
+            self._executor = None
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers, thread_name_prefix="FilesystemStorage"
+            )
+        if old_executor is not None:
+            old_executor.shutdown(wait=True)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Optional
+from unittest.mock import sentinel
+
+import lmdb
+
+from magic_storage._compression import Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
+from magic_storage._serialization import decode, encode
+from magic_storage._store_type import StoreType
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import FullyFeaturedMixin
+
+__all__ = ["LmdbStorage"]
+
+
+DEFAULT_MAP_SIZE = 1024 * 1024 * 1024
+"""Maximal size of LMDB database, 1 GiB."""
+
+
+class LmdbStorage(StorageIOBase, FullyFeaturedMixin):
+    """Implementation of storage class which keeps all objects in LMDB
+    memory-mapped B-tree, requires lmdb package.
+
+    LMDB supports many concurrent readers in multiple threads and processes
+    with single writer at a time, reads don't take any locks. Text is
+    decoded straight from memory map, without intermediate bytes copy.
+    Binary payloads are copied once out of the map, as LMDB buffers are
+    valid only until transaction ends. Batch operations use single
+    transaction.
+
+    Parameters
+    ----------
+    __path : str | Path
+        path to database directory, created when missing.
+    map_size : int, optional
+        maximal size of database, by default DEFAULT_MAP_SIZE.
+    readonly : bool, optional
+        open existing database for reading only, by default False.
+    """
+
+    def __init__(
+        self,
+        __path: str | Path,
+        *,
+        map_size: int = DEFAULT_MAP_SIZE,
+        readonly: bool = False,
+    ) -> None:
+        __path = Path(__path)
+        __path.mkdir(0o777, True, True)
+        self._path = __path
+
+        self._encoding = "utf-8"
+        self._env = lmdb.open(
+            str(__path), map_size=map_size, readonly=readonly, max_spare_txns=8
+        )
+        super().__init__()
+
+    def _is_available(self, __key: StorageKey) -> bool:
+        with self._env.begin(buffers=True) as txn:
+            return txn.get(__key.encode("ascii")) is not None
+
+    def _read_text(self, key: StorageKey) -> str:
+        with self._env.begin(buffers=True) as txn:
+            return str(self._get(txn, key), self._encoding)
+
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        with self._env.begin(buffers=True) as txn:
+            return bytes(self._get(txn, key))
+
+    @staticmethod
+    def _get(txn: Any, key: StorageKey) -> memoryview:
+        value: Optional[memoryview] = txn.get(key.encode("ascii"))
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def _load_many(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        keys: list[StorageKey],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **load_kw: Any,
+    ) -> list[Any]:
+        if self._object_cache is not None:
+            return super()._load_many(
+                store_type,
+                keys,
+                return_exceptions=return_exceptions,
+                **load_kw,
+            )
+
+        results: list[Any] = []
+        with self._env.begin(buffers=True) as txn:
+            for key in keys:
+                try:
+                    value = self._get(txn, key)
+                    raw_value: str | bytes = (
+                        str(value, self._encoding)
+                        if store_type.is_text()
+                        else bytes(value)
+                    )
+                    results.append(decode(store_type, raw_value, **load_kw))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+        return results
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self._write_bytes(key, item.encode(self._encoding))
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        with self._env.begin(write=True) as txn:
+            txn.put(key.encode("ascii"), item)
+
+    def _store_many(
+        self,
+        store_type: StoreType,
+        items: list[tuple[StorageKey, Any]],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | Exception]:
+        # All objects are encoded first, then written with single
+        # transaction.
+        rows = []
+        results: list[StorageKey | Exception] = []
+        for key, item in items:
+            try:
+                raw_value = encode(store_type, item, self._codec, **dump_kw)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+                continue
+            if isinstance(raw_value, str):
+                raw_value = raw_value.encode(self._encoding)
+            rows.append((key.encode("ascii"), raw_value))
+            results.append(key)
+
+        with self._env.begin(write=True) as txn:
+            for row in rows:
+                txn.put(*row)
+        logging.debug("Dumped %s items as %s.", len(rows), store_type)
+        return results
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        with self._env.begin(write=True) as txn:
+            if not txn.delete(__key.encode("ascii")) and not missing_ok:
+                raise KeyError(__key)
+
+    def close(self) -> None:
+        """Close database environment."""
+        self._env.close()
+        logging.debug("Closed database %s.", self._path)
+
+    def configure(
+        self,
+        *,
+        encoding: str | sentinel = sentinel,
+        codec: str | Codec | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+    ) -> None:
+        """Configure LmdbStorage instance.
+
+        Parameters
+        ----------
+        encoding : str | sentinel, optional
+            Change encoding used to read/write text, when sentinel, old value
+            is kept, by default "utf-8"
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, see get_codec() for
+            details, when sentinel, old value is kept, by default "zlib:1".
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        """
+        if encoding is not sentinel:
+            self._encoding = encoding
+            logging.debug("Changed encoding of LmdbStorage to %s.", encoding)
+
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of LmdbStorage to %s.", codec)
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of LmdbStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of LmdbStorage to %s.", metrics)
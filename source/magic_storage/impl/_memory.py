@@ -1,5 +1,17 @@
 from __future__ import annotations
 
+import logging
+from typing import Any, Hashable, Optional
+from unittest.mock import sentinel
+
+from magic_storage._eviction import (
+    BoundedStore,
+    EvictionCallback,
+    EvictionPolicy,
+)
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
 from magic_storage.base import StorageIOBase
 from magic_storage.mixins import FullyFeaturedMixin
 
@@ -9,36 +21,131 @@ class InMemoryStorage(StorageIOBase, FullyFeaturedMixin):
     """Implementation of storage class which operates only in RAM and thus will
     be lost after garbage collection.
 
-    However it is much faster than any other cache type.
+    However it is much faster than any other cache type. By default it is
+    unbounded, with maxsize or max_bytes it evicts objects according to
+    policy, which makes it suitable as fast tier of TieredStorage. Size of
+    object is len() of its stored payload.
+
+    Parameters
+    ----------
+    maxsize : Optional[int], optional
+        maximal number of objects, None for no limit, by default None.
+    max_bytes : Optional[int], optional
+        maximal total size of stored payloads, in bytes (in characters for
+        text), None for no limit, by default None.
+    policy : EvictionPolicy | str, optional
+        eviction policy, "lru", "lfu" or "fifo", by default "lru".
+    on_evict : Optional[EvictionCallback], optional
+        called with key and raw payload of every evicted object, not called
+        for deleted or overwritten ones, by default None.
+
+    Example
+    -------
+    ```
+    >>> evicted = []
+    >>> storage = InMemoryStorage(maxsize=1, on_evict=lambda k, v: evicted.append(k))
+    >>> first = storage.store_str("first", "foo")
+    >>> second = storage.store_str("second", "bar")
+    >>> storage.is_available("first"), evicted == [first]
+    (False, True)
+    >>>
+    ```
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        maxsize: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: EvictionPolicy | str = EvictionPolicy.LRU,
+        on_evict: Optional[EvictionCallback] = None,
+    ) -> None:
         super().__init__()
-        self.__storage: dict[str, str | bytes] = {}
+        self._on_evict = on_evict
+        self.__storage = BoundedStore(
+            maxsize, max_bytes, policy, on_evict=self._evicted
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of stored payloads."""
+        return self.__storage.nbytes
+
+    @property
+    def evictions(self) -> int:
+        """Number of objects evicted so far."""
+        return self.__storage.evictions
+
+    def __len__(self) -> int:
+        return len(self.__storage)
 
-    def _is_available(self, uid: str) -> bool:
-        return uid in self.__storage
+    def _stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self.__storage),
+            "bytes": self.__storage.nbytes,
+            "evictions": self.__storage.evictions,
+        }
 
-    def _read_text(self, uid: str) -> str:
-        value = self.__storage[uid]
+    def _evicted(self, key: Hashable, value: str | bytes) -> None:
+        assert isinstance(key, StorageKey)
+        self._forget_decoded([key])
+        if self._on_evict is not None:
+            self._on_evict(key, value)
+
+    def _is_available(self, key: StorageKey) -> bool:
+        return key in self.__storage
+
+    def _read_text(self, key: StorageKey) -> str:
+        value = self.__storage[key]
         assert isinstance(value, str)
 
         return value
 
-    def _read_bytes(self, uid: str) -> bytes:
-        value = self.__storage[uid]
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        value = self.__storage[key]
         assert isinstance(value, bytes)
 
         return value
 
-    def _write_text(self, uid: str, item: str) -> None:
-        self.__storage[uid] = item
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self.__storage[key] = item
 
-    def _write_bytes(self, uid: str, item: bytes) -> None:
-        self.__storage[uid] = item
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        self.__storage[key] = item
 
-    def _delete(self, __uid: str, /, *, missing_ok: bool = False) -> None:
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
         if missing_ok:
-            self.__storage.pop(__uid, None)
+            self.__storage.discard(__key)
         else:
-            self.__storage.pop(__uid)
+            self.__storage.pop(__key)
+
+    def configure(
+        self,
+        *,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+    ) -> None:
+        """Configure InMemoryStorage instance.
+
+        Parameters
+        ----------
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        """
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of InMemoryStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of InMemoryStorage to %s.", metrics)
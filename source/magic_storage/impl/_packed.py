@@ -0,0 +1,519 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Optional
+from unittest.mock import sentinel
+
+from filelock import FileLock
+
+from magic_storage._atomic_file import IndexFile
+from magic_storage._compression import Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
+from magic_storage._serialization import encode
+from magic_storage._store_type import StoreType
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import FullyFeaturedMixin
+
+__all__ = ["PackedStorage"]
+
+
+RECORD_HEADER = struct.Struct("<4s32sBQI")
+"""Header of every record: magic, raw key digest, kind, payload length and
+crc32 of payload."""
+
+RECORD_MAGIC = b"MSPK"
+
+DEFAULT_SEGMENT_SIZE = 64 * 1024 * 1024
+"""Size after which new segment file is started, 64 MiB."""
+
+_TOMBSTONE = 0
+_TEXT = 1
+_BYTES = 2
+
+_SEGMENT_NAME = re.compile(r"^segment-(\d{6})\.log$")
+_POSITION_KEY = "@position"
+
+
+@dataclass(frozen=True)
+class _Entry:
+    segment: int
+    offset: int
+    length: int
+    kind: int
+
+    def dump(self) -> str:
+        return f"{self.segment}:{self.offset}:{self.length}:{self.kind}"
+
+    @classmethod
+    def parse(cls, raw: str) -> _Entry:
+        segment, offset, length, kind = map(int, raw.split(":"))
+        return cls(segment, offset, length, kind)
+
+
+class PackedStorage(StorageIOBase, FullyFeaturedMixin):
+    """Implementation of storage class which packs all objects into few
+    append-only segment files, instead of creating file for every object.
+
+    Every store and delete appends record to the newest segment, objects are
+    found with offset index kept in memory. Index snapshot is saved with
+    IndexFile by checkpoint(), compact() and close(), records appended after
+    the snapshot are recovered by scanning segments, therefore index
+    survives crashes. Incomplete record left by crashed writer is truncated
+    by next writer. Space taken by overwritten and deleted objects is
+    reclaimed with compact().
+
+    Writes from multiple processes are serialized with single file lock,
+    index is brought up to date with records appended by other processes
+    before every write, and before every lookup when the newest segment
+    changed size or was removed by compaction.
+
+    Parameters
+    ----------
+    __root : str | Path
+        root dir for storage, if __root points to file, parent directory of
+        this file will be used.
+    subdir : Optional[str], optional
+        nested directory to use for segment files, when None, data will be
+        stored directly in __root, by default "data".
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> from magic_storage import StoreType
+    >>> storage = PackedStorage(tmp)
+    >>> storage.store_as(StoreType.JSON, uid="EXAMPLE UID", item={"foo": 32})
+    '4c9e95de851b875493ba6c6dfb16b6aaae5c3e167aef9ab6edfeb0dbca2f6574'
+    >>> storage.load_as(StoreType.JSON, uid="EXAMPLE UID")
+    {'foo': 32}
+    >>> storage.close()
+    >>>
+    ```
+    """
+
+    def __init__(
+        self, __root: str | Path, *, subdir: Optional[str] = "data"
+    ) -> None:
+        __root = Path(__root)
+        if __root.is_file():
+            __root = __root.parent
+        if subdir is not None:
+            self._data_dir = __root / subdir
+        else:
+            self._data_dir = __root
+        self._data_dir.mkdir(0o777, True, True)
+
+        self._encoding = "utf-8"
+        self._segment_size = DEFAULT_SEGMENT_SIZE
+        # guards index and file handles, file lock guards segments
+        self._mutex = threading.RLock()
+        self._file_lock = FileLock(self._data_dir / "packed.lock")
+        self._index: dict[StorageKey, _Entry] = {}
+        # segment and offset up to which segments were scanned
+        self._position = (1, 0)
+        self._readers: dict[int, IO[bytes]] = {}
+        self._garbage = 0
+        super().__init__()
+
+        with self._mutex:
+            self._load_snapshot()
+            self._refresh()
+
+    def _segment_path(self, __segment: int) -> Path:
+        return self._data_dir / f"segment-{__segment:06d}.log"
+
+    def _segments(self) -> list[int]:
+        segments = []
+        for path in self._data_dir.iterdir():
+            match = _SEGMENT_NAME.match(path.name)
+            if match is not None:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _index_file(self) -> IndexFile:
+        return IndexFile(self._data_dir / "index.json")
+
+    def _load_snapshot(self) -> None:
+        with self._index_file() as index_file:
+            snapshot = dict(index_file.index)
+        self._index.clear()
+        self._position = (1, 0)
+        self._garbage = 0
+        try:
+            position = snapshot.pop(_POSITION_KEY)
+        except KeyError:
+            return
+        try:
+            entries = {
+                StorageKey(key): _Entry.parse(raw)
+                for key, raw in snapshot.items()
+            }
+            segment, offset = map(int, position.split(":"))
+        except ValueError as e:
+            logging.exception(e)
+            return
+        # Snapshot is useless when segments were compacted meanwhile
+        existing = set(self._segments())
+        if not {entry.segment for entry in entries.values()} <= existing:
+            logging.warning("Index snapshot is outdated, rebuilding index.")
+            return
+        self._index.update(entries)
+        self._position = (segment, offset)
+
+    def _refresh(self, *, repair: bool = False) -> None:
+        # Applies records appended after self._position, when repair is
+        # True (file lock must be held), incomplete record at the end of
+        # segment is truncated.
+        segments = self._segments()
+        if not segments:
+            return
+        if self._position[0] not in segments:
+            # segment we stopped at was removed by compaction in other
+            # process, start over from snapshot or from the first segment
+            self._close_readers()
+            self._load_snapshot()
+            if self._position[0] not in segments:
+                self._index.clear()
+                self._garbage = 0
+                self._position = (segments[0], 0)
+
+        segment, offset = self._position
+        for segment in segments:
+            if segment < self._position[0]:
+                continue
+            if segment != self._position[0]:
+                offset = 0
+            offset = self._scan(segment, offset, repair)
+            self._position = (segment, offset)
+
+    def _scan(self, segment: int, offset: int, repair: bool) -> int:
+        path = self._segment_path(segment)
+        with path.open("rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            file.seek(offset)
+            while True:
+                header = file.read(RECORD_HEADER.size)
+                if not header:
+                    return offset
+                try:
+                    magic, digest, kind, length, crc = RECORD_HEADER.unpack(
+                        header
+                    )
+                    if magic != RECORD_MAGIC or file.tell() + length > size:
+                        raise ValueError()
+                    if zlib.crc32(file.read(length)) != crc:
+                        raise ValueError()
+                except (struct.error, ValueError):
+                    # incomplete record, either written right now or torn
+                    if repair:
+                        logging.warning(
+                            "Truncating incomplete record in %s at %s.",
+                            path,
+                            offset,
+                        )
+                        os.truncate(path, offset)
+                    return offset
+                key = StorageKey(digest.hex())
+                self._apply(key, _Entry(segment, offset, length, kind))
+                offset = file.tell()
+
+    def _apply(self, key: StorageKey, entry: _Entry) -> None:
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._garbage += RECORD_HEADER.size + old.length
+        if entry.kind == _TOMBSTONE:
+            self._garbage += RECORD_HEADER.size
+        else:
+            self._index[key] = entry
+
+    def _reader(self, __segment: int) -> IO[bytes]:
+        reader = self._readers.get(__segment)
+        if reader is None:
+            reader = self._segment_path(__segment).open("rb")
+            self._readers[__segment] = reader
+        return reader
+
+    def _read_at(self, segment: int, offset: int, size: int) -> bytes:
+        with self._mutex:
+            reader = self._reader(segment)
+            reader.seek(offset)
+            return reader.read(size)
+
+    def _close_readers(self) -> None:
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def _is_stale(self) -> bool:
+        # Cheap check whether other instance appended records or compacted
+        # segments since index was refreshed, costs single stat() call.
+        segment, offset = self._position
+        try:
+            if os.stat(self._segment_path(segment)).st_size != offset:
+                return True
+        except FileNotFoundError:
+            return True
+        return (
+            offset >= self._segment_size
+            and self._segment_path(segment + 1).exists()
+        )
+
+    def _lookup(self, __key: StorageKey) -> Optional[_Entry]:
+        with self._mutex:
+            # objects could have been stored, overwritten or deleted by other
+            # instance or process
+            if self._is_stale():
+                self._refresh()
+            return self._index.get(__key)
+
+    def _is_available(self, __key: StorageKey) -> bool:
+        return self._lookup(__key) is not None
+
+    def _read_record(self, __key: StorageKey) -> bytes:
+        with self._mutex:
+            entry = self._lookup(__key)
+            if entry is None:
+                raise KeyError(__key)
+            try:
+                record = self._read_at(
+                    entry.segment,
+                    entry.offset,
+                    RECORD_HEADER.size + entry.length,
+                )
+            except FileNotFoundError:
+                # compacted by other process
+                self._close_readers()
+                self._load_snapshot()
+                self._refresh()
+                return self._read_record(__key)
+
+        crc = RECORD_HEADER.unpack_from(record)[4]
+        payload = record[RECORD_HEADER.size :]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Record of {__key} is corrupted.")
+        return payload
+
+    def _read_text(self, key: StorageKey) -> str:
+        return self._read_record(key).decode(self._encoding)
+
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        return self._read_record(key)
+
+    def _append(self, records: list[tuple[StorageKey, int, bytes]]) -> None:
+        # Appends all records with single write, under file lock.
+        with self._mutex, self._file_lock:
+            self._refresh(repair=True)
+            segment, offset = self._position
+            if offset >= self._segment_size:
+                segment, offset = segment + 1, 0
+
+            chunks = []
+            entries = []
+            for key, kind, payload in records:
+                header = RECORD_HEADER.pack(
+                    RECORD_MAGIC,
+                    bytes.fromhex(key),
+                    kind,
+                    len(payload),
+                    zlib.crc32(payload),
+                )
+                chunks.append(header)
+                chunks.append(payload)
+                entries.append(
+                    (key, _Entry(segment, offset, len(payload), kind))
+                )
+                offset += len(header) + len(payload)
+
+            with self._segment_path(segment).open("ab") as file:
+                file.write(b"".join(chunks))
+
+            for key, entry in entries:
+                self._apply(key, entry)
+            self._position = (segment, offset)
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self._append([(key, _TEXT, item.encode(self._encoding))])
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        self._append([(key, _BYTES, item)])
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        with self._mutex:
+            if self._lookup(__key) is None:
+                if missing_ok:
+                    return
+                raise KeyError(__key)
+            self._append([(__key, _TOMBSTONE, b"")])
+
+    def _store_many(
+        self,
+        store_type: StoreType,
+        items: list[tuple[StorageKey, Any]],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | Exception]:
+        # All records are appended with single write.
+        records = []
+        results: list[StorageKey | Exception] = []
+        for key, item in items:
+            try:
+                raw_value = encode(store_type, item, self._codec, **dump_kw)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+                continue
+            if isinstance(raw_value, str):
+                records.append((key, _TEXT, raw_value.encode(self._encoding)))
+            else:
+                records.append((key, _BYTES, raw_value))
+            results.append(key)
+        if records:
+            self._append(records)
+        logging.debug("Dumped %s items as %s.", len(records), store_type)
+        return results
+
+    def checkpoint(self) -> None:
+        """Save snapshot of index, so it doesn't have to be recovered by
+        scanning segments when storage is opened next time."""
+        with self._mutex, self._file_lock:
+            self._refresh(repair=True)
+            self._save_snapshot()
+
+    def _save_snapshot(self) -> None:
+        segment, offset = self._position
+        with self._index_file() as index_file:
+            index_file.clear()
+            index_file.update(
+                {key: entry.dump() for key, entry in self._index.items()}
+            )
+            index_file[_POSITION_KEY] = f"{segment}:{offset}"
+        logging.debug("Saved index snapshot of %s.", self._data_dir)
+
+    def compact(self) -> None:
+        """Rewrite live objects to new segments and remove old segments,
+        reclaiming space taken by overwritten and deleted objects.
+
+        New segments are complete before old ones are removed, if process
+        crashes in between, scanning all segments recovers the same index.
+        """
+        with self._mutex, self._file_lock:
+            self._refresh(repair=True)
+            old_segments = self._segments()
+            segment = (old_segments[-1] if old_segments else 0) + 1
+            offset = 0
+            index: dict[StorageKey, _Entry] = {}
+            file = self._segment_path(segment).open("ab")
+            try:
+                for key, entry in self._index.items():
+                    if offset >= self._segment_size:
+                        file.close()
+                        segment, offset = segment + 1, 0
+                        file = self._segment_path(segment).open("ab")
+                    record = self._read_at(
+                        entry.segment,
+                        entry.offset,
+                        RECORD_HEADER.size + entry.length,
+                    )
+                    file.write(record)
+                    index[key] = _Entry(
+                        segment, offset, entry.length, entry.kind
+                    )
+                    offset += len(record)
+                file.flush()
+                os.fsync(file.fileno())
+            finally:
+                file.close()
+
+            self._index = index
+            self._position = (segment, offset)
+            self._garbage = 0
+            self._save_snapshot()
+            self._close_readers()
+            for old_segment in old_segments:
+                self._segment_path(old_segment).unlink(missing_ok=True)
+        logging.debug("Compacted %s.", self._data_dir)
+
+    def _stats(self) -> dict[str, Any]:
+        # Number of objects, number of segments and size of records which
+        # can be reclaimed with compact().
+        with self._mutex:
+            return {
+                "entries": len(self._index),
+                "segments": len(self._segments()),
+                "garbage_bytes": self._garbage,
+            }
+
+    def close(self) -> None:
+        """Save index snapshot and close open segment files."""
+        with self._mutex:
+            self.checkpoint()
+            self._close_readers()
+
+    def configure(
+        self,
+        *,
+        encoding: str | sentinel = sentinel,
+        codec: str | Codec | sentinel = sentinel,
+        segment_size: int | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+    ) -> None:
+        """Configure PackedStorage instance.
+
+        Parameters
+        ----------
+        encoding : str | sentinel, optional
+            Change encoding used to read/write text, when sentinel, old value
+            is kept, by default "utf-8"
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, see get_codec() for
+            details, when sentinel, old value is kept, by default "zlib:1".
+        segment_size : int | sentinel, optional
+            Size in bytes after which new segment file is started, when
+            sentinel, old value is kept, by default DEFAULT_SEGMENT_SIZE.
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        """
+        if encoding is not sentinel:
+            self._encoding = encoding
+            logging.debug("Changed encoding of PackedStorage to %s.", encoding)
+
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of PackedStorage to %s.", codec)
+
+        if segment_size is not sentinel:
+            self._segment_size = segment_size  # type: ignore
+            logging.debug(
+                "Changed segment size of PackedStorage to %s.", segment_size
+            )
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of PackedStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of PackedStorage to %s.", metrics)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Iterator, Optional
+from unittest.mock import sentinel
+
+from magic_storage._compression import Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
+from magic_storage._serialization import decode, encode
+from magic_storage._store_type import StoreType
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import FullyFeaturedMixin
+
+__all__ = ["SQLiteStorage"]
+
+
+DEFAULT_DATABASE_NAME = "storage.sqlite3"
+"""Name of database file created when directory is given to
+SQLiteStorage."""
+
+
+class _Holder:
+    # Thread-local reference to connection, collected when thread exits.
+
+    __slots__ = ("connection", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+
+
+_CHUNK = 500
+# SQLite limits number of host parameters in single statement
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY NOT NULL,
+    value BLOB NOT NULL
+) WITHOUT ROWID
+"""
+_SELECT_ONE = "SELECT value FROM objects WHERE key = ?"
+_EXISTS = "SELECT 1 FROM objects WHERE key = ?"
+_UPSERT = "INSERT OR REPLACE INTO objects (key, value) VALUES (?, ?)"
+_DELETE = "DELETE FROM objects WHERE key = ?"
+
+
+def _chunks(keys: list[StorageKey]) -> Iterator[list[StorageKey]]:
+    for i in range(0, len(keys), _CHUNK):
+        yield keys[i : i + _CHUNK]
+
+
+class SQLiteStorage(StorageIOBase, FullyFeaturedMixin):
+    """Implementation of storage class which keeps all objects in single
+    SQLite database, in WAL mode.
+
+    Every thread uses its own connection, closed when thread exits,
+    therefore storage can be shared between threads, concurrency between
+    processes is handled by SQLite.
+    Batch operations (store_many(), load_many(), delete_many(),
+    is_available_many()) are done with single transaction.
+
+    Parameters
+    ----------
+    __path : str | Path
+        path to database file, created when missing, when __path points to
+        directory, DEFAULT_DATABASE_NAME file in this directory is used.
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> from magic_storage import StoreType
+    >>> storage = SQLiteStorage(tmp)
+    >>> storage.store_as(StoreType.JSON, uid="EXAMPLE UID", item={"foo": 32})
+    '4c9e95de851b875493ba6c6dfb16b6aaae5c3e167aef9ab6edfeb0dbca2f6574'
+    >>> storage.load_as(StoreType.JSON, uid="EXAMPLE UID")
+    {'foo': 32}
+    >>> storage.close()
+    >>>
+    ```
+    """
+
+    def __init__(self, __path: str | Path) -> None:
+        __path = Path(__path)
+        if __path.is_dir():
+            __path = __path / DEFAULT_DATABASE_NAME
+        __path.parent.mkdir(0o777, True, True)
+        self._path = __path
+
+        self._encoding = "utf-8"
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        super().__init__()
+
+        connection = self._connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        holder: Optional[_Holder] = getattr(self._local, "holder", None)
+        if holder is not None:
+            return holder.connection
+        # autocommit mode, transactions are started explicitly
+        connection = sqlite3.connect(
+            self._path,
+            timeout=60.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA synchronous=NORMAL")
+        holder = self._local.holder = _Holder(connection)
+        with self._connections_lock:
+            self._connections.append(connection)
+        # connection of thread is closed when thread exits, so storage used
+        # by short-lived threads doesn't accumulate open connections
+        weakref.finalize(
+            holder,
+            self._close_connection,
+            self._connections,
+            self._connections_lock,
+            connection,
+        )
+        logging.debug("Opened connection to %s.", self._path)
+        return connection
+
+    @staticmethod
+    def _close_connection(
+        connections: list[sqlite3.Connection],
+        lock: threading.Lock,
+        connection: sqlite3.Connection,
+    ) -> None:
+        with lock:
+            if connection in connections:
+                connections.remove(connection)
+        connection.close()
+
+    def _is_available(self, __key: StorageKey) -> bool:
+        row = self._connection().execute(_EXISTS, (__key,)).fetchone()
+        return row is not None
+
+    def _is_available_many(self, __keys: list[StorageKey], /) -> list[bool]:
+        present = set(self._select_many(__keys, "key").keys())
+        return [key in present for key in __keys]
+
+    def _select_many(
+        self, keys: list[StorageKey], columns: str
+    ) -> dict[str, Any]:
+        connection = self._connection()
+        found: dict[str, Any] = {}
+        connection.execute("BEGIN")
+        try:
+            for chunk in _chunks(list(dict.fromkeys(keys))):
+                placeholders = ", ".join("?" * len(chunk))
+                rows = connection.execute(
+                    f"SELECT key, {columns} FROM objects "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                )
+                found.update(rows)
+        finally:
+            connection.execute("COMMIT")
+        return found
+
+    def _read_value(self, __key: StorageKey) -> str | bytes:
+        row = self._connection().execute(_SELECT_ONE, (__key,)).fetchone()
+        if row is None:
+            raise KeyError(__key)
+        value: str | bytes = row[0]
+        return value
+
+    def _read_text(self, key: StorageKey) -> str:
+        value = self._read_value(key)
+        if isinstance(value, bytes):
+            return value.decode(self._encoding)
+        return value
+
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        value = self._read_value(key)
+        if isinstance(value, str):
+            return value.encode(self._encoding)
+        return value
+
+    def _load_many(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        keys: list[StorageKey],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **load_kw: Any,
+    ) -> list[Any]:
+        # Objects already decoded are taken from object cache.
+        if self._object_cache is not None:
+            return super()._load_many(
+                store_type,
+                keys,
+                return_exceptions=return_exceptions,
+                **load_kw,
+            )
+
+        values = self._select_many(keys, "value")
+        results: list[Any] = []
+        for key in keys:
+            try:
+                value = values[key]
+                if store_type.is_text() and isinstance(value, bytes):
+                    value = value.decode(self._encoding)
+                elif not store_type.is_text() and isinstance(value, str):
+                    value = value.encode(self._encoding)
+                results.append(decode(store_type, value, **load_kw))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self._connection().execute(_UPSERT, (key, item))
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        self._connection().execute(_UPSERT, (key, item))
+
+    def _store_many(
+        self,
+        store_type: StoreType,
+        items: list[tuple[StorageKey, Any]],
+        /,
+        *,
+        return_exceptions: bool = False,
+        **dump_kw: Any,
+    ) -> list[StorageKey | Exception]:
+        # All objects are encoded first, then written with single
+        # transaction, either all of them are stored or none.
+        rows = []
+        results: list[StorageKey | Exception] = []
+        for key, item in items:
+            try:
+                rows.append(
+                    (key, encode(store_type, item, self._codec, **dump_kw))
+                )
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+            else:
+                results.append(key)
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(_UPSERT, rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+        logging.debug("Dumped %s items as %s.", len(rows), store_type)
+        return results
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        cursor = self._connection().execute(_DELETE, (__key,))
+        if cursor.rowcount == 0 and not missing_ok:
+            raise KeyError(__key)
+
+    def _delete_many(
+        self, __keys: list[StorageKey], /, *, missing_ok: bool = False
+    ) -> list[Optional[Exception]]:
+        connection = self._connection()
+        errors: list[Optional[Exception]] = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for key in __keys:
+                cursor = connection.execute(_DELETE, (key,))
+                if cursor.rowcount == 0 and not missing_ok:
+                    errors.append(KeyError(key))
+                else:
+                    errors.append(None)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return errors
+
+    def close(self) -> None:
+        """Close connections of all threads."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+        logging.debug("Closed connections to %s.", self._path)
+
+    def configure(
+        self,
+        *,
+        encoding: str | sentinel = sentinel,
+        codec: str | Codec | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+    ) -> None:
+        """Configure SQLiteStorage instance.
+
+        Parameters
+        ----------
+        encoding : str | sentinel, optional
+            Change encoding used when text is loaded as bytes or vice versa,
+            when sentinel, old value is kept, by default "utf-8"
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, see get_codec() for
+            details, when sentinel, old value is kept, by default "zlib:1".
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        """
+        if encoding is not sentinel:
+            self._encoding = encoding
+            logging.debug("Changed encoding of SQLiteStorage to %s.", encoding)
+
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of SQLiteStorage to %s.", codec)
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of SQLiteStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of SQLiteStorage to %s.", metrics)
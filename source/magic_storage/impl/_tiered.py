@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+from unittest.mock import sentinel
+
+from magic_storage._compression import Codec, get_codec
+from magic_storage._key import StorageKey
+from magic_storage._metrics import MetricsHook
+from magic_storage._object_cache import ObjectCache
+from magic_storage._write_behind import WriteBehindQueue
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import FullyFeaturedMixin
+
+__all__ = ["TieredStorage", "Tier"]
+
+
+_MISSING = (KeyError, FileNotFoundError)
+# Exceptions raised by storages when object is not available.
+
+
+@dataclass(frozen=True)
+class Tier:
+    """Storage used as tier of TieredStorage, with optional limit of number
+    of objects kept in it.
+
+    Parameters
+    ----------
+    storage : StorageIOBase
+        storage backing the tier.
+    capacity : Optional[int], optional
+        maximal number of objects kept in tier, least recently used ones
+        are removed first, None for no limit, by default None.
+    """
+
+    storage: StorageIOBase
+    capacity: Optional[int] = None
+
+
+class TieredStorage(StorageIOBase, FullyFeaturedMixin):
+    """Implementation of storage class which chains other storages, from
+    the fastest to the slowest one, eg. InMemoryStorage in front of
+    FilesystemStorage in front of SQLiteStorage.
+
+    Objects are serialized once, tiers exchange raw payloads. Loads look
+    for object in tiers in order and copy object found in slower tier to
+    all faster ones. Stores write object to every tier, slowest first, or
+    with write-behind queue enabled, to the fastest tier only, slower tiers
+    are written in background. Tiers with capacity evict least recently
+    used objects, which remain available in slower tiers. Capacity is
+    enforced for objects stored and loaded through this instance only.
+
+    Tiers should not be used directly while TieredStorage is in use, as
+    faster tiers would return stale objects.
+
+    Parameters
+    ----------
+    *tiers : StorageIOBase | Tier
+        tiers, from the fastest to the slowest, storages given directly
+        have no capacity limit.
+
+    Example
+    -------
+    ```
+    >>> tmp = getfixture('tmp_path')
+    >>> from magic_storage import FilesystemStorage, InMemoryStorage
+    >>> memory = InMemoryStorage()
+    >>> storage = TieredStorage(Tier(memory, capacity=100), FilesystemStorage(tmp))
+    >>> storage.store_json("EXAMPLE UID", {"foo": 32})
+    '4c9e95de851b875493ba6c6dfb16b6aaae5c3e167aef9ab6edfeb0dbca2f6574'
+    >>> memory.delete("EXAMPLE UID")
+    >>> storage.load_json("EXAMPLE UID")
+    {'foo': 32}
+    >>> memory.is_available("EXAMPLE UID")
+    True
+    >>>
+    ```
+    """
+
+    def __init__(self, *tiers: StorageIOBase | Tier) -> None:
+        if not tiers:
+            raise ValueError("TieredStorage requires at least one tier.")
+        self._tiers: Sequence[Tier] = tuple(
+            tier if isinstance(tier, Tier) else Tier(tier) for tier in tiers
+        )
+        for tier in self._tiers:
+            if tier.capacity is not None and tier.capacity < 1:
+                raise ValueError(
+                    f"Tier capacity must be positive, got {tier.capacity}."
+                )
+        # recently used keys of every tier, for tiers with capacity
+        self._usage: list[OrderedDict[StorageKey, None]] = [
+            OrderedDict() for _ in self._tiers
+        ]
+        self._usage_lock = threading.Lock()
+        self._behind: Optional[WriteBehindQueue[str | bytes]] = None
+        super().__init__()
+
+    @property
+    def tiers(self) -> tuple[Tier, ...]:
+        """Tiers, from the fastest to the slowest."""
+        return tuple(self._tiers)
+
+    def _stats(self) -> dict[str, Any]:
+        return {
+            "pending": 0 if self._behind is None else len(self._behind),
+            "tiers": [tier.storage.stats() for tier in self._tiers],
+        }
+
+    def _touch(self, index: int, key: StorageKey) -> list[StorageKey]:
+        # Marks key as recently used in tier and returns keys to evict.
+        capacity = self._tiers[index].capacity
+        if capacity is None:
+            return []
+        usage = self._usage[index]
+        with self._usage_lock:
+            usage[key] = None
+            usage.move_to_end(key)
+            evicted = []
+            while len(usage) > capacity:
+                evicted.append(usage.popitem(last=False)[0])
+        return evicted
+
+    def _forget(self, index: int, key: StorageKey) -> None:
+        if self._tiers[index].capacity is not None:
+            with self._usage_lock:
+                self._usage[index].pop(key, None)
+
+    def _put(
+        self, index: int, key: StorageKey, raw_value: str | bytes
+    ) -> None:
+        self._tiers[index].storage._write_as(key, raw_value)
+        self._evict(index, self._touch(index, key))
+
+    def _evict(self, index: int, keys: list[StorageKey]) -> None:
+        storage = self._tiers[index].storage
+        for evicted in keys:
+            storage._delete(evicted, missing_ok=True)
+            storage._forget_decoded([evicted])
+            logging.debug("Evicted %s from tier %s.", evicted, index)
+
+    def _read(self, key: StorageKey, text: bool) -> str | bytes:
+        behind = self._behind
+        for index, tier in enumerate(self._tiers):
+            if index == 1 and behind is not None:
+                # pending writes are newer than objects in slower tiers
+                try:
+                    raw_value = behind.get(key)
+                except KeyError:
+                    pass
+                else:
+                    self._put(0, key, raw_value)
+                    return raw_value
+            try:
+                if text:
+                    raw_value = tier.storage._read_text(key)
+                else:
+                    raw_value = tier.storage._read_bytes(key)
+            except _MISSING:
+                self._forget(index, key)
+                continue
+
+            # objects missing in usage, eg. stored by previous instance,
+            # may push tier over its capacity
+            self._evict(index, self._touch(index, key))
+            for faster in range(index):
+                self._put(faster, key, raw_value)
+            if index > 0:
+                logging.debug("Promoted %s from tier %s.", key, index)
+            return raw_value
+        raise KeyError(key)
+
+    def _is_available(self, __key: StorageKey) -> bool:
+        if self._behind is not None and __key in self._behind:
+            return True
+        return any(tier.storage._is_available(__key) for tier in self._tiers)
+
+    def _read_text(self, key: StorageKey) -> str:
+        value = self._read(key, text=True)
+        assert isinstance(value, str)
+        return value
+
+    def _read_bytes(self, key: StorageKey) -> bytes:
+        value = self._read(key, text=False)
+        assert isinstance(value, bytes)
+        return value
+
+    def _write(self, key: StorageKey, raw_value: str | bytes) -> None:
+        behind = self._behind
+        if behind is not None:
+            self._put(0, key, raw_value)
+            behind.put(key, raw_value)
+            return
+        # slowest first, so faster tiers never hold object missing in
+        # slower ones
+        for index in reversed(range(len(self._tiers))):
+            self._put(index, key, raw_value)
+
+    def _write_behind(self, key: Any, raw_value: str | bytes) -> None:
+        for index in reversed(range(1, len(self._tiers))):
+            self._put(index, key, raw_value)
+
+    def _write_text(self, key: StorageKey, item: str) -> None:
+        self._write(key, item)
+
+    def _write_bytes(self, key: StorageKey, item: bytes) -> None:
+        self._write(key, item)
+
+    def _delete(
+        self, __key: StorageKey, /, *, missing_ok: bool = False
+    ) -> None:
+        found = False
+        if self._behind is not None and __key in self._behind:
+            self._behind.discard([__key])
+            found = True
+        for index, tier in enumerate(self._tiers):
+            found = tier.storage._is_available(__key) or found
+            tier.storage._delete(__key, missing_ok=True)
+            tier.storage._forget_decoded([__key])
+            self._forget(index, __key)
+        if not found and not missing_ok:
+            raise KeyError(__key)
+
+    def flush(self) -> None:
+        """Wait until objects pending in write-behind queue are written to
+        all tiers, see configure(write_behind=...)."""
+        if self._behind is not None:
+            self._behind.flush()
+
+    def close(self) -> None:
+        """Write pending objects and stop background thread, tiers are not
+        closed."""
+        behind, self._behind = self._behind, None
+        if behind is not None:
+            behind.close()
+
+    def configure(
+        self,
+        *,
+        codec: str | Codec | sentinel = sentinel,
+        object_cache: Optional[ObjectCache] | sentinel = sentinel,
+        metrics: Optional[MetricsHook] | sentinel = sentinel,
+        write_behind: Optional[int] | sentinel = sentinel,
+    ) -> None:
+        """Configure TieredStorage instance.
+
+        Parameters
+        ----------
+        codec : str | Codec | sentinel, optional
+            Change codec used to compress pickled objects, see get_codec() for
+            details, when sentinel, old value is kept, by default "zlib:1".
+        object_cache : Optional[ObjectCache] | sentinel, optional
+            Cache of decoded objects, lets loads skip deserialization of
+            objects loaded before, set to None to disable it, when sentinel,
+            old value is kept, by default None.
+        metrics : Optional[MetricsHook] | sentinel, optional
+            Hook receiving counters and latencies of operations, eg. Metrics,
+            set to None to disable measurements, when sentinel, old value is
+            kept, by default None.
+        write_behind : Optional[int] | sentinel, optional
+            Size of write-behind queue, when set, stores write object to the
+            fastest tier only and background thread writes it to slower
+            ones, loads of pending objects are served from queue. Use
+            flush() or close() to wait for pending writes, they are also
+            written at interpreter exit. None disables queue, after writing
+            pending objects, when sentinel, old value is kept, by default
+            None.
+        """
+        if codec is not sentinel:
+            self._codec = get_codec(codec)  # type: ignore
+            logging.debug("Changed codec of TieredStorage to %s.", codec)
+
+        if object_cache is not sentinel:
+            self._object_cache = object_cache  # type: ignore
+            logging.debug(
+                "Changed object cache of TieredStorage to %s.", object_cache
+            )
+
+        if metrics is not sentinel:
+            self._metrics = metrics  # type: ignore
+            logging.debug("Changed metrics of TieredStorage to %s.", metrics)
+
+        if write_behind is not sentinel:
+            old_behind = self._behind
+            if write_behind is None:
+                self._behind = None
+            else:
+                self._behind = WriteBehindQueue(
+                    self._write_behind, write_behind  # type: ignore
+                )
+            if old_behind is not None:
+                old_behind.close()
+            logging.debug(
+                "Changed write-behind of TieredStorage to %s.", write_behind
+            )
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+from ._async_cache_if_missing import AsyncCacheIfMissingMixin
 from ._cache_if_missing import CacheIfMissingMixin
 
-__all__ = ["FullyFeaturedMixin", "CacheIfMissingMixin"]
+__all__ = [
+    "FullyFeaturedMixin",
+    "CacheIfMissingMixin",
+    "AsyncFullyFeaturedMixin",
+    "AsyncCacheIfMissingMixin",
+]
 
 
 class FullyFeaturedMixin(CacheIfMissingMixin):
     """Mixin class which aggregates all mixins from magic_storage.mixins
     submodule."""
+
+
+class AsyncFullyFeaturedMixin(AsyncCacheIfMissingMixin):
+    """Mixin class which aggregates all asynchronous mixins from
+    magic_storage.mixins submodule."""
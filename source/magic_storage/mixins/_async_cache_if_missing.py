@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import inspect
+import logging
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    AsyncContextManager,
+    Awaitable,
+    Callable,
+    TypeVar,
+    Union,
+    overload,
+)
+
+from magic_storage._key import StorageKey
+from magic_storage._keyed_lock import AsyncKeyedLock
+from magic_storage._store_type import StoreType
+
+_R = TypeVar("_R")
+
+_FLIGHTS = AsyncKeyedLock()
+
+
+class AsyncCacheIfMissingMixin(ABC):
+    @abstractmethod
+    async def is_available(self, __uid: str, /) -> bool:
+        ...
+
+    @abstractmethod
+    async def load_as(  # noqa: FNE004
+        self,
+        store_type: StoreType,
+        uid: str,
+        **load_kw: Any,
+    ) -> Any:
+        ...
+
+    @abstractmethod
+    async def store_as(
+        self,
+        store_type: StoreType,
+        /,
+        uid: str,
+        item: Any,
+        **dump_kw: Any,
+    ) -> StorageKey:
+        ...
+
+    @overload
+    async def cache_if_missing(
+        self,
+        uid: str,
+        callback: Callable[[], Awaitable[_R]],
+        store_type: StoreType = StoreType.PICKLE,
+    ) -> _R:
+        ...
+
+    @overload
+    async def cache_if_missing(
+        self,
+        uid: str,
+        callback: Callable[[], _R],
+        store_type: StoreType = StoreType.PICKLE,
+    ) -> _R:
+        ...
+
+    async def cache_if_missing(
+        self,
+        uid: str,
+        callback: Callable[[], Union[Awaitable[_R], _R]],
+        store_type: StoreType = StoreType.PICKLE,
+    ) -> _R:
+        """Store and return object if not present in cache, otherwise load from
+        cache and return.
+
+        In case of load failure object cache is recreated.
+
+        Concurrent calls for the same uid are deduplicated (single-flight),
+        callback is run by only one of them, while others wait and then load
+        object it stored.
+
+        Parameters
+        ----------
+        uid : str
+            Object identifier used to find object in cache.
+        callback : Callable[[], Awaitable[_R] | _R]
+            Callback function which can create new object if object is not
+            found in cache, can be coroutine function, then it is awaited.
+        store_type : StoreType, optional
+            Determines how object should be stored in cache, by default StoreType.PICKLE
+
+        Returns
+        -------
+        _R
+            Object loaded from cache OR object created with callback and stored to cache.
+        """
+        key = StorageKey.from_uid(uid)
+
+        # Fast path, no locking when object is already present
+        loaded, item = await self._load_if_available(store_type, key)
+        if loaded:
+            return item  # type: ignore
+
+        async with self._flight_lock(key):
+            # Object could have been created while waiting for lock
+            loaded, item = await self._load_if_available(store_type, key)
+            if loaded:
+                return item  # type: ignore
+            # If cache is not present OR if cache load failed
+            item = callback()
+            if inspect.isawaitable(item):
+                item = await item
+            await self.store_as(store_type, uid=key, item=item)
+            return item  # type: ignore
+
+    async def _load_if_available(
+        self, store_type: StoreType, key: StorageKey
+    ) -> tuple[bool, Any]:
+        if not await self.is_available(key):
+            logging.debug(
+                "Resource '%s' is NOT available thus will be created.", key
+            )
+            return False, None
+
+        logging.debug("'%s' is available and will be loaded.", key)
+        try:
+            return True, await self.load_as(store_type, uid=key)
+        except Exception as e:
+            logging.exception(e)
+        logging.warning(
+            "Failed to load '%s' due to loading error. Cache will be recreated.",
+            key,
+        )
+        return False, None
+
+    def _flight_lock(self, key: StorageKey) -> AsyncContextManager[None]:
+        # Lock held while object is created by cache_if_missing(), by default
+        # in-process only, storages shared between processes should extend it
+        # with inter-process lock.
+        return _FLIGHTS.hold((id(self), key))
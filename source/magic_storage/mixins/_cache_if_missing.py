@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, ContextManager, TypeVar
 
+from magic_storage._key import StorageKey
+from magic_storage._keyed_lock import KeyedLock
 from magic_storage._store_type import StoreType
-from magic_storage._utils import make_uid
+from magic_storage._tracing import span
 
 _R = TypeVar("_R")
 
+_FLIGHTS = KeyedLock()
+
 
 class CacheIfMissingMixin(ABC):
     @abstractmethod
@@ -32,7 +36,7 @@ class CacheIfMissingMixin(ABC):
         uid: str,
         item: Any,
         **dump_kw: Any,
-    ) -> str:
+    ) -> StorageKey:
         ...
 
     def cache_if_missing(
@@ -46,6 +50,10 @@ class CacheIfMissingMixin(ABC):
 
         In case of load failure object cache is recreated.
 
+        Concurrent calls for the same uid are deduplicated (single-flight),
+        callback is run by only one of them, while others wait and then load
+        object it stored.
+
         Parameters
         ----------
         uid : str
@@ -60,23 +68,52 @@ class CacheIfMissingMixin(ABC):
         _R
             Object loaded from cache OR object created with callback and stored to cache.
         """
-        uid = make_uid(uid)
-
-        if self.is_available(uid):
-            logging.debug(f"'{uid}' is available and will be loaded.")
-            try:
-                return self.load_as(store_type, uid=uid)  # type: ignore
-            except Exception as e:
-                logging.exception(e)
-            logging.warning(
-                f"Failed to load '{uid}' due to loading error. Cache will be recreated."
-            )
+        with span(
+            "magic_storage.cache_if_missing", self, store_type
+        ) as current:
+            # Key is computed once here and passed down, calls below won't
+            # hash it again
+            key = StorageKey.from_uid(uid)
+
+            # Fast path, no locking when object is already present
+            loaded, item = self._load_if_available(store_type, key)
+            if loaded:
+                current.set_attribute("hit", True)
+                return item  # type: ignore
 
-        else:
+            with self._flight_lock(key):
+                # Object could have been created while waiting for lock
+                loaded, item = self._load_if_available(store_type, key)
+                current.set_attribute("hit", loaded)
+                if loaded:
+                    return item  # type: ignore
+                # If cache is not present OR if cache load failed
+                item = callback()
+                self.store_as(store_type, uid=key, item=item)
+                return item  # type: ignore
+
+    def _load_if_available(
+        self, store_type: StoreType, key: StorageKey
+    ) -> tuple[bool, Any]:
+        if not self.is_available(key):
             logging.debug(
-                f"Resource '{uid}' is NOT available thus will be created."
+                "Resource '%s' is NOT available thus will be created.", key
             )
-        # If cache is not present OR if cache load failed
-        item = callback()
-        self.store_as(store_type, uid=uid, item=item)
-        return item  # type: ignore
+            return False, None
+
+        logging.debug("'%s' is available and will be loaded.", key)
+        try:
+            return True, self.load_as(store_type, uid=key)
+        except Exception as e:
+            logging.exception(e)
+        logging.warning(
+            "Failed to load '%s' due to loading error. Cache will be recreated.",
+            key,
+        )
+        return False, None
+
+    def _flight_lock(self, key: StorageKey) -> ContextManager[None]:
+        # Lock held while object is created by cache_if_missing(), by default
+        # in-process only, storages shared between processes should extend it
+        # with inter-process lock.
+        return _FLIGHTS.hold((id(self), key))
@@ -4,13 +4,36 @@ from pathlib import Path
 
 import pytest
 
-from .cli_toggle import register_toggle
+from .cli_toggle import Behavior, register_toggle
+from .test_benchmarks_suite.timing import RESULTS, write_json
 
 collect_ignore_glob = ["data/*"]
 
+register_toggle(
+    cli_flag="benchmark",
+    pytest_mark_name="benchmark",
+    cli_flag_doc="Run only benchmarks, other tests are skipped.",
+    pytest_mark_doc="Benchmark, runs only with --benchmark flag.",
+    flag_behavior=Behavior.INCLUDE_WHEN_FLAG_AND_EXCLUDE_OTHERS,
+)
+register_toggle(
+    cli_flag="benchmark-large",
+    pytest_mark_name="benchmark_large",
+    cli_flag_doc="Include benchmarks of payloads of hundreds of MB.",
+    pytest_mark_doc="Large benchmark, runs only with --benchmark-large flag.",
+    flag_behavior=Behavior.INCLUDE_WHEN_FLAG,
+)
+
 
 def pytest_addoption(parser: pytest.Parser) -> None:  # pragma: no cover
     register_toggle.pytest_addoption(parser)
+    parser.addoption(
+        "--benchmark-json",
+        default=None,
+        type=Path,
+        metavar="PATH",
+        help="Write results of benchmarks to JSON file.",
+    )
 
 
 def pytest_configure(config: pytest.Config) -> None:  # pragma: no cover
@@ -25,6 +48,14 @@ def pytest_collection_modifyitems(
     register_toggle.pytest_collection_modifyitems(session, config, items)
 
 
+def pytest_sessionfinish(
+    session: pytest.Session, exitstatus: int
+) -> None:  # pragma: no cover
+    path = session.config.getoption("--benchmark-json")
+    if path is not None:
+        write_json(path, RESULTS)
+
+
 @pytest.fixture(scope="session")
 def test_dir() -> Path:  # pragma: no cover
     return Path(__file__).parent
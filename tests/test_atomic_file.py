@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
 
 import pytest
@@ -30,6 +31,42 @@ class TestAtomicFile:
         with AtomicFile(tmp_file) as file:
             assert file.read_bytes() == ITEM_BYTES_0
 
+    def test_read_buffer_survives_replace(self, tmp_path: Path) -> None:
+        tmp_file = tmp_path / "some_file.bin"
+
+        with AtomicFile(tmp_file) as file:
+            file.write_bytes(ITEM_BYTES_0)
+            view = file.read_buffer()
+
+        assert view.readonly
+        with AtomicFile(tmp_file) as file:
+            file.write_bytes(b"other content")
+
+        assert bytes(view) == ITEM_BYTES_0
+        view.release()
+
+    def test_read_buffer_empty_file(self, tmp_path: Path) -> None:
+        (tmp_path / "empty.bin").touch()
+        assert bytes(AtomicFile(tmp_path / "empty.bin").read_buffer()) == b""
+
+    def test_read_without_lock(self, tmp_path: Path) -> None:
+        tmp_file = tmp_path / "some_file.txt"
+        with AtomicFile(tmp_file) as file:
+            file.write_text(ITEM_TEXT_0)
+
+        file = AtomicFile(tmp_file)
+        assert file.read_text() == ITEM_TEXT_0
+        assert not file._lock.is_locked
+
+    def test_read_missing_creates_nothing(self, tmp_path: Path) -> None:
+        tmp_file = tmp_path / "missing.txt"
+        with pytest.raises(FileNotFoundError):
+            AtomicFile(tmp_file).read_bytes()
+        with AtomicFile(tmp_file) as file:
+            with pytest.raises(FileNotFoundError):
+                file.read_text()
+        assert not tmp_file.exists()
+
 
 class TestIndexFile:
     def test_enter_exit(self, tmp_path: Path) -> None:
@@ -97,6 +134,21 @@ class TestIndexFile:
         with file as index:
             assert len(index.keys()) == 2
 
+    def test_read_does_not_write(self, tmp_path: Path) -> None:
+        path = tmp_path / ".index.json"
+        file = IndexFile(path)
+        with file as index:
+            assert index.get("foo", "") == ""
+        assert not path.exists()
+
+        with file as index:
+            index["foo"] = "spam"
+        mtime = path.stat().st_mtime_ns
+        time.sleep(0.01)
+        with file as index:
+            assert index["foo"] == "spam"
+        assert path.stat().st_mtime_ns == mtime
+
     def test_load_broken(self, tmp_path: Path) -> None:  # noqa: FNE004
         file = IndexFile(tmp_path / ".index.json")
 
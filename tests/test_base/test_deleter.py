@@ -26,3 +26,10 @@ class TestDeleterBase:
 
     def test_delete_suppress_discard_exception(self) -> None:
         DeleterImpl2().delete("", missing_ok=True)
+
+    def test_delete_many_no_suppress(self) -> None:
+        with pytest.raises(KeyError, match="first"):
+            DeleterImpl().delete_many(["first", "second"])
+
+    def test_delete_many_suppress(self) -> None:
+        DeleterImpl2().delete_many(["first", "second"], missing_ok=True)
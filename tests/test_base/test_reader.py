@@ -4,9 +4,10 @@ import json
 import pickle
 from typing import Any
 
+import pytest
 from pytest_mock import MockerFixture
 
-from magic_storage import StoreType
+from magic_storage import StorageKey, StoreType
 from magic_storage._utils import compress
 from magic_storage.base import ReaderBase
 
@@ -98,3 +99,34 @@ class TestReaderBase:
         impl, _ = self.prepare_text(mocker, item)
         value = impl.load_as(StoreType.TEXT, _TESTING_UID)
         assert value == item
+
+    def test_load_many(self, mocker: MockerFixture) -> None:  # noqa: FNE004
+        # Check that load_many() loads every object, in order.
+        impl, _ = self.prepare_text(mocker, json.dumps(ITEM_0))
+        values = impl.load_many(StoreType.JSON, UIDS)
+        assert values == [ITEM_0] * len(UIDS)
+
+    def test_load_many_return_exceptions(  # noqa: FNE004
+        self, mocker: MockerFixture
+    ) -> None:
+        # Check that errors are reported in place of objects which failed.
+        impl, _ = self.prepare_text(mocker, "not a json")
+        values = impl.load_many(
+            StoreType.JSON, UIDS[:2], return_exceptions=True
+        )
+        assert len(values) == 2
+        assert all(isinstance(value, ValueError) for value in values)
+
+        with pytest.raises(ValueError):  # noqa: PT011
+            impl.load_many(StoreType.JSON, UIDS[:2])
+
+    def test_is_available_many(self, mocker: MockerFixture) -> None:
+        # Check that is_available_many() passes keys to _is_available().
+        available = StorageKey.from_uid(UIDS[0])
+        mocker.patch.object(
+            ReaderImpl,
+            "_is_available",
+            side_effect=lambda key: key == available,
+        )
+        statuses = ReaderImpl().is_available_many(UIDS)
+        assert statuses == [True] + [False] * (len(UIDS) - 1)
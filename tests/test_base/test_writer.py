@@ -191,3 +191,34 @@ class TestWriterBase:
         )
 
         assert _mock.called
+
+    def test_store_many(self) -> None:
+        # Check that store_many() passes every item to implementation.
+        impl = WriterImpl()
+        keys = impl.store_many(
+            StoreType.TEXT, dict(zip(UIDS, ITEMS_TEXT * len(UIDS)))
+        )
+        assert len(keys) == len(UIDS)
+        assert keys == list(impl.dumped_text.keys())
+
+    def test_store_many_pairs(self) -> None:
+        # Check that store_many() accepts iterable of (uid, item) pairs.
+        impl = WriterImpl()
+        keys = impl.store_many(StoreType.JSON, [(UIDS[0], ITEM_0)])
+        assert len(impl.dumped_text) == 1
+        assert keys[0] in impl.dumped_text
+
+    def test_store_many_return_exceptions(self) -> None:
+        # Check that errors are reported in place of keys of items which
+        # failed.
+        impl = WriterImpl()
+        results = impl.store_many(
+            StoreType.JSON,
+            [(UIDS[0], ITEM_0), (UIDS[1], object())],
+            return_exceptions=True,
+        )
+        assert not isinstance(results[0], Exception)
+        assert isinstance(results[1], TypeError)
+
+        with pytest.raises(TypeError):
+            impl.store_many(StoreType.JSON, [(UIDS[1], object())])
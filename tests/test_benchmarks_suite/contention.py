@@ -0,0 +1,377 @@
+"""Stress harness running concurrent reads and writes of shared objects from
+many processes and threads, against FilesystemStorage or bare AtomicFile.
+
+Every written payload carries id of its writer, sequence number and digest,
+so torn writes are detected by readers, and lost writes by final check,
+which expects every object to hold the last value written to it by one of
+writers.
+
+    python -m tests.test_benchmarks_suite.contention DIR -p 32 -t 2 --json out.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import queue
+import random
+import statistics
+import sys
+import threading
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from magic_storage import AtomicFile, FilesystemStorage, MetricsHook
+from magic_storage._metrics import LOCK, Labels
+
+DIGEST_SIZE = 32
+MODES = ("storage", "atomic_file")
+
+
+@dataclass(frozen=True)
+class ContentionConfig:
+    processes: int = 4
+    threads: int = 2
+    operations: int = 200
+    """Operations done by every thread."""
+    uids: int = 8
+    """Number of shared objects."""
+    write_ratio: float = 0.5
+    payload_size: int = 4096
+    mode: str = "storage"
+    """"storage" for FilesystemStorage, "atomic_file" for bare AtomicFile."""
+    lock_reads: bool = False
+    timeout: float = 300.0
+
+
+@dataclass
+class ContentionReport:
+    config: ContentionConfig
+    duration: float = 0.0
+    reads: list[float] = field(default_factory=list, repr=False)
+    writes: list[float] = field(default_factory=list, repr=False)
+    lock_waits: list[float] = field(default_factory=list, repr=False)
+    missing_reads: int = 0
+    torn: int = 0
+    lost: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def operations(self) -> int:
+        return len(self.reads) + len(self.writes)
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.duration if self.duration else 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not (self.torn or self.lost or self.errors)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "config": asdict(self.config),
+            "duration": self.duration,
+            "operations": self.operations,
+            "throughput": self.throughput,
+            "read": _latency(self.reads),
+            "write": _latency(self.writes),
+            "lock_wait": {
+                "total": sum(self.lock_waits),
+                **_latency(self.lock_waits),
+            },
+            "missing_reads": self.missing_reads,
+            "torn": self.torn,
+            "lost": self.lost,
+            "errors": self.errors,
+        }
+
+
+def _latency(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+        "max": ordered[-1],
+    }
+
+
+def encode_payload(writer: str, seq: int, body: bytes) -> bytes:
+    content = f"{writer}:{seq}:".encode("ascii") + body
+    return content + sha256(content).digest()
+
+
+def decode_payload(raw: bytes) -> Optional[tuple[str, int]]:
+    """Return writer and sequence number of payload, None when it is torn."""
+    if len(raw) <= DIGEST_SIZE:
+        return None
+    content, digest = raw[:-DIGEST_SIZE], raw[-DIGEST_SIZE:]
+    if sha256(content).digest() != digest:
+        return None
+    writer, seq, _ = content.split(b":", 2)
+    return writer.decode("ascii"), int(seq)
+
+
+class _LockWaits(MetricsHook):
+    # Collects lock waits measured by AtomicFile inside storage operations.
+
+    def __init__(self) -> None:
+        self.samples: list[float] = []
+
+    def observe(self, labels: Labels, phase: str, seconds: float) -> None:
+        if phase == LOCK:
+            self.samples.append(seconds)
+
+
+def _uid(index: int) -> str:
+    return f"shared-{index}"
+
+
+def _accessors(
+    directory: Path, config: ContentionConfig, lock_waits: _LockWaits
+) -> tuple[Callable[[str, bytes], None], Callable[[str], bytes]]:
+    if config.mode == "storage":
+        storage = FilesystemStorage(directory)
+        # read cache would serve objects written by this process only
+        storage.configure(
+            cache=None, lock_reads=config.lock_reads, metrics=lock_waits
+        )
+
+        def store(uid: str, raw: bytes) -> None:
+            storage.store_bytes(uid, raw)
+
+        return store, storage.load_bytes
+
+    def write(uid: str, raw: bytes) -> None:
+        begin = time.perf_counter()
+        with AtomicFile(directory / uid) as file:
+            lock_waits.samples.append(time.perf_counter() - begin)
+            file.write_bytes(raw)
+
+    def read(uid: str) -> bytes:
+        if not config.lock_reads:
+            return AtomicFile(directory / uid).read_bytes()
+        begin = time.perf_counter()
+        with AtomicFile(directory / uid) as file:
+            lock_waits.samples.append(time.perf_counter() - begin)
+            return file.read_bytes()
+
+    return write, read
+
+
+def _run_thread(
+    writer: str,
+    config: ContentionConfig,
+    write: Callable[[str, bytes], None],
+    read: Callable[[str], bytes],
+    start: threading.Barrier,
+    results: list[dict[str, Any]],
+) -> None:
+    result: dict[str, Any] = {
+        "reads": [],
+        "writes": [],
+        "missing_reads": 0,
+        "torn": 0,
+        "last": {},
+        "errors": [],
+    }
+    results.append(result)
+    rng = random.Random(writer)
+    body = rng.randbytes(config.payload_size)
+    last: dict[str, int] = result["last"].setdefault(writer, {})
+    start.wait()
+    try:
+        _run_operations(writer, config, write, read, rng, body, last, result)
+    except BaseException:
+        result["errors"].append(traceback.format_exc())
+
+
+def _run_operations(
+    writer: str,
+    config: ContentionConfig,
+    write: Callable[[str, bytes], None],
+    read: Callable[[str], bytes],
+    rng: random.Random,
+    body: bytes,
+    last: dict[str, int],
+    result: dict[str, Any],
+) -> None:
+    seq = 0
+    for _ in range(config.operations):
+        uid = _uid(rng.randrange(config.uids))
+        if rng.random() < config.write_ratio:
+            seq += 1
+            raw = encode_payload(writer, seq, body)
+            begin = time.perf_counter()
+            write(uid, raw)
+            result["writes"].append(time.perf_counter() - begin)
+            last[uid] = seq
+            continue
+        begin = time.perf_counter()
+        try:
+            raw = read(uid)
+        except (KeyError, FileNotFoundError):
+            result["missing_reads"] += 1
+            continue
+        finally:
+            result["reads"].append(time.perf_counter() - begin)
+        if decode_payload(raw) is None:
+            result["torn"] += 1
+
+
+def _run_process(
+    index: int,
+    directory: Path,
+    config: ContentionConfig,
+    start: Any,
+    results: Any,
+) -> None:
+    result: dict[str, Any] = {
+        "reads": [],
+        "writes": [],
+        "missing_reads": 0,
+        "torn": 0,
+        "last": {},
+        "errors": [],
+    }
+    try:
+        lock_waits = _LockWaits()
+        write, read = _accessors(directory, config, lock_waits)
+        threads_start = threading.Barrier(config.threads + 1)
+        thread_results: list[dict[str, Any]] = []
+        threads = [
+            threading.Thread(
+                target=_run_thread,
+                args=(
+                    f"{index}.{thread}",
+                    config,
+                    write,
+                    read,
+                    threads_start,
+                    thread_results,
+                ),
+            )
+            for thread in range(config.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        result["begin"] = time.monotonic()
+        threads_start.wait()
+        for thread in threads:
+            thread.join()
+        result["end"] = time.monotonic()
+        for thread_result in thread_results:
+            for name in ("reads", "writes", "missing_reads", "torn", "errors"):
+                result[name] += thread_result[name]
+            result["last"].update(thread_result["last"])
+        result["lock_waits"] = lock_waits.samples
+    except BaseException:
+        result["errors"].append(traceback.format_exc())
+    results.put(result)
+
+
+def run_contention(
+    directory: str | Path, config: ContentionConfig
+) -> ContentionReport:
+    """Run stress test in directory, which should be empty, and return its
+    report. Processes are spawned, not forked, like pytest-xdist workers."""
+    directory = Path(directory)
+    directory.mkdir(0o777, True, True)
+    context = multiprocessing.get_context("spawn")
+    start = context.Barrier(config.processes)
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=_run_process,
+            args=(index, directory, config, start, results),
+        )
+        for index in range(config.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    report = ContentionReport(config)
+    last: dict[str, dict[str, int]] = {}
+    begin, end = float("inf"), 0.0
+    try:
+        for _ in processes:
+            result = results.get(timeout=config.timeout)
+            report.reads += result["reads"]
+            report.writes += result["writes"]
+            report.lock_waits += result.get("lock_waits", [])
+            report.missing_reads += result["missing_reads"]
+            report.torn += result["torn"]
+            report.errors += result["errors"]
+            last.update(result["last"])
+            begin = min(begin, result.get("begin", begin))
+            end = max(end, result.get("end", end))
+    except queue.Empty:
+        report.errors.append("Timed out waiting for worker processes.")
+    finally:
+        for process in processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                process.kill()
+    report.duration = max(0.0, end - begin)
+    report.lost = _count_lost(directory, config, last)
+    return report
+
+
+def _count_lost(
+    directory: Path,
+    config: ContentionConfig,
+    last: dict[str, dict[str, int]],
+) -> int:
+    # Final value of object must be the last one written by some writer,
+    # otherwise later write of that writer was lost.
+    _, read = _accessors(directory, config, _LockWaits())
+    lost = 0
+    for index in range(config.uids):
+        uid = _uid(index)
+        written = any(uid in seqs for seqs in last.values())
+        try:
+            decoded = decode_payload(read(uid))
+        except (KeyError, FileNotFoundError):
+            lost += written
+            continue
+        if decoded is None:
+            lost += 1
+            continue
+        writer, seq = decoded
+        lost += last.get(writer, {}).get(uid) != seq
+    return lost
+
+
+def contention_cli(args: list[str]) -> int:
+    parser = argparse.ArgumentParser("contention.py")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--processes", "-p", type=int, default=4)
+    parser.add_argument("--threads", "-t", type=int, default=2)
+    parser.add_argument("--operations", "-n", type=int, default=200)
+    parser.add_argument("--uids", "-u", type=int, default=8)
+    parser.add_argument("--write-ratio", "-w", type=float, default=0.5)
+    parser.add_argument("--payload-size", "-s", type=int, default=4096)
+    parser.add_argument("--mode", "-m", choices=MODES, default="storage")
+    parser.add_argument("--lock-reads", action="store_true", default=False)
+    parser.add_argument("--json", type=Path, default=None)
+    namespace = vars(parser.parse_args(args))
+    directory = namespace.pop("directory")
+    json_path = namespace.pop("json")
+    report = run_contention(directory, ContentionConfig(**namespace))
+    summary = json.dumps(report.summary(), indent=2)
+    if json_path is not None:
+        json_path.write_text(summary, encoding="utf-8")
+    print(summary)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(contention_cli(sys.argv[1:]))
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+
+from magic_storage._compression import (
+    available_codecs,
+    get_codec,
+    pack,
+    unpack,
+)
+
+from ..data import ITEM_0, ITEM_1, ITEM_TEXT_0, ITEM_TEXT_1
+from .timing import measure
+
+PAYLOADS: dict[str, bytes] = {
+    "text": pickle.dumps(ITEM_TEXT_0 + ITEM_TEXT_1),
+    "item-0": pickle.dumps(ITEM_0),
+    "item-1": pickle.dumps(ITEM_1),
+    # multi-MB payload, similar to large responses cached in test fleets
+    # json round trip breaks up shared references which pickle would memoize
+    "item-0-x2000": pickle.dumps(json.loads(json.dumps(ITEM_0 * 2000))),
+}
+
+CODECS: list[str] = [
+    spec
+    for name in available_codecs()
+    for spec in (
+        [name]
+        if get_codec(name).level is None
+        else [f"{name}:1", f"{name}:{get_codec(name).default_level}"]
+    )
+]
+
+
+@pytest.mark.benchmark()
+@pytest.mark.parametrize("payload_name", PAYLOADS.keys())
+@pytest.mark.parametrize("codec_spec", CODECS)
+def test_codec(codec_spec: str, payload_name: str) -> None:
+    codec = get_codec(codec_spec)
+    payload = PAYLOADS[payload_name]
+    repeat = 3 if len(payload) > 1 << 20 else 50
+
+    packed = pack(codec, payload)
+    ratio = len(packed) / len(payload)
+    print(f"\n{codec_spec} on {payload_name}: ratio {ratio:.3f}")
+
+    measure(
+        f"pack {codec_spec} {payload_name}",
+        lambda: pack(codec, payload),
+        repeat=repeat,
+    )
+    measure(
+        f"unpack {codec_spec} {payload_name}",
+        lambda: unpack(packed),
+        repeat=repeat,
+    )
+    assert unpack(packed) == payload
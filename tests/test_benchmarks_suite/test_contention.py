@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+from pathlib import Path
+
+import pytest
+
+from .contention import (
+    ContentionConfig,
+    decode_payload,
+    encode_payload,
+    run_contention,
+)
+from .timing import record
+
+
+def test_payload_round_trip() -> None:
+    raw = encode_payload("0.1", 7, b"body")
+    assert decode_payload(raw) == ("0.1", 7)
+    assert decode_payload(raw[:-1] + b"\0") is None
+    assert decode_payload(raw[:10]) is None
+
+
+@pytest.mark.parametrize("mode", ["storage", "atomic_file"])
+def test_no_torn_or_lost_writes(tmp_path: Path, mode: str) -> None:
+    config = ContentionConfig(
+        processes=2, threads=2, operations=50, uids=4, mode=mode
+    )
+    report = run_contention(tmp_path, config)
+    assert report.errors == []
+    assert report.torn == 0
+    assert report.lost == 0
+    assert report.operations == 2 * 2 * 50
+    assert len(report.lock_waits) >= len(report.writes)
+
+
+@pytest.mark.benchmark()
+@pytest.mark.parametrize("lock_reads", [False, True])
+@pytest.mark.parametrize("mode", ["storage", "atomic_file"])
+@pytest.mark.parametrize("processes", [4, 32])
+def test_contention(
+    tmp_path: Path, processes: int, mode: str, lock_reads: bool
+) -> None:
+    config = ContentionConfig(
+        processes=processes,
+        threads=2,
+        operations=200,
+        mode=mode,
+        lock_reads=lock_reads,
+    )
+    report = run_contention(tmp_path, config)
+    summary = report.summary()
+    print(
+        f"\n{processes} processes {mode} lock_reads={lock_reads}: "
+        f"{summary['throughput']:.1f} ops/s, "
+        f"lock wait {summary['lock_wait']['total']:.3f}s"
+    )
+    params = asdict(config)
+    for operation, samples in (
+        ("read", report.reads),
+        ("write", report.writes),
+        ("lock_wait", report.lock_waits),
+    ):
+        if samples:
+            record(
+                f"contention {operation} {mode} "
+                f"{processes}x{config.threads} lock_reads={lock_reads}",
+                samples,
+                params={"operation": operation, **params},
+                nbytes=config.payload_size,
+            )
+    assert report.ok, summary
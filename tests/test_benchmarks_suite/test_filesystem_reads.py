@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from magic_storage import FilesystemStorage
+
+from ..data import ITEM_0, ITEM_BYTES_0, UIDS
+from .timing import measure
+
+
+@pytest.mark.benchmark()
+@pytest.mark.parametrize("lock_reads", [True, False])
+def test_read_latency(tmp_path: Path, lock_reads: bool) -> None:
+    impl = FilesystemStorage(tmp_path)
+    # raw payload cache would hide cost of file access
+    impl.configure(cache=None, lock_reads=lock_reads)
+    impl.store_bytes(UIDS[0], ITEM_BYTES_0)
+    impl.store_json(UIDS[1], ITEM_0)
+
+    mode = "locked" if lock_reads else "lock-free"
+    measure(
+        f"load_bytes {mode}",
+        lambda: impl.load_bytes(UIDS[0]),
+        repeat=500,
+    )
+    measure(
+        f"load_json {mode}",
+        lambda: impl.load_json(UIDS[1]),
+        repeat=500,
+    )
+    measure(
+        f"is_available {mode}",
+        lambda: impl.is_available(UIDS[0]),
+        repeat=500,
+    )
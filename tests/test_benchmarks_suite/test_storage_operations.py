@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from magic_storage import (
+    FilesystemStorage,
+    InMemoryStorage,
+    ObjectCache,
+    ReadCache,
+    StoreType,
+)
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import CacheIfMissingMixin
+
+from ..data import ITEM_TEXT_0, ITEM_TEXT_1, UIDS
+from .timing import measure
+
+UID = UIDS[0]
+
+# size label, approximate payload size in bytes and number of timed calls
+SIZES = [
+    pytest.param(("64B", 64, 200), id="64B"),
+    pytest.param(("64KiB", 64 << 10, 50), id="64KiB"),
+    pytest.param(("4MiB", 4 << 20, 5), id="4MiB"),
+    pytest.param(
+        ("256MiB", 256 << 20, 2),
+        id="256MiB",
+        marks=pytest.mark.benchmark_large(),
+    ),
+]
+
+TEXT = ITEM_TEXT_0 + ITEM_TEXT_1
+
+
+def make_item(store_type: StoreType, size: int) -> Any:
+    """Return object of given store type, which serializes to about size
+    bytes."""
+    if store_type is StoreType.TEXT:
+        return (TEXT * (size // len(TEXT) + 1))[:size]
+    if store_type is StoreType.BINARY:
+        return random.Random(size).randbytes(size)
+    # records have longer text in larger items, so number of objects stays
+    # reasonable for items of hundreds of MB
+    text = TEXT[: max(16, min(len(TEXT), size >> 12))]
+    record_size = len(text) + 40
+    return [
+        {"index": index, "name": f"item-{index}", "text": text}
+        for index in range(max(1, size // record_size))
+    ]
+
+
+def make_storage(backend: str, cached: bool, tmp_path: Path) -> StorageIOBase:
+    storage: StorageIOBase
+    object_cache = ObjectCache() if cached else None
+    if backend == "memory":
+        storage = InMemoryStorage()
+        storage.configure(object_cache=object_cache)
+    else:
+        storage = FilesystemStorage(tmp_path)
+        storage.configure(
+            cache=ReadCache(1 << 30) if cached else None,
+            object_cache=object_cache,
+        )
+    return storage
+
+
+@pytest.mark.benchmark()
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("store_type", list(StoreType), ids=str)
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "uncached"])
+@pytest.mark.parametrize("backend", ["memory", "filesystem"])
+def test_storage_operations(
+    tmp_path: Path,
+    backend: str,
+    cached: bool,
+    store_type: StoreType,
+    size: tuple[str, int, int],
+) -> None:
+    label, nbytes, repeat = size
+    storage = make_storage(backend, cached, tmp_path)
+    assert isinstance(storage, CacheIfMissingMixin)
+    item = make_item(store_type, nbytes)
+    warmup = 1 if nbytes > 1 << 20 else 2
+    params = {
+        "backend": backend,
+        "cache": cached,
+        "store_type": store_type.name,
+        "size": label,
+    }
+
+    def run(operation: str, func: Any, **kwargs: Any) -> None:
+        measure(
+            f"{operation} {backend} "
+            f"{'cached' if cached else 'uncached'} {store_type} {label}",
+            func,
+            repeat=repeat,
+            warmup=warmup,
+            params={"operation": operation, **params},
+            nbytes=nbytes,
+            **kwargs,
+        )
+
+    def store() -> None:
+        storage.store_as(store_type, uid=UID, item=item)
+
+    def delete() -> None:
+        storage.delete(UID, missing_ok=True)
+
+    def cache_if_missing() -> None:
+        storage.cache_if_missing(UID, lambda: item, store_type)
+
+    run("store", store)
+    run("load", lambda: storage.load_as(store_type, uid=UID))
+    run("is_available", lambda: storage.is_available(UID))
+    run("delete", delete, setup=store)
+    run("cache_if_missing_miss", cache_if_missing, setup=delete)
+    run("cache_if_missing_hit", cache_if_missing)
+    assert storage.is_available(UID)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import magic_storage
+
+# Timings measured in current session, written by conftest when
+# --benchmark-json is given.
+RESULTS: list[Timing] = []
+
+
+@dataclass(frozen=True)
+class Timing:
+    name: str
+    samples: list[float] = field(repr=False)
+    params: dict[str, Any] = field(default_factory=dict)
+    nbytes: Optional[int] = None
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def minimum(self) -> float:
+        return min(self.samples)
+
+    @property
+    def maximum(self) -> float:
+        return max(self.samples)
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.mean if self.mean else float("inf")
+
+    @property
+    def bytes_per_second(self) -> Optional[float]:
+        if self.nbytes is None:
+            return None
+        return self.nbytes * self.ops_per_second
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> str:
+        return (
+            f"{self.name:<48} "
+            f"min {self.minimum * 1e6:>12.1f}us  "
+            f"median {self.median * 1e6:>12.1f}us  "
+            f"{self.ops_per_second:>12.1f} ops/s"
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "params": self.params,
+            "rounds": len(self.samples),
+            "nbytes": self.nbytes,
+            "min": self.minimum,
+            "mean": self.mean,
+            "median": self.median,
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.maximum,
+            "ops_per_second": self.ops_per_second,
+            "bytes_per_second": self.bytes_per_second,
+        }
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    *,
+    repeat: int = 20,
+    warmup: int = 2,
+    setup: Optional[Callable[[], Any]] = None,
+    params: Optional[dict[str, Any]] = None,
+    nbytes: Optional[int] = None,
+) -> Timing:
+    """Time func repeat times, setup is called before every call, also
+    during warmup, and is not timed. Params and nbytes (size of payload
+    processed by single call) are included in JSON results."""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        begin = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - begin)
+
+    return record(name, samples, params=params, nbytes=nbytes)
+
+
+def record(
+    name: str,
+    samples: list[float],
+    *,
+    params: Optional[dict[str, Any]] = None,
+    nbytes: Optional[int] = None,
+) -> Timing:
+    """Add samples measured elsewhere to results."""
+    timing = Timing(name, samples, dict(params or {}), nbytes)
+    RESULTS.append(timing)
+    print(timing.summary())
+    return timing
+
+
+def write_json(path: Path, timings: list[Timing]) -> None:
+    """Write timings with description of environment to JSON file, which
+    can be compared with other run by scripts/compare_benchmarks.py."""
+    document = {
+        "version": magic_storage.__version__,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+        "results": [timing.to_json() for timing in timings],
+    }
+    path.parent.mkdir(0o777, True, True)
+    path.write_text(json.dumps(document, indent=2), encoding="utf-8")
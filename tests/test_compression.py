@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import io
+import lzma
+import pickle
+
+import pytest
+
+from magic_storage._compression import (
+    Codec,
+    NoneCodec,
+    ZlibCodec,
+    available_codecs,
+    get_codec,
+    pack,
+    register_codec,
+    unpack,
+    unpack_stream,
+)
+
+from .data import ITEM_0, ITEM_BYTES_0
+
+PAYLOAD = pickle.dumps(ITEM_0)
+
+
+class TestCodecRegistry:
+    def test_builtin_codecs_available(self) -> None:
+        for name in ("none", "zlib", "bz2", "lzma"):
+            assert name in available_codecs()
+
+    def test_get_codec_with_level(self) -> None:
+        codec = get_codec("zlib:1")
+        assert isinstance(codec, ZlibCodec)
+        assert codec.level == 1
+        assert codec.spec == "zlib:1"
+
+    def test_get_codec_default_level(self) -> None:
+        assert get_codec("zlib").level == ZlibCodec.default_level
+        assert get_codec("none").level is None
+
+    def test_get_codec_passes_instance(self) -> None:
+        codec = NoneCodec()
+        assert get_codec(codec) is codec
+
+    def test_get_codec_unknown(self) -> None:
+        with pytest.raises(ValueError, match="not available"):
+            get_codec("no-such-codec")
+
+    def test_register_custom_codec(self) -> None:
+        @register_codec
+        class ReverseCodec(Codec):
+            name = "test-reverse"
+
+            def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+                return bytes(data)[::-1]
+
+            def decompress(
+                self, data: bytes | bytearray | memoryview
+            ) -> bytes:
+                return bytes(data)[::-1]
+
+        payload = pack(get_codec("test-reverse"), ITEM_BYTES_0)
+        assert unpack(payload) == ITEM_BYTES_0
+
+
+class TestPackUnpack:
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_round_trip(self, name: str) -> None:
+        codec = get_codec(name)
+        assert unpack(pack(codec, PAYLOAD)) == PAYLOAD
+
+    def test_header_names_codec(self) -> None:
+        payload = pack(get_codec("bz2"), PAYLOAD)
+        assert b"bz2" in payload[:16]
+        # payload is decompressed with codec from header, regardless of
+        # default codec
+        assert unpack(payload) == PAYLOAD
+
+    def test_legacy_lzma_payload(self) -> None:
+        # Payloads stored before codec header was introduced were plain xz.
+        legacy = lzma.compress(PAYLOAD, format=lzma.FORMAT_XZ, preset=6)
+        assert unpack(legacy) == PAYLOAD
+
+    def test_unknown_payload(self) -> None:
+        with pytest.raises(ValueError, match="known codec"):
+            unpack(b"definitely not compressed")
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("name", available_codecs())
+    def test_incremental_round_trip(self, name: str) -> None:
+        codec = get_codec(name)
+        compressor = codec.compressor()
+        chunks = [compressor.compress(PAYLOAD[i : i + 100]) for i in (0, 100)]
+        chunks.append(compressor.compress(PAYLOAD[200:]))
+        compressed = b"".join(chunks) + compressor.flush()
+        # incremental output is compatible with one-shot compression
+        assert codec.decompress(compressed) == PAYLOAD
+
+        decompressor = codec.decompressor()
+        data = b"".join(
+            decompressor.decompress(bytes([b])) for b in compressed
+        )
+        assert data + decompressor.flush() == PAYLOAD
+
+    def test_buffering_fallback(self) -> None:
+        class ReverseCodec(Codec):
+            name = "test-reverse-stream"
+
+            def compress(self, data: bytes | bytearray | memoryview) -> bytes:
+                return bytes(data)[::-1]
+
+            def decompress(
+                self, data: bytes | bytearray | memoryview
+            ) -> bytes:
+                return bytes(data)[::-1]
+
+        codec = ReverseCodec()
+        compressor = codec.compressor()
+        compressed = compressor.compress(b"abc") + compressor.flush()
+        assert compressed == b"cba"
+        decompressor = codec.decompressor()
+        assert decompressor.decompress(compressed) + decompressor.flush() == (
+            b"abc"
+        )
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            pack(get_codec("zlib"), PAYLOAD),
+            lzma.compress(PAYLOAD, format=lzma.FORMAT_XZ),
+        ],
+    )
+    def test_unpack_stream(self, payload: bytes) -> None:
+        stream = io.BytesIO(payload)
+        decompressor, initial = unpack_stream(stream.read)
+        data = initial + decompressor.decompress(stream.read())
+        assert data + decompressor.flush() == PAYLOAD
+
+    def test_unpack_stream_unknown_payload(self) -> None:
+        with pytest.raises(ValueError, match="known codec"):
+            unpack_stream(io.BytesIO(b"definitely not compressed").read)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from magic_storage import _durability
+from magic_storage._durability import GroupCommitter, fsync_directory
+
+
+class TestGroupCommitter:
+    def test_fsync_directory(self, tmp_path: Path) -> None:
+        fsync_directory(tmp_path)
+
+    def test_flush_syncs_each_directory_once(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        spy = mocker.spy(_durability, "fsync_directory")
+        committer = GroupCommitter(interval=60)
+        committer.mark([tmp_path, tmp_path])
+        committer.mark([tmp_path])
+        assert committer.flush() == 1
+        assert committer.flush() == 0
+        assert spy.call_count == 1
+        committer.close()
+
+    def test_background_flush(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        spy = mocker.spy(_durability, "fsync_directory")
+        committer = GroupCommitter(interval=0.01)
+        committer.mark([tmp_path])
+        deadline = time.monotonic() + 5
+        while spy.call_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert spy.call_count == 1
+        committer.close()
+
+    def test_close_flushes(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        spy = mocker.spy(_durability, "fsync_directory")
+        committer = GroupCommitter(interval=60)
+        committer.mark([tmp_path])
+        committer.close()
+        assert spy.call_count == 1
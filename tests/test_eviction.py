@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from typing import Hashable
+
+import pytest
+
+from magic_storage import EvictionPolicy
+from magic_storage._eviction import BoundedStore
+
+
+class TestBoundedStore:
+    def test_unbounded(self) -> None:
+        store = BoundedStore()
+        for index in range(100):
+            store[index] = b"x" * index
+        assert len(store) == 100
+        assert store.nbytes == sum(range(100))
+        assert store.evictions == 0
+
+    def test_lru(self) -> None:
+        store = BoundedStore(maxsize=2, policy="lru")
+        store["a"] = "1"
+        store["b"] = "2"
+        assert store["a"] == "1"
+        store["c"] = "3"
+        assert list(store) == ["a", "c"]
+
+    def test_fifo(self) -> None:
+        store = BoundedStore(maxsize=2, policy=EvictionPolicy.FIFO)
+        store["a"] = "1"
+        store["b"] = "2"
+        assert store["a"] == "1"
+        store["c"] = "3"
+        assert list(store) == ["b", "c"]
+
+    def test_lfu(self) -> None:
+        store = BoundedStore(maxsize=2, policy=EvictionPolicy.LFU)
+        store["a"] = "1"
+        store["b"] = "2"
+        for _ in range(3):
+            assert store["b"] == "2"
+        assert store["a"] == "1"
+        # new entry is never evicted for being used least
+        store["c"] = "3"
+        assert set(store) == {"b", "c"}
+        store["d"] = "4"
+        assert set(store) == {"b", "d"}
+
+    def test_max_bytes(self) -> None:
+        evicted: list[tuple[Hashable, str | bytes]] = []
+        store = BoundedStore(
+            max_bytes=10, on_evict=lambda k, v: evicted.append((k, v))
+        )
+        store["a"] = b"aaaa"
+        store["b"] = b"bbbb"
+        store["c"] = b"cccccc"
+        assert evicted == [("a", b"aaaa")]
+        assert store.nbytes == 10
+        # payload bigger than budget is evicted at once
+        store["d"] = b"d" * 11
+        assert len(store) == 0
+        assert store.evictions == 4
+
+    def test_overwrite_and_pop_not_evicted(self) -> None:
+        evicted: list[Hashable] = []
+        store = BoundedStore(
+            maxsize=1, on_evict=lambda k, v: evicted.append(k)
+        )
+        store["a"] = "1"
+        store["a"] = "22"
+        assert store.nbytes == 2
+        assert store.pop("a") == "22"
+        store.discard("a")
+        with pytest.raises(KeyError):
+            store.pop("a")
+        assert evicted == []
+
+    def test_callback_error_ignored(self) -> None:
+        def fail(key: Hashable, value: str | bytes) -> None:
+            raise RuntimeError(key)
+
+        store = BoundedStore(maxsize=1, on_evict=fail)
+        store["a"] = "1"
+        store["b"] = "2"
+        assert list(store) == ["b"]
+
+    def test_invalid_limits(self) -> None:
+        with pytest.raises(ValueError):
+            BoundedStore(maxsize=0)
+        with pytest.raises(ValueError):
+            BoundedStore(max_bytes=-1)
+        with pytest.raises(ValueError):
+            BoundedStore(policy="random")
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from magic_storage import (
+    AsyncFilesystemStorage,
+    FilesystemStorage,
+    StorageKey,
+    StoreType,
+)
+
+from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
+
+UID = UIDS[0]
+
+
+class TestAsyncFilesystemStorage:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "store_type,item",
+        [
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+            (StoreType.JSON, ITEM_0),
+            (StoreType.PICKLE, ITEM_1),
+        ],
+    )
+    async def test_io(
+        self, tmp_path: Path, store_type: StoreType, item: object
+    ) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        await impl.store_as(store_type, UID, item)
+        assert await impl.is_available(UID) is True
+        assert await impl.load_as(store_type, UID) == item
+
+    @pytest.mark.asyncio
+    async def test_write_behind(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        release = threading.Event()
+        write_text = impl._storage._write_text
+
+        def _slow_write(key: StorageKey, item: str) -> None:
+            release.wait()
+            write_text(key, item)
+
+        mocker.patch.object(impl._storage, "_write_text", _slow_write)
+
+        # returns before object is written
+        await impl.store_json(UID, ITEM_0)
+        assert not FilesystemStorage(tmp_path).is_available(UID)
+        assert await impl.is_available(UID) is True
+        assert await impl.load_json(UID) == ITEM_0
+        calls: list[None] = []
+
+        def _create() -> object:
+            calls.append(None)
+            return ITEM_1
+
+        assert await impl.cache_if_missing(UID, _create, StoreType.JSON) == (
+            ITEM_0
+        )
+        assert calls == []
+
+        release.set()
+        impl._storage.flush()
+        assert FilesystemStorage(tmp_path).load_json(UID) == ITEM_0
+        impl._storage.close()
+
+    @pytest.mark.asyncio
+    async def test_shares_files_with_sync_storage(
+        self, tmp_path: Path
+    ) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        await impl.store_pickle(UID, ITEM_1)
+        assert FilesystemStorage(tmp_path).load_pickle(UID) == ITEM_1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    async def test_io_many(
+        self, tmp_path: Path, max_workers: Optional[int]
+    ) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        impl.configure(max_workers=max_workers)
+        items = {uid: {"uid": uid} for uid in UIDS}
+        await impl.store_many(StoreType.JSON, items)
+        assert await impl.load_many(StoreType.JSON, UIDS) == list(
+            items.values()
+        )
+        await impl.delete_many(UIDS)
+        assert await impl.is_available_many(UIDS) == [False] * len(UIDS)
+
+    @pytest.mark.asyncio
+    async def test_blocking_work_off_event_loop(self, tmp_path: Path) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        loop_thread = threading.get_ident()
+        used_threads = []
+        original = impl._storage._write_bytes
+
+        def _write_bytes(*args: object) -> None:
+            used_threads.append(threading.get_ident())
+            original(*args)  # type: ignore
+
+        impl._storage._write_bytes = _write_bytes  # type: ignore
+        await impl.store_pickle(UID, ITEM_1)
+        assert used_threads and loop_thread not in used_threads
+
+    @pytest.mark.asyncio
+    async def test_configure_codec(self, tmp_path: Path) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        impl.configure(codec="none")
+        await impl.store_pickle(UID, ITEM_1)
+        assert await impl.load_pickle(UID) == ITEM_1
+        assert impl._codec.name == "none"
+
+    @pytest.mark.asyncio
+    async def test_cache_if_missing_single_flight(
+        self, tmp_path: Path
+    ) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        other = AsyncFilesystemStorage(tmp_path)
+        calls: list[int] = []
+
+        async def callback() -> list:
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return ITEM_1
+
+        # Different instances share only file lock
+        results = await asyncio.gather(
+            *(
+                storage.cache_if_missing(UID, callback)
+                for storage in [impl, other, impl, other]
+            )
+        )
+        assert len(calls) == 1
+        assert results == [ITEM_1] * 4
+
+    @pytest.mark.asyncio
+    async def test_load_buffer(self, tmp_path: Path) -> None:
+        impl = AsyncFilesystemStorage(tmp_path)
+        await impl.store_bytes(UID, ITEM_BYTES_0)
+        view = await impl.load_buffer(UID)
+        assert bytes(view) == ITEM_BYTES_0
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from magic_storage import AsyncInMemoryStorage, StoreType
+
+from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
+
+UID = UIDS[0]
+
+
+class TestAsyncInMemoryStorage:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "store_type,item",
+        [
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+            (StoreType.JSON, ITEM_0),
+            (StoreType.PICKLE, ITEM_1),
+        ],
+    )
+    async def test_io(self, store_type: StoreType, item: object) -> None:
+        impl = AsyncInMemoryStorage()
+        await impl.store_as(store_type, UID, item)
+        assert await impl.is_available(UID) is True
+        assert await impl.load_as(store_type, UID) == item
+
+    @pytest.mark.asyncio
+    async def test_io_many(self) -> None:
+        impl = AsyncInMemoryStorage()
+        items = {uid: {"uid": uid} for uid in UIDS}
+        await impl.store_many(StoreType.JSON, items)
+        assert await impl.is_available_many(UIDS) == [True] * len(UIDS)
+        assert await impl.load_many(StoreType.JSON, UIDS) == list(
+            items.values()
+        )
+        await impl.delete_many(UIDS)
+        assert await impl.is_available_many(UIDS) == [False] * len(UIDS)
+
+    @pytest.mark.asyncio
+    async def test_load_many_return_exceptions(self) -> None:
+        impl = AsyncInMemoryStorage()
+        await impl.store_json(UIDS[0], ITEM_0)
+        results = await impl.load_many(
+            StoreType.JSON, UIDS[:2], return_exceptions=True
+        )
+        assert results[0] == ITEM_0
+        assert isinstance(results[1], KeyError)
+
+    @pytest.mark.asyncio
+    async def test_delete_non_existing(self) -> None:
+        impl = AsyncInMemoryStorage()
+        with pytest.raises(KeyError):
+            await impl.delete(UID)
+        await impl.delete(UID, missing_ok=True)
+        with pytest.raises(KeyError):
+            await impl.delete_many(UIDS)
+
+    @pytest.mark.asyncio
+    async def test_cache_if_missing_awaits_callback(self) -> None:
+        impl = AsyncInMemoryStorage()
+
+        async def callback() -> list:
+            await asyncio.sleep(0)
+            return ITEM_0
+
+        assert await impl.cache_if_missing(UID, callback) == ITEM_0
+        assert await impl.cache_if_missing(UID, list) == ITEM_0
+
+    @pytest.mark.asyncio
+    async def test_cache_if_missing_single_flight(self) -> None:
+        impl = AsyncInMemoryStorage()
+        calls: list[int] = []
+
+        async def callback() -> list:
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ITEM_0
+
+        results = await asyncio.gather(
+            *(impl.cache_if_missing(UID, callback) for _ in range(8))
+        )
+        assert len(calls) == 1
+        assert results == [ITEM_0] * 8
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from magic_storage import DbmStorage, StoreType
+
+from ..data import ITEM_0, UIDS
+
+UID = UIDS[0]
+
+
+class TestDbmStorage:
+    def test_directory_path(self, tmp_path: Path) -> None:
+        impl = DbmStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.close()
+        assert list(tmp_path.glob("storage.dbm*"))
+
+    def test_readonly(self, tmp_path: Path) -> None:
+        impl = DbmStorage(tmp_path / "fixtures")
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+        impl.close()
+
+        reader = DbmStorage(tmp_path / "fixtures", readonly=True)
+        assert reader.load_many(StoreType.JSON, UIDS) == [
+            {"uid": uid} for uid in UIDS
+        ]
+        reader.close()
+
+    def test_missing_key(self, tmp_path: Path) -> None:
+        impl = DbmStorage(tmp_path)
+        with pytest.raises(KeyError):
+            impl.load_bytes(UID)
+        with pytest.raises(KeyError):
+            impl.delete(UID)
+        impl.close()
@@ -1,17 +1,50 @@
 from __future__ import annotations
 
+import lzma
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+import tracemalloc
 from pathlib import Path
+from typing import Any, Optional
 
 import pytest
+from filelock import FileLock
+from pytest_mock import MockerFixture
 
-from magic_storage import StoreType
+from magic_storage import (
+    Durability,
+    ObjectCache,
+    ReadCache,
+    StorageKey,
+    StoreType,
+    _durability,
+    get_codec,
+)
 from magic_storage.impl import FilesystemStorage
+from magic_storage.impl._filesystem import BLOBS_DIR, LAYOUT_FILE, LOCKS_DIR
 
 from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
 
 UID = UIDS[0]
 
 
+def _slow_callback(marker_dir: Path) -> list:
+    # Leaves one marker file per call, so calls from all processes can be
+    # counted.
+    (marker_dir / f"{multiprocessing.current_process().pid}").touch()
+    time.sleep(0.2)
+    return ITEM_1
+
+
+def _cache_if_missing_in_process(root: Path, marker_dir: Path) -> None:
+    FilesystemStorage(root).cache_if_missing(
+        UID, lambda: _slow_callback(marker_dir)
+    )
+
+
 class TestFileStorage:
     def test_root_dir(self, tmp_path: Path) -> None:
         fs = FilesystemStorage(__file__)
@@ -34,6 +67,33 @@ class TestFileStorage:
         fs.configure(cache=None)
         assert fs._cache is None
 
+        fs.configure(codec="lzma:1")
+        assert fs._codec == get_codec("lzma:1")
+
+        fs.configure(max_workers=2)
+        assert fs._executor is not None
+        fs.configure(max_workers=None)
+        assert fs._executor is None
+
+    @pytest.mark.parametrize("codec", ["none", "zlib:1", "bz2", "lzma:9"])
+    def test_io_pickle_codec(self, tmp_path: Path, codec: str) -> None:
+        # Check that objects stored with any codec are readable, even after
+        # codec was changed, as codec is named in payload header.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(codec=codec, cache=None)
+        impl.store_as(StoreType.PICKLE, uid=UID, item=ITEM_1)
+
+        impl.configure(codec="zlib:9")
+        assert impl.load_as(StoreType.PICKLE, uid=UID) == ITEM_1
+
+    def test_load_legacy_lzma_pickle(self, tmp_path: Path) -> None:
+        # Check that pickles stored before codec header was introduced can
+        # still be loaded.
+        impl = FilesystemStorage(tmp_path)
+        legacy = lzma.compress(pickle.dumps(ITEM_1), format=lzma.FORMAT_XZ)
+        impl.store_as(StoreType.BINARY, uid=UID, item=legacy)
+        assert impl.load_as(StoreType.PICKLE, uid=UID) == ITEM_1
+
     def test_io_text_with_cache(self, tmp_path: Path) -> None:
         impl = FilesystemStorage(tmp_path)
         self._io_text(tmp_path, impl)
@@ -94,6 +154,35 @@ class TestFileStorage:
         # And after load should remain in same form
         assert item == ld_item
 
+    def test_cache_if_missing_and_store_as_share_file(
+        self, tmp_path: Path
+    ) -> None:
+        # Check that uid is hashed once, so cache_if_missing() finds object
+        # stored with store_as() under the same uid.
+        impl = FilesystemStorage(tmp_path)
+        key = impl.store_as(StoreType.PICKLE, uid=UID, item=ITEM_1)
+        assert key == StorageKey.from_uid(UID)
+        assert (impl._data_dir / key).is_file()
+
+        # when object is not found, callback returns empty list
+        assert impl.cache_if_missing(UID, list) == ITEM_1
+
+    @pytest.mark.parametrize("legacy_index", [0, 1])
+    def test_migrate_legacy(self, tmp_path: Path, legacy_index: int) -> None:
+        # Check that file saved under legacy (hashed multiple times) name is
+        # moved to current location when migration is enabled.
+        impl = FilesystemStorage(tmp_path)
+        key = StorageKey.from_uid(UID)
+        legacy_key = key.legacy_keys()[legacy_index]
+        impl.store_as(StoreType.TEXT, uid=legacy_key, item=ITEM_TEXT_0)
+
+        assert impl.is_available(UID) is False
+
+        impl.configure(migrate_legacy=True)
+        assert impl.is_available(UID) is True
+        assert impl.load_as(StoreType.TEXT, uid=UID) == ITEM_TEXT_0
+        assert not (impl._data_dir / legacy_key).exists()
+
     def test_delete_existing(self, tmp_path: Path) -> None:
         # Check that delete works correctly for uid which is available
         item = ITEM_1
@@ -111,3 +200,647 @@ class TestFileStorage:
         # Check that delete works correctly for uid which is not available
         impl = FilesystemStorage(tmp_path)
         impl.delete(UID, missing_ok=True)
+
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    def test_io_many(self, tmp_path: Path, max_workers: Optional[int]) -> None:
+        # Check that batch of objects can be stored, then appears available
+        # and can be re loaded, both sequentially and in thread pool.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(max_workers=max_workers)
+        items = {uid: [index, ITEM_1] for index, uid in enumerate(UIDS)}
+
+        keys = impl.store_many(StoreType.PICKLE, items)
+        assert keys == [StorageKey.from_uid(uid) for uid in UIDS]
+
+        assert impl.is_available_many(UIDS + ["missing"]) == [True] * len(
+            UIDS
+        ) + [False]
+        assert impl.load_many(StoreType.PICKLE, UIDS) == list(items.values())
+
+        impl.delete_many(UIDS)
+        assert impl.is_available_many(UIDS) == [False] * len(UIDS)
+        # no temporary files are left behind
+        assert [p.name for p in impl._data_dir.iterdir()] == [LOCKS_DIR]
+
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    def test_store_many_return_exceptions(
+        self, tmp_path: Path, max_workers: Optional[int]
+    ) -> None:
+        # Check that item which can't be serialized doesn't prevent other
+        # items from being stored.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(max_workers=max_workers)
+        results = impl.store_many(
+            StoreType.JSON,
+            [(UIDS[0], ITEM_0), (UIDS[1], object()), (UIDS[2], ITEM_1)],
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], TypeError)
+        assert impl.is_available_many(UIDS[:3]) == [True, False, True]
+
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    def test_store_many_failure_leaves_no_files(
+        self, tmp_path: Path, max_workers: Optional[int]
+    ) -> None:
+        # Check that when batch fails, temporary files are removed and
+        # nothing is stored.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(max_workers=max_workers)
+        with pytest.raises(TypeError):
+            impl.store_many(
+                StoreType.JSON, [(UIDS[0], ITEM_0), (UIDS[1], object())]
+            )
+        assert [p.name for p in impl._data_dir.iterdir()] == [LOCKS_DIR]
+
+    def test_delete_many_non_existing(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_as(StoreType.TEXT, uid=UIDS[0], item=ITEM_TEXT_0)
+        with pytest.raises(KeyError):
+            impl.delete_many(UIDS[:2])
+        # existing object was deleted anyway
+        assert impl.is_available(UIDS[0]) is False
+        impl.delete_many(UIDS[:2], missing_ok=True)
+
+    def test_load_many_in_thread_pool_reports_errors(
+        self, tmp_path: Path
+    ) -> None:
+        # Check that results of parallel loads keep order and missing
+        # objects are reported per key.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(max_workers=4, cache=None)
+        stored = UIDS[::2]
+        impl.store_many(StoreType.JSON, {uid: [uid] for uid in stored})
+
+        results = impl.load_many(StoreType.JSON, UIDS, return_exceptions=True)
+        for uid, result in zip(UIDS, results):
+            if uid in stored:
+                assert result == [uid]
+            else:
+                assert isinstance(result, Exception)
+
+    def test_cache_if_missing_single_flight_threads(
+        self, tmp_path: Path
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        calls: list[int] = []
+        results: list[object] = []
+
+        def _callback() -> list:
+            calls.append(1)
+            time.sleep(0.05)
+            return ITEM_1
+
+        def _worker() -> None:
+            results.append(impl.cache_if_missing(UID, _callback))
+
+        threads = [threading.Thread(target=_worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [ITEM_1] * 8
+
+    def test_cache_if_missing_unrelated_uids_concurrent(
+        self, tmp_path: Path
+    ) -> None:
+        # Flight locks are per object, also with single lock stripe, so
+        # callbacks for different objects, nested ones included, don't wait
+        # for each other.
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(lock_stripes=1)
+        barrier = threading.Barrier(2, timeout=5)
+        errors: list[Exception] = []
+
+        def _worker(outer: str, inner: str) -> None:
+            def _outer() -> str:
+                barrier.wait()
+                return impl.cache_if_missing(inner, lambda: inner)
+
+            try:
+                impl.cache_if_missing(outer, _outer)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=_worker, args=(UIDS[0], UIDS[1])),
+            threading.Thread(target=_worker, args=(UIDS[2], UIDS[3])),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert not any(thread.is_alive() for thread in threads)
+        assert errors == []
+        assert impl.load_pickle(UIDS[3]) == UIDS[3]
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="Requires fork start method.",
+    )
+    def test_cache_if_missing_single_flight_processes(
+        self, tmp_path: Path
+    ) -> None:
+        marker_dir = tmp_path / "markers"
+        marker_dir.mkdir()
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(
+                target=_cache_if_missing_in_process,
+                args=(tmp_path, marker_dir),
+            )
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        assert [process.exitcode for process in processes] == [0] * 4
+        assert len(list(marker_dir.iterdir())) == 1
+        assert FilesystemStorage(tmp_path).load_pickle(UID) == ITEM_1
+
+    def test_cache_invalidated_on_write(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        cache = ReadCache()
+        impl.configure(cache=cache)
+        impl.store_json(UID, ITEM_0)
+        assert impl.load_json(UID) == ITEM_0
+        assert impl.load_json(UID) == ITEM_0
+        assert cache.hits == 1
+
+        impl.store_json(UID, ITEM_1)
+        assert impl.load_json(UID) == ITEM_1
+
+        impl.store_many(StoreType.JSON, {UID: ITEM_0})
+        assert impl.load_json(UID) == ITEM_0
+
+        impl.delete(UID)
+        assert len(cache) == 0
+
+    def test_cache_separates_text_and_bytes(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_str(UID, ITEM_TEXT_0)
+        assert impl.load_text(UID) == ITEM_TEXT_0
+        assert impl.load_bytes(UID) == ITEM_TEXT_0.encode("utf-8")
+
+    def test_object_cache(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(object_cache=ObjectCache())
+        impl.store_pickle(UID, ITEM_1)
+        assert impl.load_pickle(UID) == ITEM_1
+
+        read = mocker.spy(impl, "_read_bytes")
+        loaded = impl.load_pickle(UID)
+        assert loaded == ITEM_1
+        read.assert_not_called()
+        # cached object can't be modified through loaded copy
+        loaded.clear()
+        assert impl.load_pickle(UID) == ITEM_1
+
+        impl.store_pickle(UID, ITEM_0)
+        assert impl.load_pickle(UID) == ITEM_0
+        impl.store_many(StoreType.PICKLE, {UID: ITEM_1})
+        assert impl.load_pickle(UID) == ITEM_1
+        impl.delete(UID)
+        assert impl.is_available(UID) is False
+        assert len(impl._object_cache) == 0  # type: ignore
+
+    def test_load_buffer(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_bytes(UID, ITEM_BYTES_0)
+        with impl.load_buffer(UID) as view:
+            assert view.readonly
+            assert view == ITEM_BYTES_0
+            impl.delete(UID)
+            # mapping keeps content of deleted file
+            assert bytes(view) == ITEM_BYTES_0
+
+    def test_load_buffer_missing(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with pytest.raises(FileNotFoundError):
+            impl.load_buffer(UID)
+        assert impl.is_available(UID) is False
+
+    def test_stream_pickle(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        # Small chunks force payload to be compressed in many steps.
+        mocker.patch("magic_storage._streams.CHUNK_SIZE", 64)
+        impl = FilesystemStorage(tmp_path)
+        with impl.open_writer(UID) as stream:
+            pickle.dump(ITEM_0, stream)
+        assert impl.load_pickle(UID) == ITEM_0
+
+        impl.store_pickle(UID, ITEM_1)
+        with impl.open_reader(UID) as stream:
+            assert pickle.load(stream) == ITEM_1
+
+    def test_stream_large_write_not_copied(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        mocker.patch("magic_storage._streams.CHUNK_SIZE", 64 << 10)
+        impl = FilesystemStorage(tmp_path)
+        item = os.urandom(8 << 20)
+        tracemalloc.start()
+        try:
+            # header of pickle is buffered before large write
+            with impl.open_writer(UID) as stream:
+                pickle.dump(item, stream)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert peak < len(item) // 4
+        assert impl.load_pickle(UID) == item
+
+    def test_stream_binary(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with impl.open_writer(UID, StoreType.BINARY) as stream:
+            stream.write(ITEM_BYTES_0[:10])
+            stream.write(ITEM_BYTES_0[10:])
+        assert impl.load_bytes(UID) == ITEM_BYTES_0
+        with impl.open_reader(UID, StoreType.BINARY) as stream:
+            assert stream.read() == ITEM_BYTES_0
+
+    def test_stream_legacy_lzma_pickle(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        legacy = lzma.compress(pickle.dumps(ITEM_1), format=lzma.FORMAT_XZ)
+        impl.store_bytes(UID, legacy)
+        with impl.open_reader(UID) as stream:
+            assert pickle.load(stream) == ITEM_1
+
+    def test_stream_error_leaves_object_untouched(
+        self, tmp_path: Path
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_pickle(UID, ITEM_1)
+        with pytest.raises(RuntimeError):
+            with impl.open_writer(UID) as stream:
+                pickle.dump(ITEM_0, stream)
+                raise RuntimeError()
+        assert impl.load_pickle(UID) == ITEM_1
+        assert sorted(p.name for p in impl._data_dir.iterdir()) == sorted(
+            [str(StorageKey.from_uid(UID)), LOCKS_DIR]
+        )
+
+    def test_stream_invalidates_caches(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(object_cache=ObjectCache())
+        impl.store_pickle(UID, ITEM_1)
+        assert impl.load_pickle(UID) == ITEM_1
+        with impl.open_writer(UID) as stream:
+            pickle.dump(ITEM_0, stream)
+        assert impl.load_pickle(UID) == ITEM_0
+
+    def test_stream_text_not_supported(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with pytest.raises(ValueError):
+            impl.open_writer(UID, StoreType.JSON)
+
+    def test_sharded_layout(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(shards=(2, 2))
+        key = impl.store_json(UID, ITEM_0)
+        assert (impl._data_dir / key[:2] / key[2:4] / key).is_file()
+        assert impl.load_json(UID) == ITEM_0
+        impl.delete(UID)
+        assert impl.is_available(UID) is False
+
+    @pytest.mark.parametrize("shards", [(0,), (32, 32), (-1, 2)])
+    def test_sharded_layout_invalid(
+        self, tmp_path: Path, shards: tuple[int, ...]
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with pytest.raises(ValueError):
+            impl.configure(shards=shards)
+
+    def test_is_available_single_stat(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(shards=(2,))
+        impl.store_str(UID, ITEM_TEXT_0)
+        stat = mocker.spy(Path, "stat")
+        assert impl.is_available(UID) is True
+        assert impl.is_available(UIDS[1]) is False
+        assert stat.call_count == 2
+
+    def test_flat_objects_moved_on_access(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        key = impl.store_json(UID, ITEM_0)
+        impl.store_json(UIDS[1], ITEM_1)
+
+        impl.configure(shards=(2,))
+        assert impl.is_available(UID) is True
+        assert (impl._data_dir / key[:2] / key).is_file()
+        assert not (impl._data_dir / key).exists()
+        assert impl.load_json(UIDS[1]) == ITEM_1
+
+    def test_migrate_layout(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+
+        impl.configure(shards=(1, 2))
+        assert impl.migrate_layout() == len(UIDS)
+        assert impl._fallback_layouts == ()
+        assert not [
+            path
+            for path in impl._data_dir.iterdir()
+            if path.is_file()
+            and not path.name.endswith(".lock")
+            and path.name != LAYOUT_FILE
+        ]
+        assert impl.load_many(StoreType.JSON, UIDS) == [
+            {"uid": uid} for uid in UIDS
+        ]
+
+        # back to flat layout
+        impl.configure(shards=())
+        assert impl.migrate_layout() == len(UIDS)
+        assert impl.load_many(StoreType.JSON, UIDS) == [
+            {"uid": uid} for uid in UIDS
+        ]
+
+    @pytest.mark.parametrize("shards", [(4,), (), (1, 3)])
+    def test_objects_available_after_layout_switch(
+        self, tmp_path: Path, shards: tuple[int, ...]
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(shards=(2, 2))
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+        impl.configure(shards=shards)
+        assert impl.load_json(UIDS[0]) == {"uid": UIDS[0]}
+        assert impl.migrate_layout() == len(UIDS) - 1
+        assert impl.load_many(StoreType.JSON, UIDS) == [
+            {"uid": uid} for uid in UIDS
+        ]
+
+    def test_layout_is_recorded(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_json(UIDS[0], ITEM_0)
+        impl.configure(shards=(2, 2))
+        impl.store_json(UIDS[1], ITEM_1)
+        impl.configure(shards=(4,))
+
+        fresh = FilesystemStorage(tmp_path)
+        assert fresh._shards == (4,)
+        assert fresh.load_json(UIDS[0]) == ITEM_0
+        assert fresh.load_json(UIDS[1]) == ITEM_1
+        fresh.migrate_layout()
+        assert FilesystemStorage(tmp_path)._fallback_layouts == ()
+
+    def test_migrate_layout_keeps_newer(self, tmp_path: Path) -> None:
+        # Object written with new layout before migration reached it wins
+        # over its flat copy.
+        impl = FilesystemStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.configure(shards=(2,))
+        impl.store_json(UID, ITEM_1)
+        assert impl.migrate_layout() == 1
+        assert impl.load_json(UID) == ITEM_1
+
+    def test_load_missing_creates_nothing(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with pytest.raises(FileNotFoundError):
+            impl.load_pickle(UID)
+        with pytest.raises(FileNotFoundError):
+            impl.open_reader(UID)
+        assert [p.name for p in impl._data_dir.iterdir()] == [LOCKS_DIR]
+
+    @pytest.mark.parametrize("lock_reads", [False, True])
+    def test_lock_reads(
+        self, tmp_path: Path, mocker: MockerFixture, lock_reads: bool
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(cache=None, lock_reads=lock_reads)
+        impl.store_pickle(UID, ITEM_1)
+
+        acquire = mocker.spy(FileLock, "acquire")
+        assert impl.load_pickle(UID) == ITEM_1
+        with impl.load_buffer(impl.store_bytes(UIDS[1], ITEM_BYTES_0)):
+            pass
+        # store_bytes() always takes lock
+        assert acquire.call_count == (3 if lock_reads else 1)
+
+    def test_lock_files_striped(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(shards=(2,), lock_stripes=4)
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+        impl.cache_if_missing(UIDS[0], dict)
+        assert list(impl._data_dir.rglob("*.lock"))
+        assert {p.parent.name for p in impl._data_dir.rglob("*.lock")} == {
+            LOCKS_DIR
+        }
+        assert len(list((impl._data_dir / LOCKS_DIR).iterdir())) <= 8
+
+    def test_remove_stale_locks(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        key = impl.store_json(UID, ITEM_0)
+        (impl._data_dir / f"{key}.lock").touch()
+        (impl._data_dir / f"{key}.flight.lock").touch()
+        assert impl.remove_stale_locks() == 2
+        assert sorted(p.name for p in impl._data_dir.iterdir()) == sorted(
+            [key, LOCKS_DIR]
+        )
+        assert impl.load_json(UID) == ITEM_0
+
+    def test_remove_unheld_flight_locks(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        key = impl.store_json(UID, ITEM_0)
+        impl._flight_lock_path(key).touch()
+        with impl._flight_lock(StorageKey.from_uid(UIDS[1])):
+            assert impl.remove_stale_locks() == 1
+        assert not list((impl._data_dir / LOCKS_DIR).glob("*.flight.lock"))
+
+    def test_flight_lock_files_bounded(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(lock_stripes=4)
+        for index in range(50):
+            impl.cache_if_missing(f"uid-{index}", lambda: index)
+        assert len(list((impl._data_dir / LOCKS_DIR).iterdir())) <= 4
+
+    def test_durability_fsync(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(durability="fsync")
+        fsync = mocker.spy(os, "fsync")
+        impl.store_json(UID, ITEM_0)
+        # file and directory
+        assert fsync.call_count == 2
+        assert impl.load_json(UID) == ITEM_0
+
+    def test_durability_group_batch(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(durability=Durability.GROUP)
+        fsync = mocker.spy(os, "fsync")
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+        # every file and single directory sync for whole batch
+        assert fsync.call_count == len(UIDS) + 1
+
+    def test_durability_group_single_writes(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(durability="group", group_interval=60)
+        fsync_directory = mocker.spy(_durability, "fsync_directory")
+        for uid in UIDS:
+            impl.store_str(uid, ITEM_TEXT_0)
+        assert fsync_directory.call_count == 0
+        impl.sync()
+        assert fsync_directory.call_count == 1
+
+    def test_durability_invalid(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        with pytest.raises(ValueError):
+            impl.configure(durability="sometimes")
+
+    def test_write_behind(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        release = threading.Event()
+        write_bytes = impl._write_bytes
+
+        def _slow_write(key: StorageKey, item: bytes) -> None:
+            release.wait()
+            write_bytes(key, item)
+
+        mocker.patch.object(impl, "_write_bytes", _slow_write)
+
+        # returns before object is written
+        assert impl.cache_if_missing(UID, lambda: ITEM_1) == ITEM_1
+        assert impl.is_available(UID) is True
+        assert impl.load_pickle(UID) == ITEM_1
+        assert not FilesystemStorage(tmp_path).is_available(UID)
+
+        release.set()
+        impl.flush()
+        assert FilesystemStorage(tmp_path).load_pickle(UID) == ITEM_1
+        impl.close()
+
+    def test_write_behind_other_store_type(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        impl.store_str(UID, ITEM_TEXT_0)
+        assert impl.load_bytes(UID) == ITEM_TEXT_0.encode("utf-8")
+        impl.close()
+
+    def test_write_behind_delete_and_store_many(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        impl.store_json(UIDS[0], ITEM_0)
+        impl.delete(UIDS[0])
+        impl.store_json(UIDS[1], ITEM_0)
+        impl.store_many(StoreType.JSON, {UIDS[1]: ITEM_1})
+        impl.flush()
+        assert impl.is_available(UIDS[0]) is False
+        assert impl.load_json(UIDS[1]) == ITEM_1
+
+        impl.configure(write_behind=None)
+        assert impl._behind is None
+        impl.close()
+
+    def test_write_behind_errors_reported(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        # serialization errors are raised by store itself
+        with pytest.raises(TypeError):
+            impl.store_json(UID, object())
+        mocker.patch.object(impl, "_write_text", side_effect=OSError)
+        impl.store_json(UID, ITEM_0)
+        with pytest.raises(OSError):
+            impl.flush()
+        assert impl.is_available(UID) is False
+        impl.close()
+
+    @pytest.mark.parametrize(
+        ("store_type", "item"),
+        [(StoreType.TEXT, 123), (StoreType.JSON, {1: (1, 2)})],
+    )
+    def test_write_behind_loads_as_written(
+        self, tmp_path: Path, store_type: StoreType, item: Any
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(write_behind=16)
+        impl.store_as(store_type, uid=UID, item=item)
+        pending = impl.load_as(store_type, uid=UID)
+        impl.flush()
+        assert pending == impl.load_as(store_type, uid=UID)
+        impl.close()
+
+    def _blobs(self, impl: FilesystemStorage) -> list[Path]:
+        return [
+            path
+            for path in (impl._data_dir / BLOBS_DIR).rglob("*")
+            if path.is_file()
+        ]
+
+    def test_dedupe(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(dedupe=True)
+        impl.store_many(StoreType.PICKLE, {uid: ITEM_1 for uid in UIDS})
+        impl.store_json(UIDS[0], ITEM_0)
+        impl.store_json(UIDS[1], ITEM_0)
+        assert len(self._blobs(impl)) == 2
+        assert impl.load_json(UIDS[0]) == ITEM_0
+        assert impl.load_many(StoreType.PICKLE, UIDS[2:]) == [ITEM_1] * (
+            len(UIDS) - 2
+        )
+        # stored once, shared by all objects
+        (blob,) = [b for b in self._blobs(impl) if b.stat().st_nlink > 3]
+        assert blob.stat().st_nlink == len(UIDS) - 2 + 1
+
+    def test_dedupe_skips_compression(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(dedupe=True)
+        impl.store_pickle(UIDS[0], ITEM_1)
+        spy = mocker.spy(impl._codec, "compress")
+        impl.store_pickle(UIDS[1], ITEM_1)
+        spy.assert_not_called()
+        assert impl.load_pickle(UIDS[1]) == ITEM_1
+
+    def test_dedupe_delete_reclaims_blob(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(dedupe=True)
+        for store_type, item in [
+            (StoreType.PICKLE, ITEM_1),
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+        ]:
+            impl.store_as(store_type, uid=UIDS[0], item=item)
+            impl.store_as(store_type, uid=UIDS[1], item=item)
+            impl.delete(UIDS[0])
+            assert len(self._blobs(impl)) == 1
+            impl.delete(UIDS[1])
+            assert self._blobs(impl) == []
+        with pytest.raises(KeyError):
+            impl.delete(UIDS[0])
+
+    def test_dedupe_pickle_and_binary_not_shared(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(dedupe=True)
+        impl.store_pickle(UIDS[0], ITEM_BYTES_0)
+        impl.store_bytes(UIDS[1], pickle.dumps(ITEM_BYTES_0))
+        assert len(self._blobs(impl)) == 2
+        assert impl.load_pickle(UIDS[0]) == ITEM_BYTES_0
+
+    def test_reclaim_blobs_after_overwrite(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(dedupe=True)
+        impl.store_json(UID, ITEM_0)
+        impl.store_json(UID, ITEM_1)
+        assert len(self._blobs(impl)) == 2
+        assert impl.reclaim_blobs() == 1
+        assert impl.load_json(UID) == ITEM_1
+        # blobs are not mistaken for objects stored flat
+        impl.configure(shards=(2,))
+        assert impl.migrate_layout() == 1
+        assert len(self._blobs(impl)) == 1
@@ -4,7 +4,7 @@ import json
 
 import pytest
 
-from magic_storage import InMemoryStorage, StoreType
+from magic_storage import InMemoryStorage, ObjectCache, StoreType
 
 from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
 
@@ -98,3 +98,49 @@ class TestInMemoryStorage:
     def test_delete_not_existing_missing_ok(self) -> None:
         impl = InMemoryStorage()
         impl.delete(UID, missing_ok=True)
+
+    def test_io_many(self) -> None:
+        impl = InMemoryStorage()
+        items = {uid: ITEM_TEXT_0 + uid for uid in UIDS}
+        impl.store_many(StoreType.TEXT, items)
+        assert impl.is_available_many(UIDS) == [True] * len(UIDS)
+        assert impl.load_many(StoreType.TEXT, UIDS) == list(items.values())
+        impl.delete_many(UIDS)
+        assert impl.is_available_many(UIDS) == [False] * len(UIDS)
+
+    def test_object_cache_invalidated_on_write(self) -> None:
+        impl = InMemoryStorage()
+        impl.configure(object_cache=ObjectCache(copy=False))
+        impl.store_json(UID, ITEM_0)
+        assert impl.load_json(UID) is impl.load_json(UID)
+        impl.store_json(UID, ITEM_1)
+        assert impl.load_json(UID) == ITEM_1
+        # custom decoding arguments bypass cache
+        assert impl.load_json(UID, parse_int=str) is not impl.load_json(UID)
+
+    def test_bounded_maxsize(self) -> None:
+        evicted: list[str] = []
+        impl = InMemoryStorage(
+            maxsize=2, on_evict=lambda k, v: evicted.append(str(k))
+        )
+        keys = [impl.store_json(uid, {"uid": uid}) for uid in UIDS[:3]]
+        assert len(impl) == 2
+        assert evicted == [keys[0]]
+        assert impl.is_available(UIDS[0]) is False
+        assert impl.evictions == 1
+
+    def test_bounded_max_bytes(self) -> None:
+        impl = InMemoryStorage(max_bytes=10, policy="fifo")
+        impl.store_bytes(UIDS[0], b"a" * 6)
+        impl.store_bytes(UIDS[1], b"b" * 6)
+        assert impl.is_available(UIDS[0]) is False
+        assert impl.nbytes == 6
+
+    def test_eviction_invalidates_object_cache(self) -> None:
+        impl = InMemoryStorage(maxsize=1)
+        impl.configure(object_cache=ObjectCache())
+        impl.store_json(UIDS[0], ITEM_0)
+        assert impl.load_json(UIDS[0]) == ITEM_0
+        impl.store_json(UIDS[1], ITEM_1)
+        with pytest.raises(KeyError):
+            impl.load_json(UIDS[0])
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from magic_storage import PackedStorage, StoreType
+
+from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
+
+UID = UIDS[0]
+
+
+class TestPackedStorage:
+    @pytest.mark.parametrize(
+        "store_type,item",
+        [
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+            (StoreType.JSON, ITEM_0),
+            (StoreType.PICKLE, ITEM_1),
+        ],
+    )
+    def test_io(
+        self, tmp_path: Path, store_type: StoreType, item: object
+    ) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_as(store_type, uid=UID, item=item)
+        assert impl.is_available(UID) is True
+        assert impl.load_as(store_type, uid=UID) == item
+        # and from fresh instance, which has to recover index
+        assert PackedStorage(tmp_path).load_as(store_type, uid=UID) == item
+
+    def test_no_file_per_object(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_many(StoreType.JSON, {uid: [uid] for uid in UIDS})
+        impl.close()
+        assert sorted(p.name for p in impl._data_dir.iterdir()) == [
+            "index.json",
+            "index.json.lock",
+            "packed.lock",
+            "segment-000001.log",
+        ]
+
+    def test_overwrite_and_delete(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.store_json(UID, ITEM_1)
+        assert impl.load_json(UID) == ITEM_1
+        impl.delete(UID)
+        assert impl.is_available(UID) is False
+        with pytest.raises(KeyError):
+            impl.delete(UID)
+        impl.delete(UID, missing_ok=True)
+        assert PackedStorage(tmp_path).is_available(UID) is False
+
+    def test_sees_writes_of_other_instance(self, tmp_path: Path) -> None:
+        first = PackedStorage(tmp_path)
+        second = PackedStorage(tmp_path)
+        first.store_json(UID, ITEM_0)
+        assert second.load_json(UID) == ITEM_0
+        second.store_json(UID, ITEM_1)
+        first.store_json(UIDS[1], ITEM_0)
+        # write by first instance brought its index up to date
+        assert first.load_json(UID) == ITEM_1
+
+    def test_sees_overwrite_and_delete_of_other_instance(
+        self, tmp_path: Path
+    ) -> None:
+        first = PackedStorage(tmp_path)
+        second = PackedStorage(tmp_path)
+        first.store_json(UID, ITEM_0)
+        assert second.load_json(UID) == ITEM_0
+        first.store_json(UID, ITEM_1)
+        assert second.load_json(UID) == ITEM_1
+        first.delete(UID)
+        first.compact()
+        assert second.is_available(UID) is False
+
+    def test_sees_rolled_segment_of_other_instance(
+        self, tmp_path: Path
+    ) -> None:
+        first = PackedStorage(tmp_path)
+        second = PackedStorage(tmp_path)
+        for impl in (first, second):
+            impl.configure(segment_size=100)
+        first.store_bytes(UID, ITEM_BYTES_0)
+        assert second.load_bytes(UID) == ITEM_BYTES_0
+        first.store_bytes(UIDS[1], ITEM_BYTES_0)
+        first.store_bytes(UID, ITEM_BYTES_0[::-1])
+        assert second.load_bytes(UID) == ITEM_BYTES_0[::-1]
+
+    def test_opening_does_not_write_snapshot(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.close()
+        index = impl._data_dir / "index.json"
+        mtime = index.stat().st_mtime_ns
+        time.sleep(0.01)
+        assert PackedStorage(tmp_path).load_json(UID) == ITEM_0
+        assert index.stat().st_mtime_ns == mtime
+
+    def test_recovery_without_snapshot(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_many(StoreType.JSON, {uid: [uid] for uid in UIDS})
+        impl.checkpoint()
+        impl.delete(UIDS[0])
+        impl.store_json(UIDS[1], ITEM_0)
+
+        # records appended after snapshot are replayed
+        recovered = PackedStorage(tmp_path)
+        assert recovered.is_available(UIDS[0]) is False
+        assert recovered.load_json(UIDS[1]) == ITEM_0
+
+        # and everything can be recovered from segments alone
+        (impl._data_dir / "index.json").unlink()
+        recovered = PackedStorage(tmp_path)
+        assert recovered.is_available(UIDS[0]) is False
+        assert recovered.load_json(UIDS[1]) == ITEM_0
+        assert recovered.load_json(UIDS[2]) == [UIDS[2]]
+
+    def test_torn_record_is_truncated(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        segment = impl._data_dir / "segment-000001.log"
+        valid_size = segment.stat().st_size
+        impl.store_json(UIDS[1], ITEM_1)
+        # simulate crash in the middle of write
+        with segment.open("r+b") as file:
+            file.truncate(segment.stat().st_size - 10)
+
+        recovered = PackedStorage(tmp_path)
+        assert recovered.load_json(UID) == ITEM_0
+        assert recovered.is_available(UIDS[1]) is False
+        recovered.store_json(UIDS[2], ITEM_1)
+        assert segment.stat().st_size > valid_size
+        assert PackedStorage(tmp_path).load_json(UIDS[2]) == ITEM_1
+
+    def test_compact(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        for item in range(10):
+            impl.store_many(StoreType.JSON, {uid: item for uid in UIDS})
+        impl.delete(UIDS[0])
+        stats = impl.stats()
+        assert stats["backend"] == "PackedStorage"
+        assert stats["garbage_bytes"] > 0
+        size = sum(p.stat().st_size for p in impl._data_dir.glob("*.log"))
+
+        other = PackedStorage(tmp_path)
+        impl.compact()
+        assert impl.stats()["garbage_bytes"] == 0
+        assert sum(p.stat().st_size for p in impl._data_dir.glob("*.log")) < (
+            size / 5
+        )
+        for storage in (impl, other, PackedStorage(tmp_path)):
+            assert storage.is_available(UIDS[0]) is False
+            assert storage.load_many(StoreType.JSON, UIDS[1:]) == [9] * (
+                len(UIDS) - 1
+            )
+
+    def test_compact_interrupted(self, tmp_path: Path) -> None:
+        # When old segments weren't removed, scanning all segments gives the
+        # same index.
+        impl = PackedStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.store_json(UID, ITEM_1)
+        impl.store_json(UIDS[1], ITEM_0)
+        impl.delete(UIDS[1])
+        old_segment = (impl._data_dir / "segment-000001.log").read_bytes()
+        impl.compact()
+        (impl._data_dir / "segment-000001.log").write_bytes(old_segment)
+        (impl._data_dir / "index.json").unlink()
+
+        recovered = PackedStorage(tmp_path)
+        assert recovered.load_json(UID) == ITEM_1
+        assert recovered.is_available(UIDS[1]) is False
+
+    def test_segment_rolling(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        impl.configure(segment_size=100)
+        for uid in UIDS:
+            impl.store_bytes(uid, ITEM_BYTES_0)
+        assert impl.stats()["segments"] == len(UIDS)
+        assert PackedStorage(tmp_path).load_many(StoreType.BINARY, UIDS) == [
+            ITEM_BYTES_0
+        ] * len(UIDS)
+
+    def test_cache_if_missing(self, tmp_path: Path) -> None:
+        impl = PackedStorage(tmp_path)
+        assert impl.cache_if_missing(UID, lambda: ITEM_1) == ITEM_1
+        assert impl.cache_if_missing(UID, list) == ITEM_1
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from magic_storage import ObjectCache, SQLiteStorage, StoreType
+
+from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
+
+UID = UIDS[0]
+
+
+class TestSQLiteStorage:
+    @pytest.mark.parametrize(
+        "store_type,item",
+        [
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+            (StoreType.JSON, ITEM_0),
+            (StoreType.PICKLE, ITEM_1),
+        ],
+    )
+    def test_io(
+        self, tmp_path: Path, store_type: StoreType, item: object
+    ) -> None:
+        impl = SQLiteStorage(tmp_path)
+        impl.store_as(store_type, uid=UID, item=item)
+        assert impl.is_available(UID) is True
+        assert impl.load_as(store_type, uid=UID) == item
+        assert SQLiteStorage(tmp_path).load_as(store_type, uid=UID) == item
+
+    def test_wal_mode(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        mode = impl._connection().execute("PRAGMA journal_mode").fetchone()
+        assert mode == ("wal",)
+
+    def test_text_loaded_as_bytes(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        impl.store_str(UID, ITEM_TEXT_0)
+        assert impl.load_bytes(UID) == ITEM_TEXT_0.encode("utf-8")
+
+    def test_io_many(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        items = {uid: {"uid": uid} for uid in UIDS}
+        assert impl.store_many(StoreType.JSON, items) == [
+            impl.store_json(uid, item) for uid, item in items.items()
+        ]
+        assert impl.is_available_many(UIDS + ["missing"]) == [True] * len(
+            UIDS
+        ) + [False]
+        assert impl.load_many(StoreType.JSON, UIDS) == list(items.values())
+
+        results = impl.load_many(
+            StoreType.JSON, ["missing", UID], return_exceptions=True
+        )
+        assert isinstance(results[0], KeyError)
+        assert results[1] == items[UID]
+
+        impl.delete_many(UIDS)
+        assert impl.is_available_many(UIDS) == [False] * len(UIDS)
+        with pytest.raises(KeyError):
+            impl.delete_many(UIDS)
+        impl.delete_many(UIDS, missing_ok=True)
+
+    def test_store_many_is_atomic(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        with pytest.raises(TypeError):
+            impl.store_many(StoreType.JSON, {UID: ITEM_0, UIDS[1]: object()})
+        assert impl.is_available(UID) is False
+
+    def test_delete(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.delete(UID)
+        assert impl.is_available(UID) is False
+        with pytest.raises(KeyError):
+            impl.delete(UID)
+        impl.delete(UID, missing_ok=True)
+
+    def test_connection_per_thread(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        connections = set()
+        # threads are alive together, connections of exited ones are closed
+        alive = threading.Barrier(len(UIDS))
+
+        def _worker(uid: str) -> None:
+            impl.store_json(uid, [uid])
+            connections.add(id(impl._connection()))
+            alive.wait()
+
+        threads = [
+            threading.Thread(target=_worker, args=(uid,)) for uid in UIDS
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(connections) == len(UIDS)
+        assert impl.load_many(StoreType.JSON, UIDS) == [[uid] for uid in UIDS]
+        impl.close()
+        assert impl._connections == []
+
+    def test_connection_closed_on_thread_exit(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        for uid in UIDS:
+            thread = threading.Thread(
+                target=impl.store_json, args=(uid, [uid])
+            )
+            thread.start()
+            thread.join()
+        # only connection of main thread is left
+        assert len(impl._connections) == 1
+        assert impl.load_many(StoreType.JSON, UIDS) == [[uid] for uid in UIDS]
+        impl.close()
+
+    def test_object_cache(self, tmp_path: Path) -> None:
+        impl = SQLiteStorage(tmp_path)
+        impl.configure(object_cache=ObjectCache())
+        impl.store_json(UID, ITEM_0)
+        assert impl.load_many(StoreType.JSON, [UID]) == [ITEM_0]
+        impl.store_json(UID, ITEM_1)
+        assert impl.load_json(UID) == ITEM_1
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from magic_storage import (
+    DbmStorage,
+    FilesystemStorage,
+    InMemoryStorage,
+    ObjectCache,
+    PackedStorage,
+    SQLiteStorage,
+    StoreType,
+    Tier,
+    TieredStorage,
+)
+from magic_storage.base import StorageIOBase
+from magic_storage.mixins import CacheIfMissingMixin
+
+from ..data import ITEM_0, ITEM_1, ITEM_BYTES_0, ITEM_TEXT_0, UIDS
+
+UID = UIDS[0]
+
+HAS_LMDB = importlib.util.find_spec("lmdb") is not None
+
+
+def _lmdb(path: Path) -> StorageIOBase:  # pragma: no cover
+    from magic_storage.impl._lmdb import LmdbStorage
+
+    return LmdbStorage(path)
+
+
+def _sharded(path: Path) -> StorageIOBase:
+    impl = FilesystemStorage(path)
+    impl.configure(shards=(2, 2))
+    return impl
+
+
+def _deduplicated(path: Path) -> StorageIOBase:
+    impl = FilesystemStorage(path)
+    impl.configure(dedupe=True)
+    return impl
+
+
+def _tiered(path: Path) -> StorageIOBase:
+    return TieredStorage(
+        Tier(InMemoryStorage(), capacity=2),
+        FilesystemStorage(path),
+        SQLiteStorage(path / "tier.db"),
+    )
+
+
+FACTORIES: dict[str, Callable[[Path], StorageIOBase]] = {
+    "memory": lambda _: InMemoryStorage(),
+    "filesystem": FilesystemStorage,
+    "sharded": _sharded,
+    "deduplicated": _deduplicated,
+    "packed": PackedStorage,
+    "sqlite": SQLiteStorage,
+    "dbm": DbmStorage,
+    "tiered": _tiered,
+}
+PERSISTENT = [
+    "filesystem",
+    "sharded",
+    "deduplicated",
+    "packed",
+    "sqlite",
+    "dbm",
+    "tiered",
+    "lmdb",
+]
+
+
+@pytest.fixture(
+    params=[
+        *FACTORIES,
+        pytest.param(
+            "lmdb",
+            marks=pytest.mark.skipif(not HAS_LMDB, reason="lmdb missing"),
+        ),
+    ]
+)
+def backend(request: pytest.FixtureRequest) -> str:
+    return str(request.param)
+
+
+@pytest.fixture()
+def open_storage(
+    backend: str, tmp_path: Path
+) -> Iterator[Callable[[], StorageIOBase]]:
+    factory = FACTORIES.get(backend, _lmdb)
+    opened: list[StorageIOBase] = []
+
+    def _open() -> StorageIOBase:
+        # persistent storages are reopened from the same path, memory
+        # storage is shared
+        if opened and backend not in PERSISTENT:
+            return opened[0]
+        opened.append(factory(tmp_path))
+        return opened[-1]
+
+    yield _open
+
+    for impl in opened:
+        close = getattr(impl, "close", None)
+        if close is not None:
+            close()
+
+
+@pytest.fixture()
+def storage(open_storage: Callable[[], StorageIOBase]) -> StorageIOBase:
+    return open_storage()
+
+
+class TestStorageMatrix:
+    @pytest.mark.parametrize(
+        "store_type,item",
+        [
+            (StoreType.TEXT, ITEM_TEXT_0),
+            (StoreType.BINARY, ITEM_BYTES_0),
+            (StoreType.JSON, ITEM_0),
+            (StoreType.PICKLE, ITEM_1),
+        ],
+    )
+    def test_io(
+        self, storage: StorageIOBase, store_type: StoreType, item: Any
+    ) -> None:
+        assert storage.is_available(UID) is False
+        storage.store_as(store_type, uid=UID, item=item)
+        assert storage.is_available(UID) is True
+        assert storage.load_as(store_type, uid=UID) == item
+
+    def test_overwrite(self, storage: StorageIOBase) -> None:
+        storage.store_json(UID, ITEM_0)
+        storage.store_json(UID, {"other": 1})
+        assert storage.load_json(UID) == {"other": 1}
+
+    def test_missing_load_raises(self, storage: StorageIOBase) -> None:
+        with pytest.raises(Exception):
+            storage.load_pickle(UID)
+
+    def test_delete(self, storage: StorageIOBase) -> None:
+        storage.store_str(UID, ITEM_TEXT_0)
+        storage.delete(UID)
+        assert storage.is_available(UID) is False
+        storage.delete(UID, missing_ok=True)
+
+    def test_io_many(self, storage: StorageIOBase) -> None:
+        items = {uid: {"uid": uid} for uid in UIDS}
+        storage.store_many(StoreType.JSON, items)
+        assert storage.is_available_many(UIDS) == [True] * len(UIDS)
+        assert storage.load_many(StoreType.JSON, UIDS) == list(items.values())
+
+        storage.delete_many(UIDS[1:])
+        assert storage.is_available_many(UIDS) == [True] + [False] * (
+            len(UIDS) - 1
+        )
+
+    def test_persistence(
+        self, backend: str, open_storage: Callable[[], StorageIOBase]
+    ) -> None:
+        first = open_storage()
+        first.store_pickle(UID, ITEM_1)
+        first.store_bytes(UIDS[1], ITEM_BYTES_0)
+        close = getattr(first, "close", None)
+        if close is not None and backend == "dbm":
+            # dbm engines keep single writer open
+            close()
+        second = open_storage()
+        assert second.load_pickle(UID) == ITEM_1
+        assert second.load_bytes(UIDS[1]) == ITEM_BYTES_0
+
+    def test_cache_if_missing(self, storage: StorageIOBase) -> None:
+        assert isinstance(storage, CacheIfMissingMixin)
+        calls: list[None] = []
+
+        def _callback() -> dict[str, int]:
+            calls.append(None)
+            return {"value": len(calls)}
+
+        assert storage.cache_if_missing(UID, _callback) == {"value": 1}
+        assert storage.cache_if_missing(UID, _callback) == {"value": 1}
+        assert len(calls) == 1
+
+    def test_object_cache(self, storage: StorageIOBase) -> None:
+        storage.configure(object_cache=ObjectCache())  # type: ignore
+        storage.store_pickle(UID, ITEM_1)
+        assert storage.load_pickle(UID) == ITEM_1
+        storage.store_pickle(UID, ITEM_0)
+        assert storage.load_pickle(UID) == ITEM_0
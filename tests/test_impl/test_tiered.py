@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from magic_storage import (
+    FilesystemStorage,
+    InMemoryStorage,
+    ObjectCache,
+    StoreType,
+    Tier,
+    TieredStorage,
+)
+
+from ..data import ITEM_0, UIDS
+
+UID = UIDS[0]
+
+
+@pytest.fixture()
+def memory() -> InMemoryStorage:
+    return InMemoryStorage()
+
+
+@pytest.fixture()
+def filesystem(tmp_path: Path) -> FilesystemStorage:
+    return FilesystemStorage(tmp_path)
+
+
+class TestTieredStorage:
+    def test_requires_tiers(self) -> None:
+        with pytest.raises(ValueError):
+            TieredStorage()
+        with pytest.raises(ValueError):
+            TieredStorage(Tier(InMemoryStorage(), capacity=0))
+
+    def test_write_through(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(memory, filesystem)
+        impl.store_json(UID, ITEM_0)
+        assert memory.load_json(UID) == ITEM_0
+        assert filesystem.load_json(UID) == ITEM_0
+
+    def test_promotion(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        filesystem.store_json(UID, ITEM_0)
+        impl = TieredStorage(memory, filesystem)
+        assert memory.is_available(UID) is False
+        assert impl.load_json(UID) == ITEM_0
+        assert memory.load_json(UID) == ITEM_0
+
+    def test_serialized_once(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(memory, filesystem)
+        impl.configure(codec="none")
+        key = impl.store_pickle(UID, ITEM_0)
+        assert memory._read_bytes(key) == filesystem._read_bytes(key)
+
+    def test_capacity(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(Tier(memory, capacity=2), filesystem)
+        for uid in UIDS[:3]:
+            impl.store_json(uid, {"uid": uid})
+        assert memory.is_available(UIDS[0]) is False
+        assert memory.is_available(UIDS[2]) is True
+        # evicted object is promoted back, evicting least recently used one
+        assert impl.load_json(UIDS[0]) == {"uid": UIDS[0]}
+        assert memory.is_available(UIDS[0]) is True
+        assert memory.is_available(UIDS[1]) is False
+
+    def test_capacity_on_read(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        for uid in UIDS[:3]:
+            memory.store_json(uid, {"uid": uid})
+        impl = TieredStorage(Tier(memory, capacity=2), filesystem)
+        for uid in UIDS[:3]:
+            assert impl.load_json(uid) == {"uid": uid}
+        assert sum(memory.is_available(uid) for uid in UIDS[:3]) <= 2
+
+    def test_missing(self, memory: InMemoryStorage) -> None:
+        impl = TieredStorage(memory)
+        with pytest.raises(KeyError):
+            impl.load_json(UID)
+        with pytest.raises(KeyError):
+            impl.delete(UID)
+        impl.delete(UID, missing_ok=True)
+
+    def test_delete(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(memory, filesystem)
+        impl.store_json(UID, ITEM_0)
+        impl.delete(UID)
+        assert impl.is_available(UID) is False
+        assert memory.is_available(UID) is False
+        assert filesystem.is_available(UID) is False
+
+    def test_write_behind(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(Tier(memory, capacity=1), filesystem)
+        impl.configure(write_behind=16)
+        impl.store_many(StoreType.JSON, {uid: {"uid": uid} for uid in UIDS})
+        assert impl.load_many(StoreType.JSON, UIDS) == [
+            {"uid": uid} for uid in UIDS
+        ]
+        impl.flush()
+        assert filesystem.load_json(UIDS[0]) == {"uid": UIDS[0]}
+        impl.close()
+
+    def test_write_behind_delete(
+        self, memory: InMemoryStorage, filesystem: FilesystemStorage
+    ) -> None:
+        impl = TieredStorage(memory, filesystem)
+        impl.configure(write_behind=16)
+        impl.store_json(UID, ITEM_0)
+        impl.delete(UID)
+        impl.flush()
+        assert filesystem.is_available(UID) is False
+        impl.close()
+
+    def test_shared_decoded_objects(self, memory: InMemoryStorage) -> None:
+        impl = TieredStorage(memory)
+        impl.configure(object_cache=ObjectCache(copy=False))
+        impl.store_pickle(UID, ITEM_0)
+        assert impl.load_pickle(UID) is impl.load_pickle(UID)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from hashlib import sha256
+
+from magic_storage import StorageKey
+
+from .data import UIDS
+
+
+class TestStorageKey:
+    def test_from_uid(self) -> None:
+        for uid in UIDS:
+            key = StorageKey.from_uid(uid)
+            assert key == sha256(uid.encode("utf-8")).hexdigest()
+
+    def test_from_key_is_not_hashed_again(self) -> None:
+        key = StorageKey.from_uid(UIDS[0])
+        assert StorageKey.from_uid(key) is key
+
+    def test_non_str_uid(self) -> None:
+        assert StorageKey.from_uid(32) == StorageKey.from_uid("32")
+
+    def test_key_is_str(self) -> None:
+        key = StorageKey.from_uid(UIDS[0])
+        assert isinstance(key, str)
+        assert {str(key): None}.keys() == {key: None}.keys()
+
+    def test_legacy_keys(self) -> None:
+        key = StorageKey.from_uid(UIDS[0])
+        twice, thrice = key.legacy_keys()
+        assert twice == sha256(key.encode("utf-8")).hexdigest()
+        assert thrice == sha256(twice.encode("utf-8")).hexdigest()
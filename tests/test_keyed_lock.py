@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from magic_storage._keyed_lock import AsyncKeyedLock, KeyedLock
+
+
+class TestKeyedLock:
+    def test_same_key_is_exclusive(self) -> None:
+        locks = KeyedLock()
+        active: list[int] = []
+        overlaps: list[int] = []
+
+        def _work() -> None:
+            with locks.hold("key"):
+                active.append(1)
+                if len(active) > 1:
+                    overlaps.append(1)
+                time.sleep(0.01)
+                active.pop()
+
+        threads = [threading.Thread(target=_work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert overlaps == []
+        assert len(locks) == 0
+
+    def test_other_key_is_not_blocked(self) -> None:
+        locks = KeyedLock()
+        with locks.hold("first"):
+            thread = threading.Thread(target=lambda: locks.hold("second"))
+            thread.start()
+            thread.join(timeout=1)
+            assert not thread.is_alive()
+            assert len(locks) == 1
+
+    def test_reentrant(self) -> None:
+        locks = KeyedLock()
+        with locks.hold("key"):
+            with locks.hold("key"):
+                assert len(locks) == 1
+        assert len(locks) == 0
+
+
+class TestAsyncKeyedLock:
+    @pytest.mark.asyncio
+    async def test_same_key_is_exclusive(self) -> None:
+        locks = AsyncKeyedLock()
+        order: list[str] = []
+
+        async def _work(name: str) -> None:
+            async with locks.hold("key"):
+                order.append(f"enter {name}")
+                await asyncio.sleep(0.01)
+                order.append(f"leave {name}")
+
+        await asyncio.gather(_work("a"), _work("b"))
+        assert order == ["enter a", "leave a", "enter b", "leave b"]
+        assert len(locks) == 0
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from filelock import Timeout
+
+from magic_storage._lock_pool import LockPool, TransientLock, get_lock_pool
+
+
+class TestLockPool:
+    def test_same_name_same_lock(self, tmp_path: Path) -> None:
+        pool = LockPool(tmp_path, stripes=8)
+        assert pool.lock("foo") is pool.lock("foo")
+        assert pool.stripes == 8
+
+    def test_bounded_lock_files(self, tmp_path: Path) -> None:
+        pool = LockPool(tmp_path, stripes=4)
+        for index in range(100):
+            with pool.lock(f"name-{index}"):
+                pass
+        assert len(list(tmp_path.iterdir())) == 4
+
+    def test_invalid_stripes(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            LockPool(tmp_path, stripes=0)
+
+    def test_reentrant(self, tmp_path: Path) -> None:
+        lock = LockPool(tmp_path).lock("foo")
+        with lock:
+            with lock:
+                assert lock.is_locked
+            assert lock.is_locked
+        assert not lock.is_locked
+
+    def test_threads_exclude_each_other(self, tmp_path: Path) -> None:
+        lock = LockPool(tmp_path).lock("foo")
+        inside = 0
+        overlaps = []
+
+        def _work() -> None:
+            nonlocal inside
+            for _ in range(20):
+                with lock:
+                    inside += 1
+                    overlaps.append(inside)
+                    time.sleep(0.0005)
+                    inside -= 1
+
+        threads = [threading.Thread(target=_work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(overlaps) == 1
+
+    def test_timeout(self, tmp_path: Path) -> None:
+        lock = LockPool(tmp_path).lock("foo")
+        errors = []
+
+        def _try() -> None:
+            try:
+                lock.acquire(timeout=0)
+            except Timeout as e:
+                errors.append(e)
+            else:  # pragma: no cover
+                lock.release()
+
+        with lock:
+            thread = threading.Thread(target=_try)
+            thread.start()
+            thread.join()
+        assert len(errors) == 1
+
+    def test_get_lock_pool_shared(self, tmp_path: Path) -> None:
+        assert get_lock_pool(tmp_path) is get_lock_pool(tmp_path)
+        assert get_lock_pool(tmp_path) is not get_lock_pool(
+            tmp_path, prefix="other"
+        )
+
+
+class TestTransientLock:
+    def test_removed_on_release(self, tmp_path: Path) -> None:
+        lock = TransientLock(tmp_path / "foo.lock")
+        with lock:
+            assert (tmp_path / "foo.lock").exists()
+        assert not lock.is_locked
+        assert list(tmp_path.iterdir()) == []
+
+    def test_threads_exclude_each_other(self, tmp_path: Path) -> None:
+        inside = 0
+        overlaps = []
+
+        def _work() -> None:
+            nonlocal inside
+            for _ in range(20):
+                with TransientLock(tmp_path / "foo.lock"):
+                    inside += 1
+                    overlaps.append(inside)
+                    time.sleep(0.0005)
+                    inside -= 1
+
+        threads = [threading.Thread(target=_work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert max(overlaps) == 1
+        assert list(tmp_path.iterdir()) == []
+
+    def test_timeout(self, tmp_path: Path) -> None:
+        with TransientLock(tmp_path / "foo.lock"):
+            with pytest.raises(Timeout):
+                TransientLock(tmp_path / "foo.lock").acquire(timeout=0)
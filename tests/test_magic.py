@@ -1,6 +1,12 @@
 from pathlib import Path
 
-from magic_storage import FilesystemStorage, MagicStorage
+from magic_storage import (
+    FilesystemStorage,
+    MagicStorage,
+    PackedStorage,
+    SQLiteStorage,
+    TieredStorage,
+)
 
 
 class TestMagicStorage:
@@ -11,3 +17,17 @@ class TestMagicStorage:
     def test_filesystem_without_cache(self, tmp_path: Path) -> None:
         fs = MagicStorage().filesystem_no_cache(tmp_path)
         assert isinstance(fs, FilesystemStorage)
+
+    def test_packed(self, tmp_path: Path) -> None:
+        storage = MagicStorage().packed(tmp_path)
+        assert isinstance(storage, PackedStorage)
+
+    def test_sqlite(self, tmp_path: Path) -> None:
+        storage = MagicStorage().sqlite(tmp_path / "cache.db")
+        assert isinstance(storage, SQLiteStorage)
+        assert (tmp_path / "cache.db").is_file()
+
+    def test_tiered(self, tmp_path: Path) -> None:
+        storage = MagicStorage().tiered(tmp_path, capacity=10)
+        assert isinstance(storage, TieredStorage)
+        assert [tier.capacity for tier in storage.tiers] == [10, None]
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from magic_storage import (
+    FilesystemStorage,
+    InMemoryStorage,
+    Metrics,
+    MetricsHook,
+    ObjectCache,
+    StoreType,
+    Tier,
+    TieredStorage,
+)
+from magic_storage._metrics import Histogram, Labels, hit_ratio
+
+from .data import ITEM_0, ITEM_1, UIDS
+
+UID = UIDS[0]
+
+
+class TestHistogram:
+    def test_quantiles(self) -> None:
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.observe(0.0001)
+        histogram.observe(1.0)
+        assert histogram.count == 100
+        assert histogram.quantile(0.5) <= 0.000128
+        assert histogram.quantile(1.0) == 1.0
+        assert histogram.snapshot()["max"] == 1.0
+
+    def test_empty(self) -> None:
+        assert Histogram().snapshot()["mean"] == 0.0
+        assert Histogram().quantile(0.5) == 0.0
+
+
+class TestMetrics:
+    def test_phases(self, tmp_path: Path) -> None:
+        metrics = Metrics()
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(metrics=metrics)
+        impl.store_pickle(UID, ITEM_1)
+        impl.load_pickle(UID)
+        latency = metrics.snapshot()["latency"]
+        assert set(latency["store"]["FilesystemStorage"]["PICKLE"]) == {
+            "hash",
+            "serialize",
+            "compress",
+            "lock",
+            "io",
+            "total",
+        }
+        assert set(latency["load"]["FilesystemStorage"]["PICKLE"]) == {
+            "hash",
+            "io",
+            "compress",
+            "serialize",
+            "total",
+        }
+
+    def test_dedupe_phases(self, tmp_path: Path) -> None:
+        metrics = Metrics()
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(metrics=metrics, dedupe=True)
+        impl.store_pickle(UIDS[0], ITEM_1)
+        impl.store_pickle(UIDS[1], ITEM_1)
+        labels = Labels("store", "FilesystemStorage", StoreType.PICKLE)
+        compress = metrics.histogram(labels, "compress")
+        assert compress is not None and compress.count == 1
+        total = metrics.histogram(labels, "total")
+        assert total is not None and total.count == 2
+
+    def test_dedupe_batch_timed_once(self, tmp_path: Path) -> None:
+        metrics = Metrics()
+        impl = FilesystemStorage(tmp_path)
+        impl.configure(metrics=metrics, dedupe=True)
+        impl.store_many(StoreType.PICKLE, {uid: ITEM_1 for uid in UIDS})
+        counters = metrics.snapshot()["counters"]
+        assert counters["store_many"]["FilesystemStorage"]["PICKLE"] == {
+            "ok": 1
+        }
+        assert "store" not in counters
+
+    def test_outcomes(self) -> None:
+        metrics = Metrics()
+        impl = InMemoryStorage()
+        impl.configure(metrics=metrics, object_cache=ObjectCache())
+        impl.store_json(UID, ITEM_0)
+        impl.load_json(UID)
+        impl.load_json(UID)
+        with pytest.raises(KeyError):
+            impl.load_json(UIDS[1])
+        impl.delete(UID)
+        counters = metrics.snapshot()["counters"]
+        assert counters["load"]["InMemoryStorage"]["JSON"] == {
+            "ok": 1,
+            "cached": 1,
+            "error": 1,
+        }
+        assert counters["delete"]["InMemoryStorage"]["-"] == {"ok": 1}
+        metrics.reset()
+        assert metrics.snapshot() == {"counters": {}, "latency": {}}
+
+    def test_batches(self) -> None:
+        metrics = Metrics()
+        impl = InMemoryStorage()
+        impl.configure(metrics=metrics)
+        impl.store_many(StoreType.JSON, {uid: ITEM_0 for uid in UIDS})
+        impl.load_many(StoreType.JSON, UIDS)
+        counters = metrics.snapshot()["counters"]
+        assert counters["store_many"]["InMemoryStorage"]["JSON"] == {"ok": 1}
+        assert counters["store"]["InMemoryStorage"]["JSON"] == {
+            "ok": len(UIDS)
+        }
+        assert counters["load_many"]["InMemoryStorage"]["JSON"] == {"ok": 1}
+
+    def test_custom_hook(self) -> None:
+        observed: list[tuple[Labels, str]] = []
+
+        class Hook(MetricsHook):
+            def observe(
+                self, labels: Labels, phase: str, seconds: float
+            ) -> None:
+                observed.append((labels, phase))
+
+        impl = InMemoryStorage()
+        impl.configure(metrics=Hook())
+        impl.store_str(UID, "text")
+        assert (Labels("store", "InMemoryStorage", StoreType.TEXT), "io") in (
+            observed
+        )
+        assert impl.stats()["metrics"] == {}
+
+
+class TestStats:
+    def test_hit_ratio(self) -> None:
+        assert hit_ratio(0, 0) == 0.0
+        assert hit_ratio(3, 1) == 0.75
+
+    def test_filesystem(self, tmp_path: Path) -> None:
+        impl = FilesystemStorage(tmp_path)
+        impl.store_json(UID, ITEM_0)
+        impl.load_json(UID)
+        impl.load_json(UID)
+        stats = impl.stats()
+        assert stats["backend"] == "FilesystemStorage"
+        read_cache = stats["caches"]["read_cache"]
+        assert read_cache["hit_ratio"] == 0.5
+        assert stats["pending"] == 0
+
+    def test_tiered(self, tmp_path: Path) -> None:
+        memory = InMemoryStorage()
+        impl = TieredStorage(
+            Tier(memory, capacity=1), FilesystemStorage(tmp_path)
+        )
+        impl.store_json(UID, ITEM_0)
+        stats = impl.stats()
+        assert [tier["backend"] for tier in stats["tiers"]] == [
+            "InMemoryStorage",
+            "FilesystemStorage",
+        ]
+        assert stats["tiers"][0]["entries"] == 1
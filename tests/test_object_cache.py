@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from magic_storage import ObjectCache
+
+
+class TestObjectCache:
+    def test_copy_on_read(self) -> None:
+        cache = ObjectCache()
+        item = {"foo": [1]}
+        cache.put("key", item, cache.generation)["foo"].append(2)
+        assert cache.get("key") == {"foo": [1]}
+        cache.get("key")["foo"].append(3)
+        assert cache.get("key") == {"foo": [1]}
+        assert cache.get("key") is not cache.get("key")
+
+    def test_copy_of_unpicklable(self) -> None:
+        cache = ObjectCache()
+        item = {"foo": [1], "bar": lambda: None}
+        returned = cache.put("key", item, cache.generation)
+        assert returned is not item
+        cache.get("key")["foo"].append(2)
+        assert cache.get("key")["foo"] == [1]
+
+    def test_immutable_shared(self) -> None:
+        cache = ObjectCache()
+        item = "text" * 100
+        assert cache.put("key", item, cache.generation) is item
+        assert cache.get("key") is item
+
+    def test_shared(self) -> None:
+        cache = ObjectCache(copy=False)
+        item = {"foo": [1]}
+        assert cache.put("key", item, cache.generation) is item
+        assert cache.get("key") is item
+
+    def test_put_after_invalidation_is_ignored(self) -> None:
+        cache = ObjectCache()
+        generation = cache.generation
+        cache.invalidate(["key"])
+        cache.put("key", 1, generation)
+        with pytest.raises(KeyError):
+            cache.get("key")
+
+    def test_stats(self) -> None:
+        cache = ObjectCache(maxsize=1)
+        cache.put("a", 1, cache.generation)
+        cache.put("b", 2, cache.generation)
+        assert cache.get("b") == 2
+        with pytest.raises(KeyError):
+            cache.get("a")
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
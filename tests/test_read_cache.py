@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from magic_storage import ReadCache
+
+
+class TestReadCache:
+    def test_evicts_least_recently_used_over_budget(self) -> None:
+        cache = ReadCache(max_bytes=10)
+        cache["a"] = b"aaaa"
+        cache["b"] = b"bbbb"
+        assert cache["a"] == b"aaaa"
+        cache["c"] = b"cccc"
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.currsize == 8
+        assert cache.evictions == 1
+
+    def test_value_over_budget_is_not_cached(self) -> None:
+        cache = ReadCache(max_bytes=4)
+        cache["a"] = b"aaaaa"
+        assert "a" not in cache
+        assert cache.evictions == 0
+
+    def test_ttl(self) -> None:
+        now = [0.0]
+        cache = ReadCache(ttl=10, timer=lambda: now[0])
+        cache["a"] = "text"
+        now[0] = 5.0
+        assert cache["a"] == "text"
+        now[0] = 11.0
+        assert "a" not in cache
+
+    def test_stats(self) -> None:
+        cache = ReadCache()
+        cache["a"] = b"12"
+        assert cache["a"] == b"12"
+        try:
+            cache["b"]
+        except KeyError:
+            pass
+        assert cache.stats() == {
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "entries": 1,
+            "bytes": 2,
+        }
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import pstats
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import pytest
+
+from magic_storage import (
+    FilesystemStorage,
+    InMemoryStorage,
+    ProfileCapture,
+    StoreType,
+    get_tracer,
+    set_tracer,
+)
+from magic_storage._tracing import _NULL_SPAN, span
+
+from .data import ITEM_0, UIDS
+
+UID = UIDS[0]
+
+
+class _RecordedSpan:
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class RecordingTracer:
+    def __init__(self) -> None:
+        self.spans: list[_RecordedSpan] = []
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, *, attributes: Optional[dict[str, Any]] = None
+    ) -> Iterator[_RecordedSpan]:
+        recorded = _RecordedSpan(name, dict(attributes or {}))
+        self.spans.append(recorded)
+        yield recorded
+
+    def names(self) -> list[str]:
+        return [recorded.name for recorded in self.spans]
+
+
+@pytest.fixture()
+def tracer() -> Iterator[RecordingTracer]:
+    tracer = RecordingTracer()
+    previous = set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
+
+
+class TestSpan:
+    def test_no_tracer_returns_shared_null_span(self) -> None:
+        assert get_tracer() is None
+        assert span("magic_storage.load") is _NULL_SPAN
+        with span("magic_storage.load") as current:
+            current.set_attribute("hit", True)
+
+    def test_attributes(self, tracer: RecordingTracer) -> None:
+        storage = InMemoryStorage()
+        storage.store_as(StoreType.JSON, uid=UID, item=ITEM_0)
+        storage.load_as(StoreType.JSON, uid=UID)
+        storage.delete(UID)
+        assert tracer.names() == [
+            "magic_storage.store",
+            "magic_storage.load",
+            "magic_storage.delete",
+        ]
+        assert tracer.spans[0].attributes == {
+            "backend": "InMemoryStorage",
+            "store_type": "JSON",
+        }
+
+    def test_compress(self, tracer: RecordingTracer) -> None:
+        storage = InMemoryStorage()
+        storage.store_as(StoreType.PICKLE, uid=UID, item=ITEM_0)
+        storage.load_as(StoreType.PICKLE, uid=UID)
+        assert tracer.names() == [
+            "magic_storage.store",
+            "magic_storage.compress",
+            "magic_storage.load",
+            "magic_storage.decompress",
+        ]
+        assert tracer.spans[1].attributes["codec"] == "zlib:1"
+
+    def test_cache_if_missing(self, tracer: RecordingTracer) -> None:
+        storage = InMemoryStorage()
+        storage.cache_if_missing(UID, lambda: ITEM_0, StoreType.JSON)
+        storage.cache_if_missing(UID, lambda: ITEM_0, StoreType.JSON)
+        outer = [
+            recorded
+            for recorded in tracer.spans
+            if recorded.name == "magic_storage.cache_if_missing"
+        ]
+        assert [recorded.attributes["hit"] for recorded in outer] == [
+            False,
+            True,
+        ]
+
+    def test_lock(self, tracer: RecordingTracer, tmp_path: Path) -> None:
+        storage = FilesystemStorage(tmp_path)
+        storage.store_as(StoreType.TEXT, uid=UID, item="text")
+        assert "magic_storage.lock" in tracer.names()
+
+    def test_set_tracer_returns_previous(self) -> None:
+        tracer = RecordingTracer()
+        assert set_tracer(tracer) is None
+        assert set_tracer(None) is tracer
+
+
+class TestProfileCapture:
+    def test_keeps_slowest(self) -> None:
+        storage = InMemoryStorage()
+        with ProfileCapture(slowest=3) as capture:
+            for index in range(10):
+                storage.store_as(StoreType.JSON, uid=str(index), item=ITEM_0)
+        records = capture.records()
+        assert len(records) == 3
+        durations = [record["duration"] for record in records]
+        assert durations == sorted(durations, reverse=True)
+        assert get_tracer() is None
+
+    def test_only_outermost_profiled(self) -> None:
+        storage = InMemoryStorage()
+        with ProfileCapture() as capture:
+            storage.cache_if_missing(UID, lambda: ITEM_0)
+        assert [record["name"] for record in capture.records()] == [
+            "magic_storage.cache_if_missing"
+        ]
+
+    def test_memory(self) -> None:
+        storage = InMemoryStorage()
+        with ProfileCapture(memory=True) as capture:
+            storage.store_as(StoreType.PICKLE, uid=UID, item=[0] * 10_000)
+        (record,) = capture.records()
+        assert record["peak_memory"] > 0
+
+    def test_dump(self, tmp_path: Path) -> None:
+        storage = InMemoryStorage()
+        with ProfileCapture(tmp_path, slowest=2):
+            for index in range(4):
+                storage.store_as(StoreType.JSON, uid=str(index), item=ITEM_0)
+        profiles = sorted(tmp_path.glob("*.prof"))
+        assert len(profiles) == 2
+        assert profiles[0].name.startswith("001-magic_storage.store-")
+        stats = pstats.Stats(str(profiles[0]))
+        assert stats.total_calls > 0  # type: ignore
+        summary = (tmp_path / "summary.txt").read_text().splitlines()
+        assert len(summary) == 2
+
+    def test_invalid_slowest(self) -> None:
+        with pytest.raises(ValueError):
+            ProfileCapture(slowest=0)
@@ -1,6 +1,16 @@
 from __future__ import annotations
 
-from magic_storage._utils import compress, decompress, get_random_sha256
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import pytest
+
+from magic_storage._utils import (
+    compress,
+    decompress,
+    get_random_sha256,
+    map_in_order,
+)
 
 
 def test_compress_decompress() -> None:
@@ -14,3 +24,22 @@ def test_get_random_sha256() -> None:
         sha = get_random_sha256()
         assert isinstance(sha, str)
         assert len(sha) == 64
+
+
+def _reciprocal(value: int) -> float:
+    return 1 / value
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_map_in_order(max_workers: Optional[int]) -> None:
+    executor = ThreadPoolExecutor(max_workers) if max_workers else None
+    values = list(range(-8, 8))
+
+    results = map_in_order(
+        _reciprocal, values, executor, return_exceptions=True
+    )
+    assert isinstance(results[8], ZeroDivisionError)
+    assert results[:8] + results[9:] == [1 / v for v in values if v != 0]
+
+    with pytest.raises(ZeroDivisionError):
+        map_in_order(_reciprocal, values, executor)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Hashable
+
+import pytest
+
+from magic_storage._write_behind import WriteBehindQueue
+
+
+class TestWriteBehindQueue:
+    def test_put_flush(self) -> None:
+        written: dict[Hashable, Any] = {}
+        queue = WriteBehindQueue(written.__setitem__)
+        for index in range(10):
+            queue.put(index, str(index))
+        queue.flush()
+        assert written == {index: str(index) for index in range(10)}
+        assert len(queue) == 0
+        queue.close()
+
+    def test_pending_values_visible(self) -> None:
+        release = threading.Event()
+        written: list[Any] = []
+
+        def _write(key: Hashable, value: Any) -> None:
+            release.wait()
+            written.append(value)
+
+        queue = WriteBehindQueue(_write)
+        queue.put("a", 1)
+        queue.put("b", 2)
+        # replaces pending value, unless it's written at the moment
+        queue.put("b", 3)
+        assert "b" in queue
+        assert queue.get("b") == 3
+        with pytest.raises(KeyError):
+            queue.get("c")
+        release.set()
+        queue.close()
+        assert written == [1, 3]
+
+    def test_bounded(self) -> None:
+        release = threading.Event()
+
+        def _write(key: Hashable, value: int) -> None:
+            release.wait()
+
+        queue: WriteBehindQueue[int] = WriteBehindQueue(_write, maxsize=1)
+        queue.put("a", 1)
+        putter = threading.Thread(target=queue.put, args=("b", 2))
+        putter.start()
+        putter.join(0.05)
+        assert putter.is_alive()
+        release.set()
+        putter.join()
+        queue.close()
+
+    def test_errors_raised_on_flush(self) -> None:
+        def _write(key: Hashable, value: Any) -> None:
+            raise ValueError(value)
+
+        queue = WriteBehindQueue(_write)
+        queue.put("a", 1)
+        with pytest.raises(ValueError):
+            queue.flush()
+        # reported once
+        queue.flush()
+        queue.close()
+
+    def test_discard(self) -> None:
+        release = threading.Event()
+        written: list[Any] = []
+
+        def _write(key: Hashable, value: Any) -> None:
+            release.wait()
+            written.append(key)
+
+        queue = WriteBehindQueue(_write)
+        queue.put("a", 1)
+        queue.put("b", 2)
+        threading.Timer(0.02, release.set).start()
+        queue.discard(["a", "b"])
+        queue.close()
+        # "a" was already being written
+        assert written in (["a"], [])
+
+    def test_closed(self) -> None:
+        queue: WriteBehindQueue[int] = WriteBehindQueue(lambda *_: None)
+        queue.close()
+        with pytest.raises(RuntimeError):
+            queue.put("a", 1)
+
+    def test_invalid_size(self) -> None:
+        with pytest.raises(ValueError):
+            WriteBehindQueue(lambda *_: None, maxsize=0)